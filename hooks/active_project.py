@@ -0,0 +1,75 @@
+"""Last-touched project pointer (.powermode/active-project.json)
+
+context-monitor.py updates it whenever a powermode session writes, edits or
+reads a file under .powermode/projects/<slug>/. Session save and restore
+read this one small record instead of guessing from projects/index.json.
+
+  {"slug": "payments", "feature": "01-auth", "task": "02-api-endpoints",
+   "task_path": ".powermode/projects/payments/features/01-auth/02-api-endpoints.md",
+   "session_id": "...", "timestamp": "..."}
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pm_common import load_json, save_json_atomic
+
+POINTER_NAME = "active-project.json"
+PROJECT_MARKER = "/.powermode/projects/"
+# Feature files that are not task PRDs
+NON_TASK_FILES = {"README.md", "NOTES.md"}
+TOUCHED_TOOLS = {"write", "edit", "multiedit", "read"}
+
+
+def pointer_file(cwd: str) -> Path:
+    return Path(cwd) / ".powermode" / POINTER_NAME
+
+
+def parse_project_path(file_path: str, cwd: str) -> dict | None:
+    """slug/feature/task for a path under .powermode/projects/, else None."""
+    if not file_path:
+        return None
+    path = file_path if file_path.startswith("/") else f"{cwd.rstrip('/')}/{file_path}"
+    marker = path.find(PROJECT_MARKER)
+    if marker < 0:
+        return None
+    parts = [p for p in path[marker + len(PROJECT_MARKER):].split("/") if p]
+    # projects/index.json is not a project
+    if len(parts) < 2:
+        return None
+    found = {"slug": parts[0], "feature": None, "task": None, "task_path": None}
+    if len(parts) >= 3 and parts[1] == "features":
+        found["feature"] = parts[2]
+        if len(parts) == 4 and parts[3].endswith(".md") and parts[3] not in NON_TASK_FILES:
+            found["task"] = parts[3][:-3]
+            found["task_path"] = ".powermode/projects/" + "/".join(parts)
+    return found
+
+
+def record_touch(cwd: str, tool_name: str, file_path: str, session_id: str) -> None:
+    if tool_name.lower() not in TOUCHED_TOOLS:
+        return
+    found = parse_project_path(file_path, cwd)
+    if not found:
+        return
+    current = load_json(pointer_file(cwd)) or {}
+    # Touching a project or feature level file keeps the more specific
+    # task already recorded for that same project/feature
+    if current.get("slug") == found["slug"]:
+        if not found["feature"]:
+            found.update({k: current.get(k) for k in ("feature", "task", "task_path")})
+        elif not found["task"] and current.get("feature") == found["feature"]:
+            found.update({k: current.get(k) for k in ("task", "task_path")})
+    found["session_id"] = session_id
+    found["timestamp"] = datetime.now(timezone.utc).isoformat()
+    save_json_atomic(pointer_file(cwd), found)
+
+
+def load_active_project(cwd: str) -> dict | None:
+    pointer = load_json(pointer_file(cwd))
+    if not pointer or not pointer.get("slug"):
+        return None
+    if not (Path(cwd) / ".powermode" / "projects" / pointer["slug"]).is_dir():
+        # Project was cleaned up since it was last touched
+        return None
+    return pointer
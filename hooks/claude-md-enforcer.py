@@ -4,16 +4,87 @@
 Injects CLAUDE.md rules as system reminders on every prompt.
 Reads from hierarchy: ~/.claude/CLAUDE.md, ancestors, project-level.
 Emphasizes simplicity, clarification, and testing principles.
+
+Re-injection is diff-only by default: the full rules go out on the first
+prompt of a session, after compaction, and when a CLAUDE.md changes (then
+only the changed sections). Other prompts get a one-line marker.
+
+Rules are ranked, not truncated: each CLAUDE.md is parsed into a heading
+tree, sections are scored (heading keywords, share of imperative sentences,
+user priority markers) and the best ones are packed into one token budget
+shared by all files in the hierarchy. Mark a section with
+<!-- priority: always|critical|high|low|<number> --> to steer the ranking.
+
+Config (powermode.json):
+  "claude_md": {
+    "reinject": "diff",     # "diff" or "always" (full text every prompt)
+    "refresh_every": 0,     # also re-send full text every N prompts (0 = never)
+    "token_budget": 1200    # shared budget for all CLAUDE.md files
+  }
 """
 
 import os
+import re
 import sys
 import json
+import time
 import hashlib
 from pathlib import Path
 
-
-def find_claude_md_files(cwd: str) -> list[tuple[str, str]]:
+from pm_common import (
+    claude_md_state_file,
+    config_section,
+    load_json,
+    save_json_atomic,
+    user_state_dir,
+)
+
+DEFAULT_CONFIG = {"reinject": "diff", "refresh_every": 0, "token_budget": 1200}
+
+CHARS_PER_TOKEN = 3.5
+CACHE_FILE_NAME = "claude-md-cache.json"
+CACHE_MAX_FILES = 50
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+PRIORITY_RE = re.compile(r"<!--\s*priority\s*:\s*([\w.+-]+)\s*-->", re.IGNORECASE)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+STRONG_MODAL_RE = re.compile(r"\b(MUST|NEVER|ALWAYS|SHOULD|DO NOT|DON'T)\b")
+
+# Heading keywords that mark rule-heavy sections (full weight in the heading,
+# half weight when only an ancestor heading matches)
+KEYWORD_WEIGHTS = {
+    "critical": 3.0,
+    "important": 2.5,
+    "never": 2.0,
+    "always": 2.0,
+    "must": 2.0,
+    "rule": 2.0,
+    "security": 2.0,
+    "test": 1.5,
+    "mock": 1.5,
+    "clarif": 1.5,
+    "principle": 1.5,
+    "simple": 1.0,
+    "communication": 1.0,
+    "style": 1.0,
+    "convention": 1.0,
+}
+
+IMPERATIVE_WEIGHT = 4.0
+IMPERATIVE_VERBS = {
+    "always", "never", "do", "don't", "dont", "use", "avoid", "prefer", "run",
+    "keep", "write", "make", "ensure", "follow", "ask", "check", "add", "remove",
+    "put", "place", "call", "return", "name", "test", "verify", "commit", "push",
+    "read", "document", "mock", "stop", "only", "must", "no",
+}
+
+PRIORITY_LEVELS = {"always": 100.0, "critical": 10.0, "high": 5.0, "normal": 0.0, "low": -5.0}
+
+# Session state files older than this are pruned when a new session starts
+STATE_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+def find_claude_md_files(cwd: str) -> list[tuple[str, Path]]:
     """Find all CLAUDE.md files in hierarchy order (user-level first, closest last)."""
     files = []
     seen_paths = set()
@@ -21,7 +92,7 @@ def find_claude_md_files(cwd: str) -> list[tuple[str, str]]:
     # 1. User-level: ~/.claude/CLAUDE.md
     user_level = Path.home() / ".claude" / "CLAUDE.md"
     if user_level.exists():
-        files.append(("~/.claude/CLAUDE.md", user_level.read_text()))
+        files.append(("~/.claude/CLAUDE.md", user_level))
         seen_paths.add(user_level.resolve())
 
     # 2. Walk up from CWD to root, collect all CLAUDE.md files
@@ -37,7 +108,7 @@ def find_claude_md_files(cwd: str) -> list[tuple[str, str]]:
                 if claude_md.is_relative_to(Path(cwd).resolve())
                 else str(claude_md)
             )
-            ancestors.append((rel_path, claude_md.read_text()))
+            ancestors.append((rel_path, claude_md))
             seen_paths.add(claude_md.resolve())
 
         # Check ./.claude/CLAUDE.md
@@ -48,7 +119,7 @@ def find_claude_md_files(cwd: str) -> list[tuple[str, str]]:
                 if claude_dir_md.is_relative_to(Path(cwd).resolve())
                 else str(claude_dir_md)
             )
-            ancestors.append((rel_path, claude_dir_md.read_text()))
+            ancestors.append((rel_path, claude_dir_md))
             seen_paths.add(claude_dir_md.resolve())
 
         current = current.parent
@@ -60,67 +131,208 @@ def find_claude_md_files(cwd: str) -> list[tuple[str, str]]:
     return files
 
 
-def extract_key_rules(content: str, max_length: int = 1500) -> str:
-    """Extract key rules from CLAUDE.md content, truncate if needed."""
-    # If short enough, return as-is
-    if len(content) <= max_length:
-        return content.strip()
-
-    # Try to extract sections with key markers
-    lines = content.split("\n")
-    key_sections = []
-    current_section = []
-    in_key_section = False
-
-    key_markers = [
-        "communication",
-        "style",
-        "test",
-        "mock",
-        "simple",
-        "clarif",
-        "principle",
-        "must",
-        "never",
-        "always",
-        "important",
-        "critical",
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def parse_sections(content: str) -> list[dict]:
+    """Parse CLAUDE.md into a flat list of heading-tree nodes.
+
+    Each node holds its own heading + body (children are separate nodes),
+    its depth, its ancestor titles, and any priority marker found in it.
+    """
+    sections = []
+    stack: list[tuple[int, str]] = []
+    current = {"title": "", "level": 0, "ancestors": [], "lines": [], "priority": None}
+    in_fence = False
+
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+
+        heading = None if in_fence else HEADING_RE.match(line)
+        if heading:
+            sections.append(current)
+            level = len(heading.group(1))
+            title = heading.group(2).strip()
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            current = {
+                "title": title,
+                "level": level,
+                "ancestors": [t for _, t in stack],
+                "lines": [line],
+                "priority": None,
+            }
+            stack.append((level, title))
+            continue
+
+        marker = PRIORITY_RE.search(line)
+        if marker:
+            current["priority"] = marker.group(1).lower()
+            line = PRIORITY_RE.sub("", line)
+            if not line.strip():
+                continue
+        current["lines"].append(line)
+
+    sections.append(current)
+
+    result = []
+    for order, section in enumerate(sections):
+        text = "\n".join(section.pop("lines")).strip()
+        if not text:
+            continue
+        section["text"] = text
+        section["order"] = order
+        section["tokens"] = estimate_tokens(text)
+        section["score"] = score_section(section)
+        result.append(section)
+    return result
+
+
+def imperative_density(text: str) -> float:
+    """Share of sentences / bullets that read as instructions."""
+    sentences = [
+        s.strip().lstrip("-*>0123456789.) ").strip()
+        for s in SENTENCE_SPLIT_RE.split(text)
     ]
+    sentences = [s for s in sentences if len(s) > 3 and not s.startswith("#")]
+    if not sentences:
+        return 0.0
+    imperative = 0
+    for sentence in sentences:
+        first = sentence.split()[0].lower().strip("*_`:,")
+        if first in IMPERATIVE_VERBS or STRONG_MODAL_RE.search(sentence):
+            imperative += 1
+    return imperative / len(sentences)
+
+
+def score_section(section: dict) -> float:
+    """Value of a section: heading keywords + instruction density + user priority."""
+    title = section["title"].lower()
+    context = " ".join(section["ancestors"]).lower()
+    score = 0.0
+    for keyword, weight in KEYWORD_WEIGHTS.items():
+        if keyword in title:
+            score += weight
+        elif keyword in context:
+            score += weight / 2
+    score += IMPERATIVE_WEIGHT * imperative_density(section["text"])
+
+    priority = section.get("priority")
+    if priority in PRIORITY_LEVELS:
+        score += PRIORITY_LEVELS[priority]
+    elif priority:
+        try:
+            score += float(priority)
+        except ValueError:
+            pass
+    return round(score, 3)
+
+
+def pack_sections(
+    files: list[tuple[str, list[dict]]], token_budget: int
+) -> list[tuple[str, str]]:
+    """Pack the highest-value sections from all files into one token budget.
+
+    Pinned sections (priority: always) go first, then by score; on equal
+    scores the file closest to CWD wins. Output keeps document order and
+    lists the headings that did not fit, so nothing is dropped silently.
+    """
+    total = sum(s["tokens"] for _, sections in files for s in sections)
+    if total <= token_budget:
+        return [
+            (label, "\n\n".join(s["text"] for s in sections))
+            for label, sections in files
+            if sections
+        ]
+
+    candidates = []
+    for file_index, (label, sections) in enumerate(files):
+        for section in sections:
+            pinned = section.get("priority") == "always"
+            candidates.append((not pinned, -section["score"], -file_index, section["order"], label, section))
+    candidates.sort(key=lambda c: c[:4])
+
+    remaining = token_budget
+    chosen: dict[str, set[int]] = {}
+    for _, _, _, order, label, section in candidates:
+        if section["tokens"] <= remaining:
+            chosen.setdefault(label, set()).add(order)
+            remaining -= section["tokens"]
+
+    packed = []
+    for label, sections in files:
+        picked = chosen.get(label, set())
+        kept = [s["text"] for s in sections if s["order"] in picked]
+        omitted = [s["title"] for s in sections if s["order"] not in picked and s["title"]]
+        if omitted:
+            kept.append("(Omitted to fit token budget: " + "; ".join(omitted) + ")")
+        if kept:
+            packed.append((label, "\n\n".join(kept)))
+    return packed
+
+
+def load_cache() -> dict:
+    return load_json(user_state_dir() / CACHE_FILE_NAME) or {}
+
+
+def extract_key_rules(claude_files: list[tuple[str, Path]], token_budget: int) -> list[tuple[str, str]]:
+    """Rank CLAUDE.md sections and pack them into a shared token budget.
+
+    Parsed sections are cached per file by mtime/size, and the packed result
+    by the whole (files, budget) key, so unchanged files are not re-read.
+    """
+    stats = []
+    for label, path in claude_files:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stats.append((label, path, st.st_mtime_ns, st.st_size))
+
+    key = content_hash(json.dumps(
+        [token_budget] + [[label, str(p), m, z] for label, p, m, z in stats]
+    ))
+    cache = load_cache()
+    packed = cache.get("packed", {})
+    if packed.get("key") == key:
+        return [tuple(item) for item in packed.get("result", [])]
+
+    cached_files = cache.get("files", {})
+    files = []
+    fresh_files = {}
+    for label, path, mtime_ns, size in stats:
+        entry = cached_files.get(str(path))
+        if entry and entry.get("mtime_ns") == mtime_ns and entry.get("size") == size:
+            sections = entry["sections"]
+        else:
+            try:
+                sections = parse_sections(path.read_text())
+            except OSError:
+                continue
+        fresh_files[str(path)] = {"mtime_ns": mtime_ns, "size": size, "sections": sections}
+        files.append((label, sections))
+
+    result = pack_sections(files, token_budget)
+
+    # Keep entries for files seen from other directories too, up to a cap
+    for path_key, entry in cached_files.items():
+        if path_key not in fresh_files and len(fresh_files) < CACHE_MAX_FILES:
+            fresh_files[path_key] = entry
+    save_json_atomic(
+        user_state_dir() / CACHE_FILE_NAME,
+        {
+            "files": fresh_files,
+            "packed": {"key": key, "result": result},
+        },
+    )
+    return result
+
 
-    for line in lines:
-        line_lower = line.lower()
-
-        # Check if this line starts a key section
-        if line.startswith("#") and any(marker in line_lower for marker in key_markers):
-            if current_section:
-                key_sections.append("\n".join(current_section))
-            current_section = [line]
-            in_key_section = True
-        elif in_key_section:
-            if line.startswith("#") and not any(
-                marker in line_lower for marker in key_markers
-            ):
-                key_sections.append("\n".join(current_section))
-                current_section = []
-                in_key_section = False
-            else:
-                current_section.append(line)
-
-    if current_section:
-        key_sections.append("\n".join(current_section))
-
-    if key_sections:
-        extracted = "\n\n".join(key_sections)
-        if len(extracted) <= max_length:
-            return extracted.strip()
-        return extracted[:max_length].strip() + "..."
-
-    # Fallback: just truncate
-    return content[:max_length].strip() + "..."
-
-
-def build_reminder(claude_files: list[tuple[str, str]]) -> str:
-    """Build the system reminder from CLAUDE.md files."""
+def build_reminder(extracted_files: list[tuple[str, str]]) -> str:
+    """Build the system reminder from extracted CLAUDE.md rules."""
     parts = [
         "[SYSTEM REMINDER - CLAUDE.md RULES ENFORCEMENT]",
         "",
@@ -130,8 +342,7 @@ def build_reminder(claude_files: list[tuple[str, str]]) -> str:
     ]
 
     # Add content from each file
-    for path, content in claude_files:
-        extracted = extract_key_rules(content)
+    for path, extracted in extracted_files:
         parts.append(f"=== {path} ===")
         parts.append(extracted)
         parts.append("")
@@ -139,6 +350,162 @@ def build_reminder(claude_files: list[tuple[str, str]]) -> str:
     return "\n".join(parts)
 
 
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split extracted rules into (key, text) chunks at markdown headings."""
+    sections: list[tuple[str, str]] = []
+    current_key = "(preamble)"
+    current: list[str] = []
+    for line in text.split("\n"):
+        if line.startswith("#"):
+            if any(l.strip() for l in current):
+                sections.append((current_key, "\n".join(current).strip()))
+            current_key = line.strip()
+            current = [line]
+        else:
+            current.append(line)
+    if any(l.strip() for l in current):
+        sections.append((current_key, "\n".join(current).strip()))
+
+    # Repeated headings get a suffix so keys stay unique
+    seen: dict[str, int] = {}
+    unique = []
+    for key, body in sections:
+        seen[key] = seen.get(key, 0) + 1
+        unique.append((key if seen[key] == 1 else f"{key} ({seen[key]})", body))
+    return unique
+
+
+def fingerprint(extracted_files: list[tuple[str, str]]) -> dict:
+    """Per-file and per-section hashes of what would be injected."""
+    files = {}
+    for path, extracted in extracted_files:
+        files[path] = {
+            "hash": content_hash(extracted),
+            "sections": {key: content_hash(body) for key, body in split_sections(extracted)},
+        }
+    return files
+
+
+def build_delta(
+    extracted_files: list[tuple[str, str]], previous: dict, since_turn: int
+) -> str | None:
+    """Build a reminder with only what changed since the last injection.
+
+    Returns None when nothing changed.
+    """
+    current = fingerprint(extracted_files)
+    parts = []
+
+    for path, extracted in extracted_files:
+        old = previous.get(path)
+        new = current[path]
+        if old and old.get("hash") == new["hash"]:
+            continue
+        if not old:
+            parts.append(f"=== {path} (new) ===")
+            parts.append(extracted)
+            parts.append("")
+            continue
+
+        old_sections = old.get("sections", {})
+        changed = [
+            body
+            for key, body in split_sections(extracted)
+            if old_sections.get(key) != new["sections"].get(key)
+        ]
+        removed = [key for key in old_sections if key not in new["sections"]]
+        parts.append(f"=== {path} (changed sections) ===")
+        parts.extend(body + "\n" for body in changed)
+        if removed:
+            parts.append("Removed sections: " + ", ".join(removed))
+            parts.append("")
+
+    for path in previous:
+        if path not in current:
+            parts.append(f"=== {path} (removed — its rules no longer apply) ===")
+            parts.append("")
+
+    if not parts:
+        return None
+
+    header = [
+        "[SYSTEM REMINDER - CLAUDE.md RULES UPDATED]",
+        "",
+        f"CLAUDE.md changed since turn {since_turn}. All other rules still apply unchanged.",
+        "",
+    ]
+    return "\n".join(header + parts)
+
+
+def unchanged_marker(since_turn: int) -> str:
+    return (
+        f"[CLAUDE.md RULES: unchanged since turn {since_turn} — "
+        "everything injected then is still in force. Follow it.]"
+    )
+
+
+def prune_stale_state(state_dir: Path) -> None:
+    cutoff = time.time() - STATE_MAX_AGE_SECONDS
+    try:
+        for old in state_dir.glob("*.json"):
+            if old.stat().st_mtime < cutoff:
+                old.unlink()
+    except OSError:
+        pass
+
+
+def select_reminder(
+    extracted_files: list[tuple[str, str]], session_id: str, config: dict
+) -> str:
+    """Decide between full rules, changed sections, or the unchanged marker."""
+    if config.get("reinject") != "diff" or not session_id:
+        return build_reminder(extracted_files)
+
+    state_file = claude_md_state_file(session_id)
+    state = load_json(state_file)
+    if state is None:
+        prune_stale_state(state_file.parent)
+        state = {}
+
+    turn = int(state.get("turn", 0)) + 1
+    full_turn = state.get("full_turn")
+    refresh_every = int(config.get("refresh_every") or 0)
+    needs_full = (
+        full_turn is None
+        or "files" not in state
+        or (refresh_every > 0 and turn - int(full_turn) >= refresh_every)
+    )
+
+    if needs_full:
+        reminder = build_reminder(extracted_files)
+        full_turn = turn
+    else:
+        reminder = build_delta(extracted_files, state["files"], state.get("sent_turn", full_turn))
+        if reminder is None:
+            reminder = unchanged_marker(state.get("sent_turn", full_turn))
+
+    files = fingerprint(extracted_files)
+    sent_turn = state.get("sent_turn", full_turn)
+    if needs_full or files != state.get("files"):
+        sent_turn = turn
+
+    save_json_atomic(
+        state_file,
+        {
+            "session_id": session_id,
+            "turn": turn,
+            "full_turn": full_turn,
+            "sent_turn": sent_turn,
+            "files": files,
+        },
+    )
+    return reminder
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
@@ -147,6 +514,7 @@ def main():
         return
 
     cwd = input_data.get("cwd", os.getcwd())
+    session_id = input_data.get("session_id", "")
 
     # Find all CLAUDE.md files
     claude_files = find_claude_md_files(cwd)
@@ -156,8 +524,9 @@ def main():
         print(json.dumps({"continue": True}))
         return
 
-    # Build the reminder
-    reminder = build_reminder(claude_files)
+    config = config_section(cwd, "claude_md", DEFAULT_CONFIG)
+    extracted_files = extract_key_rules(claude_files, int(config.get("token_budget") or 1200))
+    reminder = select_reminder(extracted_files, session_id, config)
 
     # Output with proper UserPromptSubmit schema
     result = {
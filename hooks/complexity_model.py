@@ -0,0 +1,275 @@
+"""Task complexity model for task-containment-enforcer.
+
+A weighted-feature scorer predicts how many tool calls a subagent task will
+take. Features are taken from the Task prompt:
+- length_k: prompt length in thousands of characters
+- paths: distinct file/path references
+- high / medium / low: distinct verbs of each class ("implement", "fix", "find")
+- prd_tests: test-table rows in referenced PRD task files (or task count of a
+  referenced feature README)
+
+Every finished subagent appends its features and actual tool calls, file
+reads, tokens and duration to .powermode/subagent-history.jsonl
+(subagent-budget-guard.py, SubagentStop). Runs that used up a budget limit
+are marked "capped": their tool calls are only a lower bound on what the
+task needed, so they are left out of the fit. Once MIN_SAMPLES uncapped runs
+exist the weights are refitted with ridge regression pulled towards DEFAULT_WEIGHTS,
+per subagent type when it has enough runs of its own. The fit is cached in
+.powermode/complexity-model.json keyed by the history file's mtime/size.
+
+The predicted tool calls pick the complexity tier; tokens are predicted
+from the observed tokens per tool call.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+
+from pm_common import load_json, save_json_atomic
+from prd_index import is_prd_path, lookup_folder, parse_task_rows
+
+HISTORY_NAME = "subagent-history.jsonl"
+MODEL_NAME = "complexity-model.json"
+
+FEATURES = ("bias", "length_k", "paths", "high", "medium", "low", "prd_tests")
+
+# Hand-tuned starting point (tool calls), also the ridge prior
+DEFAULT_WEIGHTS = {
+    "bias": 6.0,
+    "length_k": 3.0,
+    "paths": 1.5,
+    "high": 6.0,
+    "medium": 3.0,
+    "low": 2.0,
+    "prd_tests": 0.5,
+}
+DEFAULT_TOKENS_PER_CALL = 1500
+
+MIN_SAMPLES = 5
+RIDGE_LAMBDA = 5.0
+MAX_HISTORY = 500
+
+# Predicted tool calls at which a task moves up a tier
+TIER_THRESHOLDS = (("LOW", 12), ("MEDIUM", 28))
+
+VERB_CLASSES = {
+    "high": ["implement", "build", "create a full", "refactor", "migrate", "integrate",
+             "add support for", "entire", "rewrite", "redesign"],
+    "medium": ["fix", "update", "add", "modify", "change", "test", "verify", "rename", "remove"],
+    "low": ["find", "search", "read", "look", "what is", "explore", "check if", "list", "explain"],
+}
+VERB_RES = {
+    cls: re.compile(r"\b(" + "|".join(re.escape(v) for v in verbs) + r")\b", re.IGNORECASE)
+    for cls, verbs in VERB_CLASSES.items()
+}
+
+PATH_RE = re.compile(
+    r"(?<![\w@])@?((?:[\w.-]+/)+[\w.-]*|[\w-]+\.(?:py|ts|tsx|js|jsx|go|rs|java|rb|php|md|json|"
+    r"ya?ml|toml|sh|css|scss|html|sql|swift|kt|c|h|cpp))(?![\w/])"
+)
+
+
+def history_file(powermode_dir: Path) -> Path:
+    return powermode_dir / HISTORY_NAME
+
+
+def count_test_rows(path: Path) -> int:
+    """Data rows of the markdown tables in a PRD task file."""
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return 0
+    rows = 0
+    in_table = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped.startswith("|"):
+            in_table = False
+            continue
+        if not in_table:
+            # Header row
+            in_table = True
+            continue
+        if set(stripped) <= set("|-: "):
+            continue
+        rows += 1
+    return rows
+
+
+def prd_test_size(paths: list[str], cwd: str) -> int:
+    total = 0
+    index = {"folders": {}}
+    for ref in paths:
+        path = Path(ref) if Path(ref).is_absolute() else Path(cwd) / ref
+        if not is_prd_path(path):
+            continue
+        if path.suffix == ".md" and path.is_file():
+            if path.name == "README.md":
+                try:
+                    total += len(parse_task_rows(path.read_text(errors="replace")))
+                except OSError:
+                    continue
+            else:
+                total += count_test_rows(path)
+        elif path.is_dir():
+            entry = lookup_folder(index, path)
+            if entry:
+                total += entry.get("summary", {}).get("tasks", 0)
+    return min(total, 40)
+
+
+def extract_features(prompt: str, cwd: str) -> dict:
+    paths = sorted({m.group(1).rstrip(".") for m in PATH_RE.finditer(prompt)})
+    features = {
+        "bias": 1.0,
+        "length_k": min(len(prompt) / 1000, 10.0),
+        "paths": float(min(len(paths), 20)),
+        "prd_tests": float(prd_test_size(paths, cwd)) if cwd else 0.0,
+    }
+    for cls, pattern in VERB_RES.items():
+        features[cls] = float(len({m.group(1).lower() for m in pattern.finditer(prompt)}))
+    return features
+
+
+def load_history(powermode_dir: Path) -> list[dict]:
+    runs = []
+    try:
+        with open(history_file(powermode_dir)) as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(run, dict) and isinstance(run.get("features"), dict):
+                    runs.append(run)
+    except OSError:
+        pass
+    return runs
+
+
+def record_run(powermode_dir: Path, record: dict) -> None:
+    """Append a finished subagent's actuals to the history (SubagentStop)."""
+    if not record.get("features"):
+        return
+    limits = record.get("limits") or {}
+    run = {
+        "subagent_type": record.get("subagent_type", ""),
+        "features": record["features"],
+        "predicted_calls": record.get("predicted_calls"),
+        "tool_calls": int(record.get("tool_calls", 0)),
+        "file_reads": int(record.get("file_reads", 0)),
+        "tokens": int(record.get("tokens", 0)),
+        "duration_s": round(time.time() - float(record.get("started_at", time.time())), 1),
+        "capped": any(int(record.get(key, 0)) >= int(limit) for key, limit in limits.items() if limit),
+        "finished_at": time.time(),
+    }
+    path = history_file(powermode_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        if path.stat().st_size > MAX_HISTORY * 600:
+            runs = load_history(powermode_dir)[-MAX_HISTORY:]
+            path.write_text("".join(json.dumps(r) + "\n" for r in runs))
+    except OSError:
+        pass
+
+
+def solve(matrix: list[list[float]], vector: list[float]) -> list[float] | None:
+    """Gaussian elimination with partial pivoting; None if singular."""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n + 1):
+                a[r][c] -= factor * a[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (a[r][n] - sum(a[r][c] * x[c] for c in range(r + 1, n))) / a[r][r]
+    return x
+
+
+def fit_weights(runs: list[dict]) -> dict:
+    """Ridge fit of tool calls on features, shrunk towards DEFAULT_WEIGHTS."""
+    n = len(FEATURES)
+    xtx = [[RIDGE_LAMBDA if i == j else 0.0 for j in range(n)] for i in range(n)]
+    xty = [RIDGE_LAMBDA * DEFAULT_WEIGHTS[f] for f in FEATURES]
+    for run in runs:
+        x = [float(run["features"].get(f, 0.0)) for f in FEATURES]
+        y = float(run.get("tool_calls", 0))
+        for i in range(n):
+            xty[i] += x[i] * y
+            for j in range(n):
+                xtx[i][j] += x[i] * x[j]
+    solution = solve(xtx, xty)
+    if solution is None:
+        return dict(DEFAULT_WEIGHTS)
+    return {f: round(w, 4) for f, w in zip(FEATURES, solution)}
+
+
+def tokens_per_call(runs: list[dict]) -> float:
+    calls = sum(r.get("tool_calls", 0) for r in runs if r.get("tokens"))
+    tokens = sum(r.get("tokens", 0) for r in runs if r.get("tokens"))
+    return tokens / calls if calls else DEFAULT_TOKENS_PER_CALL
+
+
+def load_model(powermode_dir: Path) -> dict:
+    """Calibrated weights per subagent type ("*" = all runs), cached."""
+    try:
+        st = history_file(powermode_dir).stat()
+    except OSError:
+        return {}
+    key = f"{st.st_mtime_ns}:{st.st_size}"
+    model_file = powermode_dir / MODEL_NAME
+    cached = load_json(model_file)
+    if cached and cached.get("key") == key:
+        return cached.get("models", {})
+
+    # Capped runs are censored (true cost >= observed); fit on the rest
+    runs = [run for run in load_history(powermode_dir) if not run.get("capped")]
+    by_type: dict[str, list[dict]] = {"*": runs}
+    for run in runs:
+        by_type.setdefault(run.get("subagent_type", ""), []).append(run)
+    models = {
+        name: {
+            "weights": fit_weights(group),
+            "tokens_per_call": round(tokens_per_call(group), 1),
+            "samples": len(group),
+        }
+        for name, group in by_type.items()
+        if len(group) >= MIN_SAMPLES
+    }
+    save_json_atomic(model_file, {"key": key, "models": models})
+    return models
+
+
+def tier_for(calls: float) -> str:
+    for tier, limit in TIER_THRESHOLDS:
+        if calls < limit:
+            return tier
+    return "HIGH"
+
+
+def estimate(prompt: str, cwd: str, subagent_type: str = "") -> dict:
+    """Predicted tool calls, tokens and tier for a Task prompt."""
+    features = extract_features(prompt, cwd)
+    models = load_model(Path(cwd) / ".powermode") if cwd else {}
+    model = models.get(subagent_type.rsplit(":", 1)[-1]) or models.get("*")
+    weights = model["weights"] if model else DEFAULT_WEIGHTS
+    per_call = model["tokens_per_call"] if model else DEFAULT_TOKENS_PER_CALL
+
+    calls = max(1.0, sum(weights.get(f, 0.0) * features[f] for f in FEATURES))
+    return {
+        "tier": tier_for(calls),
+        "calls": round(calls),
+        "tokens": int(round(calls * per_call, -2)),
+        "calibrated": bool(model),
+        "samples": model["samples"] if model else 0,
+        "features": features,
+    }
@@ -6,11 +6,20 @@ from datetime import datetime, timezone
 from pathlib import Path
 import tempfile
 
+from active_project import record_touch
+from implementer_registry import heartbeat
+from touched_paths import record_edit
+
 CHARS_PER_TOKEN = 3.5
 CONTEXT_LIMIT = 500_000
 WARNING_70_PERCENT = int(CONTEXT_LIMIT * 0.70)
 WARNING_85_PERCENT = int(CONTEXT_LIMIT * 0.85)
 
+SUMMARY_NAME = "session-summary.json"
+RECENT_FILES = 10
+SUMMARY_FILES = 3
+SUMMARY_MAX_CHARS = 500
+
 
 def estimate_tokens(text: str) -> int:
     if not isinstance(text, str):
@@ -62,6 +71,46 @@ def extract_modified_files(tool_response: dict) -> list:
     return modified
 
 
+def build_summary_line(state: dict) -> str:
+    """One-line session summary injected on each prompt by context-summary-injector."""
+    files = state.get("recent_files") or state.get("modified_files", [])
+    total_files = len(state.get("modified_files", []))
+    files_str = ", ".join(files[:SUMMARY_FILES]) or "none"
+    if total_files > SUMMARY_FILES:
+        files_str += f", +{total_files - SUMMARY_FILES} more"
+
+    current_task = next(
+        (t.get("content", "") for t in state.get("todos", []) if t.get("status") == "in_progress"), ""
+    )
+    task_hint = f", task: {current_task[:60]}" if current_task else ""
+
+    line = (
+        f"[Session Context: ~{state['estimated_tokens'] / 1000:.0f}K tokens "
+        f"({state['percentage']:.0f}%), {state['tool_calls']} calls, "
+        f"modified: {files_str}{task_hint}]"
+    )
+    if len(line) > SUMMARY_MAX_CHARS:
+        line = line[: SUMMARY_MAX_CHARS - 4] + "...]"
+    return line
+
+
+def save_summary(summary_file: Path, state: dict) -> None:
+    """Small precomputed record so the prompt hook does one tiny read."""
+    save_state(summary_file, {
+        "session_id": state.get("session_id"),
+        "tool_calls": state["tool_calls"],
+        "line": build_summary_line(state),
+    })
+
+
+def extract_todos(tool_input: dict) -> list:
+    todos = []
+    for todo in tool_input.get("todos", []) or []:
+        if isinstance(todo, dict):
+            todos.append({"content": todo.get("content", ""), "status": todo.get("status", "")})
+    return todos
+
+
 def is_powermode_session(cwd: str, session_id: str) -> bool:
     """Check if powermode is active for this session."""
     if not cwd or not session_id:
@@ -87,6 +136,20 @@ def main():
     session_id = hook_input.get("session_id")
     cwd = hook_input.get("cwd", ".")
 
+    # Teammates/subagents: only their edited files (teammate-idle-guard scope)
+    if hook_input.get("agent_type", "").startswith("powermode:"):
+        tool_input = hook_input.get("tool_input")
+        if isinstance(tool_input, dict):
+            record_edit(
+                cwd, session_id or "", hook_input.get("tool_name", ""),
+                tool_input.get("file_path") or tool_input.get("notebook_path") or "",
+            )
+        # Any tool call by a registered implementer counts as a heartbeat
+        try:
+            heartbeat(Path(cwd) / ".powermode", hook_input.get("agent_id", ""))
+        except (IOError, OSError):
+            pass
+
     if not is_powermode_session(cwd, session_id or ""):
         print(json.dumps({"continue": True}))
         return
@@ -123,6 +186,16 @@ def main():
     modified = extract_modified_files(tool_response)
     if modified:
         state["modified_files"] = list(set(state["modified_files"] + modified))
+        recent = [f for f in state.get("recent_files", []) if f not in modified]
+        state["recent_files"] = (modified + recent)[:RECENT_FILES]
+
+    # Latest todo list, kept for recovery snapshots
+    if tool_name.lower() in ("todowrite", "mcp_todowrite") and isinstance(tool_input, dict):
+        state["todos"] = extract_todos(tool_input)
+
+    # Last-touched project pointer for session save/restore
+    if isinstance(tool_input, dict):
+        record_touch(cwd, tool_name, tool_input.get("file_path", ""), session_id)
 
     warnings = []
 
@@ -141,6 +214,7 @@ def main():
         )
 
     save_state(state_file, state)
+    save_summary(state_dir / SUMMARY_NAME, state)
 
     output = {"continue": True}
     if warnings:
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
+"""Context Summary Injector Hook (UserPromptSubmit)
+
+Injects a one-line session summary (tokens, tool calls, recently modified
+files, in-progress todo) once a powermode session has made 10+ tool calls.
+The line is precomputed by context-monitor.py in .powermode/session-summary.json.
+"""
 import json
 import sys
-import os
 from pathlib import Path
 
 
@@ -33,36 +38,17 @@ def main():
         json.dump({"continue": True}, sys.stdout)
         return
 
-    state_file = Path(cwd) / ".powermode" / "context-state.json"
+    # Precomputed by context-monitor on every tool call
+    summary_file = Path(cwd) / ".powermode" / "session-summary.json"
 
     additional_context = None
 
-    if state_file.exists():
-        try:
-            with open(state_file, "r") as f:
-                state = json.load(f)
-
-            tool_calls = state.get("tool_calls", 0)
-
-            if tool_calls >= 10:
-                tokens = state.get("tokens", 0)
-                token_percent = state.get("token_percent", 0)
-                modified_files = state.get("modified_files", [])
-                current_task = state.get("current_task", "")
-
-                files_str = ", ".join(modified_files[:3])
-                if len(modified_files) > 3:
-                    files_str += f", +{len(modified_files) - 3} more"
-
-                task_hint = f", task: {current_task[:30]}" if current_task else ""
-
-                additional_context = f"[Session Context: ~{tokens}K tokens ({token_percent}%), {tool_calls} calls, modified: {files_str}{task_hint}]"
-
-                if len(additional_context) > 500:
-                    additional_context = additional_context[:497] + "...]"
-
-        except (json.JSONDecodeError, ValueError, KeyError):
-            pass
+    try:
+        summary = json.loads(summary_file.read_text())
+        if summary.get("session_id") == session_id and summary.get("tool_calls", 0) >= 10:
+            additional_context = summary.get("line") or None
+    except (OSError, json.JSONDecodeError, ValueError, AttributeError):
+        pass
 
     output: dict = {"continue": True}
     if additional_context:
@@ -4,8 +4,13 @@
 BLOCKS direct Edit/Write when Power Mode is active. The delegation
 principle requires using pm-implementer for code changes.
 
+The active/implementer flags come from a per-session decision record
+(.powermode/decisions/<session>.json, see delegation_decision.py), so edits
+in non-powermode sessions cost one directory check and no path resolution.
+
 Bypass mechanisms:
-1. pm-implementer creates .powermode/implementer-session.json before editing
+1. A live pm-implementer for this session in .powermode/implementer-registry.json
+   (managed by implementer-lifecycle.py, see implementer_registry.py)
 2. Escape hatch after 10 blocked attempts (for edge cases)
 
 Fires on: PreToolUse (Edit, Write)
@@ -18,6 +23,9 @@ import json
 import sys
 from pathlib import Path
 
+from delegation_decision import is_within_root, load_decision
+from implementer_registry import heartbeat
+
 ESCAPE_THRESHOLD = 10
 
 BLOCK_MSG = """[EDIT DENIED - POLICY VIOLATION]
@@ -58,39 +66,6 @@ def save_json(path: Path, data: dict) -> None:
         pass
 
 
-def check_implementer_session(powermode_dir: Path, session_id: str = "") -> bool:
-    """Check if pm-implementer has an active session.
-
-    Session files are managed by implementer-lifecycle.py via
-    SubagentStart/SubagentStop hooks — no expiry needed.
-    Supports multiple concurrent implementers (team mode) via
-    implementer-sessions/ directory with per-agent files.
-    """
-    # Check new multi-agent directory first
-    sessions_dir = powermode_dir / "implementer-sessions"
-    if sessions_dir.is_dir():
-        for session_file in sessions_dir.glob("*.json"):
-            session = load_json(session_file)
-            if not session:
-                continue
-            if session.get("agent") != "pm-implementer":
-                continue
-            if session_id and session.get("session_id") != session_id:
-                continue
-            return True
-
-    # Backward compat: check legacy single file
-    session_file = powermode_dir / "implementer-session.json"
-    session = load_json(session_file)
-    if not session:
-        return False
-    if session.get("agent") != "pm-implementer":
-        return False
-    if session_id and session.get("session_id") != session_id:
-        return False
-    return True
-
-
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
@@ -108,36 +83,23 @@ def main():
     cwd = input_data.get("cwd", ".")
     session_id = input_data.get("session_id", "")
 
-    # Allow writes to .powermode/ state files (not project code)
-    target_path = tool_input.get("file_path", "")
-    if target_path:
-        try:
-            powermode_path = Path(cwd) / ".powermode"
-            if Path(target_path).resolve().is_relative_to(powermode_path.resolve()):
-                print(json.dumps({
-                    "hookSpecificOutput": {
-                        "hookEventName": "PreToolUse",
-                        "permissionDecision": "allow",
-                        "updatedInput": {**tool_input},
-                    }
-                }))
-                return
-        except (ValueError, OSError):
-            pass
-
-    powermode_dir = Path(cwd) / ".powermode"
-    active_mode_file = powermode_dir / "active-mode.json"
-    state_file = powermode_dir / "delegation-state.json"
+    # One small per-session record decides the common cases without
+    # resolving paths or reading mode/registry files
+    decision = load_decision(cwd, session_id)
 
-    mode_data = load_json(active_mode_file)
-    # Only consider powermode active if it's from the same session
-    powermode_active = (
-        mode_data
-        and mode_data.get("mode") == "powermode"
-        and mode_data.get("session_id") == session_id
-    )
+    if not decision.get("active"):
+        print(json.dumps({
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "allow",
+                "updatedInput": {**tool_input},
+            }
+        }))
+        return
 
-    if not powermode_active:
+    # Allow writes to .powermode/ state files (not project code)
+    target_path = tool_input.get("file_path", "")
+    if target_path and is_within_root(target_path, cwd, decision):
         print(json.dumps({
             "hookSpecificOutput": {
                 "hookEventName": "PreToolUse",
@@ -147,7 +109,12 @@ def main():
         }))
         return
 
-    if check_implementer_session(powermode_dir, session_id):
+    if decision.get("implementer"):
+        # Only the implementer's own edits keep its registry entry alive
+        try:
+            heartbeat(Path(cwd) / ".powermode", input_data.get("agent_id", ""))
+        except (IOError, OSError):
+            pass
         print(json.dumps({
             "hookSpecificOutput": {
                 "hookEventName": "PreToolUse",
@@ -158,6 +125,7 @@ def main():
         }))
         return
 
+    state_file = Path(cwd) / ".powermode" / "delegation-state.json"
     state = load_json(state_file) or {}
     session_state = state.get(session_id, {}) if session_id else state
     attempt_count = session_state.get("direct_edit_attempts", 0) + 1
@@ -0,0 +1,114 @@
+"""Per-session delegation decision records (.powermode/decisions/<session>.json)
+
+delegation-enforcer runs before every Edit/Write. Instead of resolving paths
+and loading active-mode.json, the implementer registry and delegation state
+each time, it reads one small record:
+
+  {"active": bool, "implementer": bool, "root": "<resolved .powermode>",
+   "mode_mtime_ns": ..., "checked_at": ...}
+
+The record is rebuilt when:
+- it does not exist (implementer-lifecycle and registry repair delete the
+  records whenever the implementer set changes)
+- active-mode.json changed since it was built (one stat, no read)
+- it says an implementer is present and is older than RECHECK_SECONDS, so a
+  crashed implementer still expires (the rebuild never heartbeats; only the
+  implementer's own calls do, see implementer_registry.heartbeat)
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from implementer_registry import active_implementer
+from pm_common import load_json, save_json_atomic, session_file
+
+DECISIONS_DIR_NAME = "decisions"
+RECHECK_SECONDS = 60
+
+
+def decision_file(powermode_dir: Path, session_id: str) -> Path:
+    return session_file(powermode_dir / DECISIONS_DIR_NAME, session_id)
+
+
+def active_mode_mtime(powermode_dir: Path) -> int | None:
+    try:
+        return os.stat(powermode_dir / "active-mode.json").st_mtime_ns
+    except OSError:
+        return None
+
+
+def implementer_present(powermode_dir: Path, session_id: str) -> bool:
+    """Live pm-implementer for the session (reaps expired registry entries).
+
+    Falls back to the legacy single file when no registry exists yet.
+    """
+    if active_implementer(powermode_dir, session_id, heartbeat=False) is not None:
+        return True
+    if (powermode_dir / "implementer-registry.json").exists():
+        return False
+
+    session = load_json(powermode_dir / "implementer-session.json")
+    if not session or session.get("agent") != "pm-implementer":
+        return False
+    return not session_id or session.get("session_id") == session_id
+
+
+def build_decision(powermode_dir: Path, session_id: str, mode_mtime_ns: int | None) -> dict:
+    mode_data = load_json(powermode_dir / "active-mode.json") if mode_mtime_ns else None
+    active = bool(
+        mode_data
+        and mode_data.get("mode") == "powermode"
+        and mode_data.get("session_id") == session_id
+    )
+    implementer = active and implementer_present(powermode_dir, session_id)
+    try:
+        root = str(powermode_dir.resolve())
+    except OSError:
+        root = os.path.abspath(powermode_dir)
+    return {
+        "session_id": session_id,
+        "active": active,
+        "implementer": implementer,
+        "root": root,
+        "mode_mtime_ns": mode_mtime_ns,
+        "checked_at": time.time(),
+    }
+
+
+def load_decision(cwd: str, session_id: str) -> dict:
+    """Delegation decision for a session, rebuilt only when stale."""
+    powermode_dir = Path(cwd) / ".powermode"
+    if not session_id or not os.path.isdir(powermode_dir):
+        # active-mode.json is only written with a session id, inside .powermode
+        return {"active": False, "implementer": False, "root": ""}
+
+    mode_mtime_ns = active_mode_mtime(powermode_dir)
+    record_file = decision_file(powermode_dir, session_id)
+    record = load_json(record_file)
+    if (
+        record
+        and record.get("mode_mtime_ns") == mode_mtime_ns
+        and not (
+            record.get("implementer")
+            and time.time() - float(record.get("checked_at", 0)) > RECHECK_SECONDS
+        )
+    ):
+        return record
+
+    record = build_decision(powermode_dir, session_id, mode_mtime_ns)
+    save_json_atomic(record_file, record)
+    return record
+
+
+def invalidate_decisions(powermode_dir: Path) -> None:
+    """Drop all decision records (implementer set changed)."""
+    shutil.rmtree(powermode_dir / DECISIONS_DIR_NAME, ignore_errors=True)
+
+
+def is_within_root(target_path: str, cwd: str, decision: dict) -> bool:
+    """Path-prefix check against .powermode without touching the filesystem."""
+    target = os.path.abspath(os.path.join(cwd, target_path))
+    roots = {decision.get("root", ""), os.path.abspath(os.path.join(cwd, ".powermode"))}
+    return any(root and (target == root or target.startswith(root + os.sep)) for root in roots)
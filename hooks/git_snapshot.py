@@ -0,0 +1,267 @@
+"""Shared git status/HEAD snapshot (.powermode/git-snapshot.json)
+
+task-completion-guard, teammate-idle-guard and the verification queue all
+need `git status` of the same worktree, often seconds apart. The snapshot
+caches porcelain status entries and HEAD per worktree, keyed by:
+
+  - the worktree root
+  - .git/index mtime/size (staging, commits, checkouts and git's own
+    stat refresh all rewrite it)
+  - the HEAD file and the ref it points at (mtime/size of the loose ref,
+    or packed-refs)
+
+A hit costs a few stat calls instead of a full status walk. Unstaged edits
+to tracked files and new untracked files do not touch the index, so a hit
+is only trusted for max_age_seconds; callers that must see the current
+tree (implementer start/stop) pass max_age=0 and refresh the cache for
+everyone else.
+
+The snapshot uses git's default --untracked-files=normal, so a new
+untracked directory is one "dir/" entry and git never walks inside it.
+Callers that need every file path (the verification queue fingerprint)
+expand just those directories with expand_untracked_dirs.
+
+Config (powermode.json):
+  "git_snapshot": {"max_age_seconds": 3}
+"""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from pm_common import config_section, load_json, save_json_atomic
+
+SNAPSHOT_NAME = "git-snapshot.json"
+DEFAULT_CONFIG = {"max_age_seconds": 3}
+# Worktrees whose snapshots are kept (git worktrees share one .powermode)
+MAX_WORKTREES = 8
+
+
+def snapshot_file(cwd: str) -> Path:
+    return Path(cwd) / ".powermode" / SNAPSHOT_NAME
+
+
+def find_git_dirs(cwd: str) -> tuple[str, str, str] | None:
+    """(worktree root, git dir, common dir) without running git."""
+    path = os.path.abspath(cwd)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return path, dot_git, dot_git
+        if os.path.isfile(dot_git):
+            # Linked worktree or submodule: ".git" is a "gitdir: <path>" file
+            try:
+                with open(dot_git) as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = os.path.join(path, line[len("gitdir:"):].strip())
+            common_dir = git_dir
+            try:
+                with open(os.path.join(git_dir, "commondir")) as f:
+                    common_dir = os.path.join(git_dir, f.read().strip())
+            except OSError:
+                pass
+            return path, os.path.normpath(git_dir), os.path.normpath(common_dir)
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def stat_key(path: str) -> list | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def snapshot_key(root: str, git_dir: str, common_dir: str) -> dict:
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        head = ""
+    ref = None
+    if head.startswith("ref: "):
+        ref_name = head[5:]
+        ref = stat_key(os.path.join(common_dir, ref_name)) or stat_key(os.path.join(common_dir, "packed-refs"))
+    return {
+        "root": root,
+        "index": stat_key(os.path.join(git_dir, "index")),
+        "head": head,
+        "ref": ref,
+    }
+
+
+def run_git(cwd: str, *args: str, timeout: float = 5) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=cwd, timeout=timeout
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def parse_porcelain(out: str) -> list[list[str]]:
+    """[[XY, path], ...] from `git status --porcelain=v1 -z`."""
+    entries = []
+    fields = out.split("\0")
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        i += 1
+        if len(field) < 4:
+            continue
+        entries.append([field[:2], field[3:]])
+        if field[0] in "RC":
+            # Renames/copies are followed by the original path
+            i += 1
+    return entries
+
+
+def take_snapshot(root: str) -> dict | None:
+    out = run_git(root, "status", "--porcelain=v1", "-z", "--untracked-files=normal")
+    if out is None:
+        return None
+    head = run_git(root, "rev-parse", "--verify", "-q", "HEAD", timeout=3)
+    return {
+        "head_ref": head.strip() if head else None,
+        "entries": parse_porcelain(out),
+        "taken_at": time.time(),
+    }
+
+
+def snapshot(cwd: str, max_age: float | None = None, refresh: bool = True) -> dict | None:
+    """Cached {"root", "head_ref", "entries", "taken_at"} for cwd's worktree.
+
+    Paths in entries are relative to the worktree root. None outside a git
+    repository or when git fails, and on a cache miss with refresh=False
+    (callers that must never wait for a status walk).
+    """
+    dirs = find_git_dirs(cwd)
+    if not dirs:
+        return None
+    root, git_dir, common_dir = dirs
+    if max_age is None:
+        max_age = config_section(cwd, "git_snapshot", DEFAULT_CONFIG).get("max_age_seconds", 3)
+
+    cache_file = snapshot_file(cwd)
+    cache = load_json(cache_file) or {}
+    worktrees = cache.get("worktrees") if isinstance(cache.get("worktrees"), dict) else {}
+    key = snapshot_key(root, git_dir, common_dir)
+    cached = worktrees.get(root)
+    if (
+        cached
+        and cached.get("key") == key
+        and time.time() - cached.get("taken_at", 0) <= max_age
+    ):
+        return {"root": root, **{k: cached[k] for k in ("head_ref", "entries", "taken_at")}}
+    if not refresh:
+        return None
+
+    fresh = take_snapshot(root)
+    if fresh is None:
+        return None
+    # git status may refresh the index's stat data, which rewrites it
+    fresh["key"] = snapshot_key(root, git_dir, common_dir)
+    if cache_file.parent.is_dir():
+        worktrees.pop(root, None)
+        worktrees[root] = fresh
+        while len(worktrees) > MAX_WORKTREES:
+            worktrees.pop(next(iter(worktrees)))
+        save_json_atomic(cache_file, {"worktrees": worktrees})
+    return {"root": root, **{k: fresh[k] for k in ("head_ref", "entries", "taken_at")}}
+
+
+def dirty_paths(cwd: str, max_age: float | None = None) -> list[str] | None:
+    """Paths git status reports as modified, staged, deleted or untracked."""
+    snap = snapshot(cwd, max_age)
+    return None if snap is None else [path for _, path in snap["entries"]]
+
+
+def head_ref(cwd: str, max_age: float | None = None) -> str | None:
+    snap = snapshot(cwd, max_age)
+    return snap["head_ref"] if snap else None
+
+
+def expand_untracked_dirs(root: str, entries: list[list[str]], timeout: float = 4) -> list[list[str]]:
+    """entries with each untracked "dir/" replaced by the files inside it.
+
+    Walks only those directories; returns entries unchanged if git fails.
+    """
+    untracked_dirs = [path for xy, path in entries if xy == "??" and path.endswith("/")]
+    if not untracked_dirs:
+        return entries
+    specs = [f":(top,literal){path}" for path in untracked_dirs]
+    out = run_git(root, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", *specs, timeout=timeout)
+    if out is None:
+        return entries
+    expanded = [[xy, path] for xy, path in entries if not (xy == "??" and path.endswith("/"))]
+    expanded += [[xy, path] for xy, path in parse_porcelain(out) if xy == "??"]
+    return expanded
+
+
+def read_head_ref(cwd: str) -> str | None:
+    """Commit HEAD points at, read from the ref files without running git."""
+    dirs = find_git_dirs(cwd)
+    if not dirs:
+        return None
+    _, git_dir, common_dir = dirs
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        return head or None
+    ref_name = head[5:]
+    try:
+        with open(os.path.join(common_dir, ref_name)) as f:
+            return f.read().strip() or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "packed-refs")) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref_name:
+                    return parts[0]
+    except OSError:
+        pass
+    # Unborn branch (no commits yet)
+    return None
+
+
+def glob_escape(path: str) -> str:
+    return "".join("\\" + c if c in "*?[]\\" else c for c in path)
+
+
+def scoped_dirty_paths(cwd: str, paths: list[str], timeout: float = 4) -> list[str] | None:
+    """Uncommitted paths among `paths` (root-relative) plus untracked files
+    directly inside their directories; never walks the rest of the tree.
+
+    Not cached: the pathspec makes it cheap, and callers want it current.
+    """
+    dirs = find_git_dirs(cwd)
+    if not dirs or not paths:
+        return None
+    root = dirs[0]
+    wanted = set(paths)
+    parents = {os.path.dirname(p) for p in wanted}
+    specs = [f":(top,literal){p}" for p in sorted(wanted)]
+    specs += [f":(top,glob){glob_escape(d)}/*" if d else ":(top,glob)*" for d in sorted(parents)]
+    out = run_git(root, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", *specs, timeout=timeout)
+    if out is None:
+        return None
+    # Tracked changes only count for the given paths; other files in the same
+    # directories may belong to another teammate
+    return [
+        path for xy, path in parse_porcelain(out)
+        if path in wanted or (xy == "??" and os.path.dirname(path) in parents)
+    ]
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """Implementer Lifecycle Hook (SubagentStart + SubagentStop: powermode:implementer)
 
-Manages the implementer session file lifecycle:
-- SubagentStart: Creates .powermode/implementer-session.json
-- SubagentStop: Deletes .powermode/implementer-session.json
+Manages the implementer session registry (see implementer_registry.py):
+- SubagentStart: Registers the agent in .powermode/implementer-registry.json
+- SubagentStop: Removes it (the legacy implementer-session.json view goes
+  away with the last entry)
+- Queues a verification record per implementer (see verification_queue.py):
+  start git ref on SubagentStart; on SubagentStop the record is marked
+  pending first and the git work (stop ref, changed paths) runs last
+- Both drop the delegation decision records so delegation-enforcer sees the
+  change on the next edit
 
 Replaces the old timestamp-based session hack in task-containment-enforcer.
 
@@ -17,6 +23,10 @@ import json
 import sys
 from pathlib import Path
 
+from delegation_decision import invalidate_decisions
+from implementer_registry import register, unregister
+from verification_queue import enrich_stopped, mark_stopped, record_start
+
 
 def main():
     try:
@@ -32,26 +42,17 @@ def main():
     cwd = input_data.get("cwd", ".")
 
     powermode_dir = Path(cwd) / ".powermode"
-    sessions_dir = powermode_dir / "implementer-sessions"
-    # Per-agent session file supports multiple concurrent implementers (team mode)
-    session_file = sessions_dir / f"{agent_id}.json"
-    legacy_file = powermode_dir / "implementer-session.json"
 
     if hook_event == "SubagentStart":
         try:
-            session_id = input_data.get("session_id", "")
-            sessions_dir.mkdir(parents=True, exist_ok=True)
-            session_file.write_text(json.dumps({
-                "agent": "pm-implementer",
-                "agent_id": agent_id,
-                "session_id": session_id,
-            }))
-            # Also write legacy file for backward compat
-            legacy_file.write_text(json.dumps({
-                "agent": "pm-implementer",
-                "agent_id": agent_id,
-                "session_id": session_id,
-            }))
+            # Registry keyed by agent_id supports concurrent implementers (team mode)
+            register(powermode_dir, agent_id, input_data.get("session_id", ""))
+            invalidate_decisions(powermode_dir)
+        except (IOError, OSError):
+            pass
+
+        try:
+            record_start(powermode_dir, agent_id, input_data.get("session_id", ""), cwd)
         except (IOError, OSError):
             pass
 
@@ -63,26 +64,22 @@ def main():
         }))
 
     elif hook_event == "SubagentStop":
+        # Queue this implementer's work for verification before anything
+        # slow, so a hook timeout never loses the pending record
+        try:
+            mark_stopped(powermode_dir, agent_id, input_data.get("session_id", ""))
+        except (IOError, OSError):
+            pass
+
         try:
-            if session_file.exists():
-                session_file.unlink()
-            # Only remove legacy file if no other sessions remain
-            remaining = list(sessions_dir.glob("*.json")) if sessions_dir.is_dir() else []
-            if not remaining:
-                if legacy_file.exists():
-                    legacy_file.unlink()
-                if sessions_dir.is_dir():
-                    sessions_dir.rmdir()
+            unregister(powermode_dir, agent_id)
+            invalidate_decisions(powermode_dir)
         except (IOError, OSError):
             pass
 
-        # Signal that verification is needed
-        pending_file = powermode_dir / "pending-verification.json"
+        # Git work last: stop ref, changed paths and diff stats
         try:
-            pending_file.write_text(json.dumps({
-                "agent_id": agent_id,
-                "awaiting_verifier": True,
-            }))
+            enrich_stopped(powermode_dir, agent_id, cwd)
         except (IOError, OSError):
             pass
 
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Implementer session registry (.powermode/implementer-registry.json)
+
+One file keyed by agent_id replaces the per-agent files in
+.powermode/implementer-sessions/. Each entry records the owning session,
+start time and last heartbeat. Every read-modify-write holds an flock on
+.powermode/implementer-registry.lock, so concurrent implementers (team mode)
+do not drop each other's entries.
+
+- implementer-lifecycle.py registers on SubagentStart, removes on SubagentStop
+- delegation-enforcer.py (allowed edits) and context-monitor.py (tool calls)
+  heartbeat the entry whose agent_id matches the calling agent
+- Entries expire when the heartbeat is older than ttl_minutes (a crashed
+  implementer never reaches SubagentStop)
+
+.powermode/implementer-session.json is still written as a read-compatible
+view of the most recently started live entry, and removed when none remain.
+
+Config (powermode.json):
+  "implementer_registry": {"ttl_minutes": 30}
+
+Repair (clears orphaned entries; --all clears everything):
+  python3 hooks/implementer_registry.py repair [--all] [project-dir]
+"""
+
+import fcntl
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from pm_common import config_section, load_json, save_json_atomic
+
+REGISTRY_NAME = "implementer-registry.json"
+LOCK_NAME = "implementer-registry.lock"
+LEGACY_FILE_NAME = "implementer-session.json"
+LEGACY_DIR_NAME = "implementer-sessions"
+
+DEFAULT_CONFIG = {"ttl_minutes": 30}
+
+# Heartbeats within this many seconds of the last one skip the write
+HEARTBEAT_SECONDS = 30
+
+
+def registry_file(powermode_dir: Path) -> Path:
+    return powermode_dir / REGISTRY_NAME
+
+
+@contextmanager
+def registry_lock(powermode_dir: Path):
+    """Exclusive lock around a registry read-modify-write."""
+    powermode_dir.mkdir(parents=True, exist_ok=True)
+    with open(powermode_dir / LOCK_NAME, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_config(powermode_dir: Path) -> dict:
+    return config_section(str(powermode_dir.parent), "implementer_registry", DEFAULT_CONFIG)
+
+
+def load_registry(powermode_dir: Path) -> dict | None:
+    """Registry contents, or None when no registry has been written yet."""
+    data = load_json(registry_file(powermode_dir))
+    if data is None:
+        return None
+    data.setdefault("agents", {})
+    data.setdefault("sessions", {})
+    return data
+
+
+def empty_registry() -> dict:
+    return {"agents": {}, "sessions": {}}
+
+
+def migrate_legacy_dir(powermode_dir: Path, registry: dict) -> None:
+    """Fold per-agent files from older plugin versions into the registry."""
+    sessions_dir = powermode_dir / LEGACY_DIR_NAME
+    if not sessions_dir.is_dir():
+        return
+    now = time.time()
+    for session_file in sessions_dir.glob("*.json"):
+        session = load_json(session_file)
+        if session and session.get("agent") == "pm-implementer":
+            agent_id = session.get("agent_id") or session_file.stem
+            try:
+                started = session_file.stat().st_mtime
+            except OSError:
+                started = now
+            registry["agents"].setdefault(agent_id, {
+                "agent": "pm-implementer",
+                "agent_id": agent_id,
+                "session_id": session.get("session_id", ""),
+                "started_at": started,
+                "heartbeat_at": started,
+            })
+        try:
+            session_file.unlink()
+        except OSError:
+            pass
+    try:
+        sessions_dir.rmdir()
+    except OSError:
+        pass
+    rebuild_session_map(registry)
+
+
+def rebuild_session_map(registry: dict) -> None:
+    sessions: dict[str, list[str]] = {}
+    for agent_id, entry in registry["agents"].items():
+        sessions.setdefault(entry.get("session_id", ""), []).append(agent_id)
+    registry["sessions"] = sessions
+
+
+def save_registry(powermode_dir: Path, registry: dict) -> None:
+    rebuild_session_map(registry)
+    save_json_atomic(registry_file(powermode_dir), registry)
+    write_legacy_view(powermode_dir, registry)
+
+
+def write_legacy_view(powermode_dir: Path, registry: dict) -> None:
+    legacy_file = powermode_dir / LEGACY_FILE_NAME
+    agents = registry["agents"]
+    if not agents:
+        try:
+            legacy_file.unlink()
+        except OSError:
+            pass
+        return
+    newest = max(agents.values(), key=lambda e: e.get("started_at", 0))
+    save_json_atomic(legacy_file, {
+        "agent": "pm-implementer",
+        "agent_id": newest.get("agent_id", ""),
+        "session_id": newest.get("session_id", ""),
+    })
+
+
+def is_expired(entry: dict, config: dict, now: float) -> bool:
+    idle = now - float(entry.get("heartbeat_at") or entry.get("started_at") or 0)
+    return idle > float(config["ttl_minutes"]) * 60
+
+
+def reap(registry: dict, config: dict, now: float | None = None) -> list[str]:
+    """Drop expired entries; returns the removed agent ids."""
+    now = time.time() if now is None else now
+    expired = [aid for aid, entry in registry["agents"].items() if is_expired(entry, config, now)]
+    for agent_id in expired:
+        registry["agents"].pop(agent_id, None)
+    if expired:
+        rebuild_session_map(registry)
+    return expired
+
+
+def register(powermode_dir: Path, agent_id: str, session_id: str) -> None:
+    with registry_lock(powermode_dir):
+        registry = load_registry(powermode_dir) or empty_registry()
+        migrate_legacy_dir(powermode_dir, registry)
+        reap(registry, load_config(powermode_dir))
+        now = time.time()
+        registry["agents"][agent_id] = {
+            "agent": "pm-implementer",
+            "agent_id": agent_id,
+            "session_id": session_id,
+            "started_at": now,
+            "heartbeat_at": now,
+        }
+        save_registry(powermode_dir, registry)
+
+
+def unregister(powermode_dir: Path, agent_id: str) -> int:
+    """Remove an agent; returns how many implementers remain registered."""
+    with registry_lock(powermode_dir):
+        registry = load_registry(powermode_dir) or empty_registry()
+        migrate_legacy_dir(powermode_dir, registry)
+        registry["agents"].pop(agent_id, None)
+        reap(registry, load_config(powermode_dir))
+        save_registry(powermode_dir, registry)
+        return len(registry["agents"])
+
+
+def heartbeat(powermode_dir: Path, agent_id: str) -> bool:
+    """Refresh the heartbeat of agent_id's own entry; False if it has none.
+
+    Only the implementer itself heartbeats, so main-agent activity in the
+    same session never keeps a dead implementer's entry alive.
+    """
+    if not agent_id:
+        return False
+    registry = load_registry(powermode_dir)
+    entry = registry["agents"].get(agent_id) if registry else None
+    if not entry:
+        return False
+    if time.time() - float(entry.get("heartbeat_at") or 0) < HEARTBEAT_SECONDS:
+        return True
+
+    with registry_lock(powermode_dir):
+        registry = load_registry(powermode_dir)
+        entry = registry["agents"].get(agent_id) if registry else None
+        if not entry:
+            return False
+        entry["heartbeat_at"] = time.time()
+        save_registry(powermode_dir, registry)
+    return True
+
+
+def active_implementer(powermode_dir: Path, session_id: str = "", heartbeat: bool = False) -> dict | None:
+    """Live implementer entry for the session (any session if session_id is empty).
+
+    heartbeat=True refreshes the returned entry; only pass it when the caller
+    is that implementer. Returns None when the registry does not exist yet;
+    callers fall back to the legacy single file written by older plugin
+    versions.
+    """
+    registry = load_registry(powermode_dir)
+    if registry is None:
+        return None
+
+    config = load_config(powermode_dir)
+    now = time.time()
+    if session_id:
+        candidates = registry["sessions"].get(session_id, [])
+    else:
+        candidates = list(registry["agents"])
+
+    live = None
+    expired = []
+    for agent_id in candidates:
+        entry = registry["agents"].get(agent_id)
+        if not entry:
+            continue
+        if is_expired(entry, config, now):
+            expired.append(agent_id)
+            continue
+        live = entry
+        break
+
+    if not expired and not (live and heartbeat):
+        return live
+
+    with registry_lock(powermode_dir):
+        # Re-read under the lock so concurrent registrations survive the save
+        registry = load_registry(powermode_dir) or empty_registry()
+        for agent_id in expired:
+            entry = registry["agents"].get(agent_id)
+            if entry and is_expired(entry, config, now):
+                registry["agents"].pop(agent_id, None)
+        if live and heartbeat and live["agent_id"] in registry["agents"]:
+            registry["agents"][live["agent_id"]]["heartbeat_at"] = now
+            live = registry["agents"][live["agent_id"]]
+        save_registry(powermode_dir, registry)
+    return live
+
+
+def repair(powermode_dir: Path, clear_all: bool = False) -> list[str]:
+    with registry_lock(powermode_dir):
+        registry = load_registry(powermode_dir) or empty_registry()
+        migrate_legacy_dir(powermode_dir, registry)
+        if clear_all:
+            removed = list(registry["agents"])
+            registry["agents"] = {}
+        else:
+            removed = reap(registry, load_config(powermode_dir))
+        save_registry(powermode_dir, registry)
+        return removed
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] != "repair":
+        print("Usage: implementer_registry.py repair [--all] [project-dir]", file=sys.stderr)
+        sys.exit(1)
+    clear_all = "--all" in args
+    rest = [a for a in args[1:] if a != "--all"]
+    project_dir = Path(rest[0]) if rest else Path.cwd()
+    removed = repair(project_dir / ".powermode", clear_all)
+    # Imported here: delegation_decision depends on this module
+    from delegation_decision import invalidate_decisions
+    invalidate_decisions(project_dir / ".powermode")
+    print(json.dumps({"removed": removed}))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,27 @@ Detects special keywords in user prompts and injects mode-specific context:
 - "ultrawork" / "ulw" - Maximum intensity mode
 - "think" / "reason" / "analyze deeply" - Extended thinking mode
 
+Teams can add their own triggers with keyword packs: JSON files in
+.claude/keywords/*.json (project) or ~/.claude/keywords/*.json (user),
+using the same shape as the built-ins below:
+
+{
+  "modes": {"data-eng": "[DATA ENGINEERING MODE]\n..."},
+  "persistent": {"^/data-eng\\b": "data-eng"},
+  "transient": {"\\bbackfill\\b": "[BACKFILL]\n..."}
+}
+
+Patterns are matched against the lowercased prompt (multiline), as the
+built-ins always were. Each pack's patterns are merged into one regex so the
+prompt is scanned once; a pack whose patterns don't compile (alone or in the
+merged regex) is skipped, and patterns using numbered backreferences, which
+the merge would renumber, are matched on their own. The merged spec is
+cached in ~/.claude/powermode/keyword-cache.json, keyed by pack file mtimes.
+
+Only "powermode" is stored in .powermode/active-mode.json (the delegation,
+containment and stop hooks check it); pack modes are kept per session in
+.powermode/pack-modes.json so activating one never turns powermode off.
+
 Exit codes:
 - 0: Context added to stdout (will be injected)
 """
@@ -15,8 +36,19 @@ import json
 import sys
 import re
 import os
+import hashlib
 from pathlib import Path
 
+from pm_common import load_json, save_json_atomic, user_state_dir
+
+CACHE_FILE_NAME = "keyword-cache.json"
+CACHE_MAX_KEYS = 10
+PACK_MODES_FILE = "pack-modes.json"
+PACK_MODES_MAX_SESSIONS = 20
+# \1 .. \99 outside a character class; renumbered by the merge
+NUMBERED_BACKREF = re.compile(r"(?<!\\)\\[1-9]")
+NAMED_GROUP = re.compile(r"\(\?P[<=]")
+
 # Persistent modes - these stay active for the entire session once triggered
 PERSISTENT_MODES = {
     r"# Power Mode|^/powermode\b|^/pm-plan\b": "powermode",
@@ -68,6 +100,174 @@ The plan should have atomic, verifiable tasks.
 }
 
 
+BUILTIN_PACK = {
+    "modes": MODE_CONTEXTS,
+    "persistent": PERSISTENT_MODES,
+    "transient": TRANSIENT_KEYWORDS,
+}
+
+
+def pack_files(cwd: str) -> list[Path]:
+    """Keyword pack files, project-level before user-level."""
+    dirs = []
+    if cwd:
+        dirs.append(Path(cwd) / ".claude" / "keywords")
+    dirs.append(Path.home() / ".claude" / "keywords")
+    files = []
+    for pack_dir in dirs:
+        try:
+            files.extend(sorted(pack_dir.glob("*.json")))
+        except OSError:
+            continue
+    return files
+
+
+def merged_pattern(alternatives: list[tuple[int, str]]) -> str:
+    """One scan for all triggers.
+
+    The leading lookahead only stops finditer where some trigger starts.
+    Every trigger then gets its own optional lookahead group, so all
+    triggers starting at the same position are captured, not just the
+    first alternative that matches (e.g. "ulw" and "ulw mode").
+    """
+    if not alternatives:
+        return ""
+    gate = "(?=" + "|".join(f"(?:{pattern})" for _, pattern in alternatives) + ")"
+    return gate + "".join(f"(?=(?P<k{index}>{pattern}))?" for index, pattern in alternatives)
+
+
+def pack_entries(pack: dict) -> list[tuple[str, str, str]] | None:
+    """(kind, pattern, payload) per trigger, or None if any pattern is invalid."""
+    entries = []
+    for kind in ("persistent", "transient"):
+        table = pack.get(kind, {})
+        for pattern, payload in (table.items() if isinstance(table, dict) else []):
+            if not isinstance(payload, str):
+                continue
+            try:
+                re.compile(pattern, re.MULTILINE)
+            except (re.error, TypeError):
+                return None
+            entries.append((kind, pattern, payload))
+    return entries
+
+
+def build_spec(packs: list[dict]) -> dict:
+    """Merge packs into one alternation pattern plus a group -> action table.
+
+    Each entry becomes its own optional lookahead group (see merged_pattern),
+    so overlapping triggers and triggers sharing a start are all reported.
+    Entries with backreferences or their own named groups, which cannot be
+    repeated in the gate and the group, go to "standalone" instead.
+    """
+    modes: dict = {}
+    actions = []
+    transient_contexts = []
+    alternatives = []
+    standalone = []
+    for pack in packs:
+        entries = pack_entries(pack)
+        if entries is None:
+            continue
+        pack_actions = []
+        pack_alternatives = []
+        pack_standalone = []
+        pack_contexts = []
+        for kind, pattern, payload in entries:
+            index = len(actions) + len(pack_actions)
+            if kind == "persistent":
+                pack_actions.append(["persistent", payload])
+            else:
+                pack_actions.append(["transient", len(transient_contexts) + len(pack_contexts)])
+                pack_contexts.append(payload)
+            if NUMBERED_BACKREF.search(pattern) or NAMED_GROUP.search(pattern):
+                pack_standalone.append([pattern, index])
+            else:
+                pack_alternatives.append((index, pattern))
+        try:
+            # Group names inside a pack can clash with earlier packs
+            re.compile(merged_pattern(alternatives + pack_alternatives), re.MULTILINE)
+        except re.error:
+            continue
+        pack_modes = pack.get("modes", {})
+        if isinstance(pack_modes, dict):
+            modes.update({k: v for k, v in pack_modes.items() if isinstance(v, str)})
+        actions.extend(pack_actions)
+        alternatives.extend(pack_alternatives)
+        standalone.extend(pack_standalone)
+        transient_contexts.extend(pack_contexts)
+
+    return {
+        "pattern": merged_pattern(alternatives),
+        "standalone": standalone,
+        "actions": actions,
+        "modes": modes,
+        "transient_contexts": transient_contexts,
+    }
+
+
+def load_spec(cwd: str) -> dict:
+    """Merged keyword spec, served from the disk cache while packs are unchanged."""
+    files = pack_files(cwd)
+    stamp = [__file__]
+    for path in [Path(__file__)] + files:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stamp.append([str(path), st.st_mtime_ns, st.st_size])
+    key = hashlib.sha256(json.dumps(stamp).encode()).hexdigest()[:16]
+
+    if not files:
+        return build_spec([BUILTIN_PACK])
+
+    cache_file = user_state_dir() / CACHE_FILE_NAME
+    cache = load_json(cache_file) or {}
+    if key in cache:
+        return cache[key]
+
+    packs = [BUILTIN_PACK]
+    for path in files:
+        pack = load_json(path)
+        if pack:
+            packs.append(pack)
+    spec = build_spec(packs)
+
+    cache.pop(key, None)
+    cache[key] = spec
+    while len(cache) > CACHE_MAX_KEYS:
+        cache.pop(next(iter(cache)))
+    save_json_atomic(cache_file, cache)
+    return spec
+
+
+def scan_prompt(spec: dict, prompt: str) -> tuple[str | None, list[str]]:
+    """Single pass over the prompt: (first persistent mode, transient contexts)."""
+    prompt = prompt.lower()
+    hit = set()
+    if spec["pattern"]:
+        for match in re.finditer(spec["pattern"], prompt, re.MULTILINE):
+            for name, value in match.groupdict().items():
+                if value is not None:
+                    hit.add(int(name[1:]))
+    for pattern, index in spec.get("standalone", []):
+        if re.search(pattern, prompt, re.MULTILINE):
+            hit.add(index)
+
+    persistent_mode = None
+    contexts = []
+    for index in sorted(hit):
+        kind, payload = spec["actions"][index]
+        if kind == "persistent":
+            if persistent_mode is None:
+                persistent_mode = payload
+        else:
+            context = spec["transient_contexts"][payload]
+            if context not in contexts:
+                contexts.append(context)
+    return persistent_mode, contexts
+
+
 def load_active_mode(cwd: str, session_id: str) -> str | None:
     """Load persisted active mode from state file, only if same session."""
     state_file = Path(cwd) / ".powermode" / "active-mode.json"
@@ -95,6 +295,22 @@ def save_active_mode(cwd: str, mode: str, session_id: str) -> None:
         pass
 
 
+def load_pack_mode(cwd: str, session_id: str) -> str | None:
+    data = load_json(Path(cwd) / ".powermode" / PACK_MODES_FILE) or {}
+    return data.get(session_id)
+
+
+def save_pack_mode(cwd: str, mode: str, session_id: str) -> None:
+    """Pack modes per session; kept out of active-mode.json (powermode only)."""
+    path = Path(cwd) / ".powermode" / PACK_MODES_FILE
+    data = load_json(path) or {}
+    data.pop(session_id, None)
+    data[session_id] = mode
+    while len(data) > PACK_MODES_MAX_SESSIONS:
+        data.pop(next(iter(data)))
+    save_json_atomic(path, data)
+
+
 def main():
     try:
         input_data = json.load(sys.stdin)
@@ -110,17 +326,23 @@ def main():
         print(json.dumps({"continue": True}))
         return
 
-    prompt_lower = prompt.lower()
+    spec = load_spec(cwd)
+    mode_contexts = spec["modes"]
     contexts = []
 
-    # Check for persistent mode activation via keyword
-    newly_activated = None
-    for pattern, mode_name in PERSISTENT_MODES.items():
-        if re.search(pattern, prompt_lower, re.MULTILINE):
-            newly_activated = mode_name
-            break
+    newly_activated, transient_contexts = scan_prompt(spec, prompt)
+    if newly_activated and newly_activated not in mode_contexts:
+        newly_activated = None
 
-    if newly_activated and cwd and session_id:
+    if newly_activated and newly_activated != "powermode":
+        # Pack mode: separate state, powermode (if on) stays active
+        if cwd and session_id:
+            save_pack_mode(cwd, newly_activated, session_id)
+            active_mode = load_active_mode(cwd, session_id)
+            if active_mode and active_mode in mode_contexts:
+                contexts.append(mode_contexts[active_mode].strip())
+        contexts.append(mode_contexts[newly_activated].strip())
+    elif newly_activated and cwd and session_id:
         # Don't overwrite active-mode.json if another session owns it.
         # This prevents team members from hijacking the parent's mode,
         # which would cause delegation-enforcer to block their edits.
@@ -139,17 +361,17 @@ def main():
                     pass
             if not other_session_active:
                 save_active_mode(cwd, newly_activated, session_id)
-        contexts.append(MODE_CONTEXTS[newly_activated].strip())
+        contexts.append(mode_contexts[newly_activated].strip())
     elif not newly_activated and cwd and session_id:
         # No keyword match - check if a persistent mode is already active (same session only)
         active_mode = load_active_mode(cwd, session_id)
-        if active_mode and active_mode in MODE_CONTEXTS:
-            contexts.append(MODE_CONTEXTS[active_mode].strip())
+        if active_mode and active_mode in mode_contexts:
+            contexts.append(mode_contexts[active_mode].strip())
+        pack_mode = load_pack_mode(cwd, session_id)
+        if pack_mode and pack_mode in mode_contexts and pack_mode != active_mode:
+            contexts.append(mode_contexts[pack_mode].strip())
 
-    # Check transient keywords
-    for pattern, context in TRANSIENT_KEYWORDS.items():
-        if re.search(pattern, prompt_lower):
-            contexts.append(context.strip())
+    contexts.extend(context.strip() for context in transient_contexts)
 
     # Output with proper UserPromptSubmit schema
     if contexts:
@@ -10,13 +10,75 @@ Fires on: PostToolUse (TodoWrite) - after every todo update
 - Suggests checkpoint review
 
 Also: Fires on Stop (prompt-based) - validates before session ends
+
+The active plan location and its extracted tasks are cached in
+~/.claude/powermode/plan-cache.json, keyed by plan path and mtime/size.
+The newest ~/.claude/plans/*.md is tracked via the directory mtime instead
+of sorting every plan on each checkpoint.
+
+Drift is measured with a TF-IDF index over the plan tasks (stemmed terms,
+IDF weights, unit task vectors) cached with the tasks: each completed todo
+is matched to its closest plan task by cosine similarity, and plan tasks no
+todo matches are listed.
+
+Checkpoint crossings are detected against the last seen (completed, total,
+plan hash) per session in .powermode/checkpoint-state.json. Each checkpoint
+fires once per plan: adding, rewording or reordering todos keeps the fired
+set, and only a changed plan file re-arms it. The plan hash comes from the
+plan cache (rehashed only when the plan's mtime/size change); alignment is
+computed only when a checkpoint is crossed.
 """
 
 import sys
+import hashlib
 import json
+import math
 import os
+import re
+import time
 from pathlib import Path
-from datetime import datetime
+
+from pm_common import load_json, save_json_atomic, user_state_dir
+
+CHECKPOINTS = (0.25, 0.50, 0.75, 1.0)
+CHECKPOINT_STATE_NAME = "checkpoint-state.json"
+MAX_CHECKPOINT_SESSIONS = 20
+
+# Full rescan of ~/.claude/plans even when its mtime is unchanged
+RESCAN_SECONDS = 300
+MAX_CACHED_PLANS = 20
+
+# - [ ] Task description / - [x] Completed task
+# 1. Task item
+# - Task item
+# ### Task: header
+TASK_LINE_RE = re.compile(
+    r"- \[[ x]\] (.+)"  # Checkbox format
+    r"|\d+\.\s+(.+)"  # Numbered list
+    r"|- (.+)"  # Bullet list
+    r"|###\s+Task[:\s]*(.+)"  # Task headers
+)
+
+
+TERM_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "the and for with from into that this then than when will should must have has "
+    "are was were its all any each via use using make sure also add new".split()
+)
+# Longest first; (suffix, replacement)
+SUFFIXES = (
+    ("ational", "ate"), ("ization", "ize"), ("ations", "ate"), ("ation", "ate"),
+    ("ments", ""), ("ment", ""), ("ings", ""), ("ing", ""), ("ies", "y"), ("ied", "y"),
+    ("ers", ""), ("er", ""), ("ed", ""), ("es", ""), ("s", ""),
+)
+
+# Cosine similarity at which a todo counts as covering a plan task
+MATCH_THRESHOLD = 0.2
+
+
+def plan_cache_file() -> Path:
+    """Plan locations and extracted tasks, shared by all projects."""
+    return user_state_dir() / "plan-cache.json"
 
 
 def is_powermode_active(cwd: str, session_id: str) -> bool:
@@ -33,72 +95,217 @@ def is_powermode_active(cwd: str, session_id: str) -> bool:
     return False
 
 
-def find_active_plan(cwd: str) -> tuple[str | None, str | None]:
+def find_active_plan(cwd: str, cache: dict) -> str | None:
     """Find the active plan file in .powermode/ or .planning/ directories."""
 
     # Check for .powermode/boulder.json (powermode pattern)
     powermode_boulder = Path(cwd) / ".powermode" / "boulder.json"
-    if powermode_boulder.exists():
-        try:
-            boulder = json.loads(powermode_boulder.read_text())
-            plan_path = boulder.get("active_plan")
-            if plan_path and Path(plan_path).exists():
-                return plan_path, Path(plan_path).read_text()
-        except:
-            pass
+    boulder = load_json(powermode_boulder)
+    if boulder:
+        plan_path = boulder.get("active_plan")
+        if plan_path and os.path.isfile(plan_path):
+            return plan_path
+
+    # Check for .planning/ROADMAP.md (common pattern), then .planning/STATE.md
+    for name in ("ROADMAP.md", "STATE.md"):
+        planning_file = Path(cwd) / ".planning" / name
+        if planning_file.is_file():
+            return str(planning_file)
 
-    # Check for .planning/ROADMAP.md (common pattern)
-    planning_roadmap = Path(cwd) / ".planning" / "ROADMAP.md"
-    if planning_roadmap.exists():
-        return str(planning_roadmap), planning_roadmap.read_text()
+    # Check for plan files in .claude/plans/
+    return newest_claude_plan(cache)
 
-    # Check for .planning/STATE.md
-    planning_state = Path(cwd) / ".planning" / "STATE.md"
-    if planning_state.exists():
-        return str(planning_state), planning_state.read_text()
 
-    # Check for plan files in .claude/plans/
-    claude_plans = Path.home() / ".claude" / "plans"
-    if claude_plans.exists():
-        plans = sorted(
-            claude_plans.glob("*.md"), key=lambda p: p.stat().st_mtime, reverse=True
-        )
-        if plans:
-            return str(plans[0]), plans[0].read_text()
+def newest_claude_plan(cache: dict) -> str | None:
+    """Newest ~/.claude/plans/*.md, tracked incrementally.
+
+    Adding, removing or renaming a plan changes the directory mtime and
+    triggers a single scandir pass (max, no sort). Otherwise only the cached
+    newest plan is stat'ed; a full rescan every RESCAN_SECONDS also catches
+    older plans edited in place.
+    """
+    plans_dir = Path.home() / ".claude" / "plans"
+    try:
+        dir_mtime = os.stat(plans_dir).st_mtime_ns
+    except OSError:
+        return None
+
+    tracked = cache.get("plans_dir") or {}
+    now = time.time()
+    newest = tracked.get("newest")
+    if (
+        newest
+        and tracked.get("mtime_ns") == dir_mtime
+        and now - float(tracked.get("scanned_at", 0)) < RESCAN_SECONDS
+    ):
+        try:
+            if os.stat(newest).st_mtime_ns >= tracked.get("newest_mtime_ns", 0):
+                return newest
+        except OSError:
+            pass
 
-    return None, None
+    newest, newest_mtime = None, -1
+    try:
+        with os.scandir(plans_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                if mtime > newest_mtime:
+                    newest, newest_mtime = entry.path, mtime
+    except OSError:
+        return None
+
+    cache["plans_dir"] = {
+        "mtime_ns": dir_mtime,
+        "newest": newest,
+        "newest_mtime_ns": newest_mtime,
+        "scanned_at": now,
+    }
+    cache["dirty"] = True
+    return newest
 
 
 def extract_plan_tasks(plan_content: str) -> list[str]:
     """Extract task items from a plan document."""
     tasks = []
 
-    # Match various task patterns
-    # - [ ] Task description
-    # - [x] Completed task
-    # 1. Task item
-    # - Task item
-    patterns = [
-        r"- \[[ x]\] (.+)",  # Checkbox format
-        r"^\d+\.\s+(.+)",  # Numbered list
-        r"^- (.+)",  # Bullet list
-        r"###\s+Task[:\s]*(.+)",  # Task headers
-    ]
-
-    import re
-
     for line in plan_content.split("\n"):
-        for pattern in patterns:
-            match = re.match(pattern, line.strip())
-            if match:
-                task = match.group(1).strip()
-                if len(task) > 10:  # Skip very short items
-                    tasks.append(task)
-                break
+        match = TASK_LINE_RE.match(line.strip())
+        if match:
+            task = next(g for g in match.groups() if g is not None).strip()
+            if len(task) > 10:  # Skip very short items
+                tasks.append(task)
 
     return tasks
 
 
+def stem(word: str) -> str:
+    for suffix, replacement in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: len(word) - len(suffix)] + replacement
+    return word
+
+
+def terms(text: str) -> list[str]:
+    return [stem(w) for w in TERM_RE.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+
+def term_vector(tokens: list[str], idf: dict) -> dict:
+    """Unit-length TF-IDF vector (sublinear tf) over known terms."""
+    counts: dict[str, int] = {}
+    for token in tokens:
+        if token in idf:
+            counts[token] = counts.get(token, 0) + 1
+    vector = {t: (1 + math.log(c)) * idf[t] for t, c in counts.items()}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {t: round(w / norm, 4) for t, w in vector.items()} if norm else {}
+
+
+def build_index(tasks: list[str]) -> dict:
+    """IDF weights and per-task vectors, built once per plan version."""
+    docs = [terms(task) for task in tasks]
+    df: dict[str, int] = {}
+    for doc in docs:
+        for term in set(doc):
+            df[term] = df.get(term, 0) + 1
+    n = len(docs)
+    idf = {t: round(math.log((n + 1) / (d + 0.5)), 4) for t, d in df.items()}
+    return {"idf": idf, "vectors": [term_vector(doc, idf) for doc in docs]}
+
+
+def best_match(index: dict, text: str) -> tuple[int, float]:
+    """Index and cosine similarity of the plan task closest to text."""
+    query = term_vector(terms(text), index["idf"])
+    best, best_score = -1, 0.0
+    for i, vector in enumerate(index["vectors"]):
+        score = sum(w * vector.get(t, 0.0) for t, w in query.items())
+        if score > best_score:
+            best, best_score = i, score
+    return best, best_score
+
+
+def load_plan_entry(cache: dict, plan_path: str) -> dict | None:
+    """Tasks and alignment index of a plan, rebuilt only when its mtime or size changed."""
+    try:
+        st = os.stat(plan_path)
+    except OSError:
+        return None
+    plans = cache.setdefault("plans", {})
+    entry = plans.pop(plan_path, None)
+    if (
+        not entry
+        or entry.get("mtime_ns") != st.st_mtime_ns
+        or entry.get("size") != st.st_size
+        # Entries cached before plans were hashed
+        or "hash" not in entry
+    ):
+        try:
+            content = Path(plan_path).read_text()
+        except OSError:
+            return None
+        entry = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": hashlib.sha256(content.encode("utf-8", "replace")).hexdigest()[:16],
+            "tasks": extract_plan_tasks(content) if content.strip() else [],
+        }
+        cache["dirty"] = True
+    if "index" not in entry:
+        entry["index"] = build_index(entry["tasks"])
+        cache["dirty"] = True
+    # Re-insert so the most recently used plan is last
+    plans[plan_path] = entry
+    while len(plans) > MAX_CACHED_PLANS:
+        plans.pop(next(iter(plans)))
+        cache["dirty"] = True
+    return entry
+
+
+def load_cache() -> dict:
+    return load_json(plan_cache_file()) or {}
+
+
+def save_cache(cache: dict) -> None:
+    if cache.pop("dirty", False):
+        save_json_atomic(plan_cache_file(), cache)
+
+
+def update_checkpoint_state(cwd: str, session_id: str, plan_hash: str, completed: int, total: int) -> list[float]:
+    """Checkpoints crossed since the last TodoWrite of this session.
+
+    Compares with the stored (completed, total) ratio instead of assuming one
+    todo finished, so several todos completing at once still cross. Fired
+    checkpoints are kept until the plan hash changes, so editing the todo
+    list never fires 25%/50% again for the same plan.
+    """
+    state_file = Path(cwd) / ".powermode" / CHECKPOINT_STATE_NAME
+    state = load_json(state_file) or {}
+    sessions = state.setdefault("sessions", {})
+    previous = sessions.pop(session_id, None) or {}
+
+    prev_total = previous.get("total") or 0
+    prev_progress = previous.get("completed", 0) / prev_total if prev_total else 0.0
+    fired = previous.get("fired", []) if previous.get("plan_hash") == plan_hash else []
+    progress = completed / total
+
+    crossed = [cp for cp in CHECKPOINTS if prev_progress < cp <= progress and cp not in fired]
+    sessions[session_id] = {
+        "completed": completed,
+        "total": total,
+        "plan_hash": plan_hash,
+        "fired": sorted(set(fired) | set(crossed)),
+    }
+    # Sessions are kept in last-used order; drop the oldest
+    while len(sessions) > MAX_CHECKPOINT_SESSIONS:
+        sessions.pop(next(iter(sessions)))
+    save_json_atomic(state_file, state)
+    return crossed
+
+
 def count_completed_todos(todos: list) -> tuple[int, int, list[str]]:
     """Count completed and total todos, return completed task names."""
     completed = 0
@@ -115,46 +322,61 @@ def count_completed_todos(todos: list) -> tuple[int, int, list[str]]:
     return completed, total, completed_names
 
 
-def check_alignment(plan_tasks: list[str], completed_todos: list[str]) -> dict:
-    """Check if completed todos align with plan tasks."""
+def check_alignment(entry: dict, completed_todos: list[str], all_todos: list[str]) -> dict:
+    """Score each completed todo against its best-matching plan task.
 
+    Also reports plan tasks that no todo (completed or not) matches.
+    """
+    plan_tasks = entry["tasks"]
     if not plan_tasks:
         return {"aligned": True, "message": "No plan found to validate against."}
 
-    # Simple keyword matching to detect drift
-    plan_keywords = set()
-    for task in plan_tasks:
-        words = task.lower().split()
-        plan_keywords.update(w for w in words if len(w) > 3)
-
-    completed_keywords = set()
-    for todo in completed_todos:
-        words = todo.lower().split()
-        completed_keywords.update(w for w in words if len(w) > 3)
-
-    # Calculate overlap
-    if not completed_keywords:
+    completed_todos = [t for t in completed_todos if t.strip()]
+    if not completed_todos:
         return {"aligned": True, "message": "No completed todos yet."}
 
-    overlap = plan_keywords.intersection(completed_keywords)
-    overlap_ratio = len(overlap) / len(completed_keywords) if completed_keywords else 0
-
-    if overlap_ratio < 0.3:
+    index = entry["index"]
+    off_plan = []
+    for todo in completed_todos:
+        _, score = best_match(index, todo)
+        if score < MATCH_THRESHOLD:
+            off_plan.append(todo)
+
+    covered = set()
+    for todo in all_todos:
+        task_index, score = best_match(index, todo)
+        if score >= MATCH_THRESHOLD:
+            covered.add(task_index)
+    uncovered = [task for i, task in enumerate(plan_tasks) if i not in covered]
+
+    matched = len(completed_todos) - len(off_plan)
+    ratio = matched / len(completed_todos)
+    details = ""
+    if off_plan:
+        details += "\nCompleted todos matching no plan task:\n" + "\n".join(f"- {t}" for t in off_plan[:5])
+    if uncovered:
+        details += f"\nPlan tasks with no todo ({len(uncovered)}/{len(plan_tasks)}):\n"
+        details += "\n".join(f"- {t}" for t in uncovered[:5])
+        if len(uncovered) > 5:
+            details += f"\n- ... {len(uncovered) - 5} more"
+    summary = f"{matched}/{len(completed_todos)} completed todos match a plan task"
+
+    if ratio < 0.5:
         return {
             "aligned": False,
-            "message": f"⚠️ DRIFT DETECTED: Only {overlap_ratio:.0%} overlap between completed work and plan.",
+            "message": f"⚠️ DRIFT DETECTED: Only {summary}.{details}",
             "suggestion": "Review plan to ensure work aligns with original requirements.",
         }
-    elif overlap_ratio < 0.5:
+    elif ratio < 0.75:
         return {
             "aligned": True,
-            "message": f"📋 Moderate alignment ({overlap_ratio:.0%}). Consider a checkpoint review.",
+            "message": f"📋 Moderate alignment ({summary}). Consider a checkpoint review.{details}",
             "suggestion": None,
         }
     else:
         return {
             "aligned": True,
-            "message": f"✓ Good alignment ({overlap_ratio:.0%}) with plan.",
+            "message": f"✓ Good alignment ({summary}).{details}",
             "suggestion": None,
         }
 
@@ -198,20 +420,23 @@ def main():
         return
 
     progress = completed / total
-    checkpoints = [0.25, 0.50, 0.75, 1.0]
 
-    # Check if we just crossed a checkpoint
-    prev_progress = (completed - 1) / total if completed > 0 else 0
-    crossed_checkpoint = any(prev_progress < cp <= progress for cp in checkpoints)
+    # Active plan (locations, hash and tasks are cached); its hash scopes
+    # which checkpoints have already fired
+    cache = load_cache()
+    plan_path = find_active_plan(cwd, cache)
+    plan_entry = load_plan_entry(cache, plan_path) if plan_path else None
+    save_cache(cache)
+
+    # Check if we just crossed a checkpoint, against the last seen state
+    plan_hash = plan_entry.get("hash", "") if plan_entry else ""
+    crossed_checkpoint = update_checkpoint_state(cwd, session_id, plan_hash, completed, total)
 
     if not crossed_checkpoint:
         print(json.dumps({"continue": True}))
         return
 
-    # Find and validate against plan
-    plan_path, plan_content = find_active_plan(cwd)
-
-    if not plan_content:
+    if plan_entry is None:
         checkpoint_msg = f"""
 [CHECKPOINT: {progress:.0%} Complete ({completed}/{total} tasks)]
 
@@ -219,8 +444,8 @@ No active plan found to validate against.
 Consider: Are you still aligned with the original goal?
 """
     else:
-        plan_tasks = extract_plan_tasks(plan_content)
-        alignment = check_alignment(plan_tasks, completed_names)
+        all_names = [t.get("content", "") for t in todos if isinstance(t, dict)]
+        alignment = check_alignment(plan_entry, completed_names, all_names)
 
         checkpoint_msg = f"""
 [CHECKPOINT: {progress:.0%} Complete ({completed}/{total} tasks)]
@@ -0,0 +1,93 @@
+"""Shared helpers for Power Mode hooks.
+
+Config is read from ~/.claude/powermode.json (user-level) and
+.claude/powermode.json (project-level). Project values override user
+values per section, so a project can tweak one key without repeating
+the rest.
+
+Example:
+{
+  "claude_md": {"reinject": "diff"}
+}
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+CONFIG_NAME = "powermode.json"
+
+
+def load_json(path: Path) -> dict | None:
+    try:
+        if path.exists():
+            data = json.loads(path.read_text())
+            if isinstance(data, dict):
+                return data
+    except (json.JSONDecodeError, OSError, ValueError):
+        pass
+    return None
+
+
+def save_json_atomic(path: Path, data: dict, indent: int | None = None) -> None:
+    """Write JSON via temp file + rename so readers never see partial state."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=str(path.parent), text=True)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(temp_path, str(path))
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def user_state_dir() -> Path:
+    """State that is not tied to a project (hooks that run outside powermode)."""
+    return Path.home() / ".claude" / "powermode"
+
+
+def load_config(cwd: str) -> dict:
+    """Merge user-level and project-level powermode.json."""
+    merged: dict = {}
+    sources = [Path.home() / ".claude" / CONFIG_NAME]
+    if cwd:
+        sources.append(Path(cwd) / ".claude" / CONFIG_NAME)
+    for source in sources:
+        data = load_json(source)
+        if not data:
+            continue
+        for key, value in data.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = {**merged[key], **value}
+            else:
+                merged[key] = value
+    return merged
+
+
+def config_section(cwd: str, name: str, defaults: dict) -> dict:
+    """Return one config section with defaults filled in."""
+    section = load_config(cwd).get(name)
+    if not isinstance(section, dict):
+        return dict(defaults)
+    return {**defaults, **section}
+
+
+def session_file(directory: Path, session_id: str) -> Path:
+    """Per-session state file with the session id made filename-safe."""
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id)
+    return directory / f"{safe or 'unknown'}.json"
+
+
+def claude_md_state_file(session_id: str) -> Path:
+    """Tracks what claude-md-enforcer already injected in a session.
+
+    Removed by post-compact-handler so the next prompt re-sends the full rules.
+    """
+    return session_file(user_state_dir() / "claude-md", session_id)
@@ -4,6 +4,10 @@
 After compaction, the token estimates in context-state.json are stale —
 they reflect pre-compaction usage. This hook resets them to avoid
 false warnings from context-monitor.py.
+
+It also removes the precomputed session-summary.json line and drops
+claude-md-enforcer's per-session injection state, since the
+compacted context no longer holds the full CLAUDE.md rules.
 """
 import json
 import os
@@ -11,6 +15,8 @@ import sys
 import tempfile
 from pathlib import Path
 
+from pm_common import claude_md_state_file
+
 
 def main():
     try:
@@ -20,6 +26,21 @@ def main():
         return
 
     cwd = event_data.get("cwd", os.getcwd())
+    session_id = event_data.get("session_id", "")
+
+    if session_id:
+        try:
+            claude_md_state_file(session_id).unlink()
+        except OSError:
+            pass
+
+    # The precomputed summary line holds pre-compaction numbers;
+    # context-monitor rewrites it on the next tool call
+    try:
+        (Path(cwd) / ".powermode" / "session-summary.json").unlink()
+    except OSError:
+        pass
+
     state_file = Path(cwd) / ".powermode" / "context-state.json"
 
     if not state_file.exists():
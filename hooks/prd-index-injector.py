@@ -9,6 +9,10 @@ Skips injection when:
 - README.md does not exist (single PRD case)
 - README.md already referenced
 - README.md already injected for this session
+
+README lookups and per-session injection state go through the shared
+PRD index (.powermode/prd-index.json, see prd_index.py). Large READMEs
+are injected as a compact task-table digest.
 """
 
 import json
@@ -17,51 +21,18 @@ import re
 import sys
 from pathlib import Path
 
-PRD_DIR_NAMES = {"prd", "prds", "projects", "features"}
-
-
-def normalize_path(path_value: str, cwd: str) -> Path | None:
-    if not path_value:
-        return None
-    cleaned = path_value.strip().strip('"').strip("'")
-    if cleaned.startswith("@"):
-        cleaned = cleaned[1:]
-    if not cleaned:
-        return None
-    path = Path(cleaned)
-    if not path.is_absolute():
-        path = Path(cwd) / path
-    return path.resolve()
-
-
-def is_prd_path(path: Path) -> bool:
-    return any(part.lower() in PRD_DIR_NAMES for part in path.parts)
-
-
-def load_state(state_file: Path, session_id: str) -> set[str]:
-    if not session_id or not state_file.exists():
-        return set()
-    try:
-        data = json.loads(state_file.read_text())
-        if data.get("session_id") != session_id:
-            return set()
-        folders = data.get("folders", [])
-        if isinstance(folders, list):
-            return set(str(f) for f in folders)
-    except (json.JSONDecodeError, OSError):
-        return set()
-    return set()
-
-
-def save_state(state_file: Path, session_id: str, folders: set[str]) -> None:
-    if not session_id:
-        return
-    state_file.parent.mkdir(parents=True, exist_ok=True)
-    payload = {"session_id": session_id, "folders": sorted(folders)}
-    try:
-        state_file.write_text(json.dumps(payload))
-    except OSError:
-        pass
+from prd_index import (
+    index_lock,
+    injected_folders,
+    is_prd_path,
+    load_config,
+    load_index,
+    lookup_folder,
+    mark_injected,
+    normalize_path,
+    render_injection,
+    save_index,
+)
 
 
 def extract_md_paths(prompt: str) -> list[str]:
@@ -104,42 +75,46 @@ def main():
         print(json.dumps({"continue": True}))
         return
 
-    state_file = Path(cwd) / ".powermode" / "prd-index-state.json"
-    injected_folders = load_state(state_file, session_id)
-    injections = []
-
-    for raw_path in candidates:
-        path = normalize_path(raw_path, cwd)
-        if not path:
-            continue
-        if not is_prd_path(path):
-            continue
-
-        if path.name.lower() == "readme.md":
-            injected_folders.add(str(path.parent))
-            continue
-
-        readme_path = path.parent / "README.md"
-        if not readme_path.exists():
-            continue
-
-        folder_key = str(path.parent)
-        if folder_key in injected_folders:
-            continue
-
-        try:
-            content = readme_path.read_text()
-        except OSError:
-            continue
-
-        if not content.strip():
-            continue
-
-        injected_folders.add(folder_key)
-        injections.append(f"[PRD INDEX: {readme_path}]\n{content.strip()}")
+    # Held across load -> save; rules-injector updates the same index
+    with index_lock(cwd):
+        index = load_index(cwd)
+        config = load_config(cwd)
+        already_injected = injected_folders(index, session_id)
+        injections = []
+
+        for raw_path in candidates:
+            path = normalize_path(raw_path, cwd)
+            if not path:
+                continue
+            if not is_prd_path(path):
+                continue
+
+            folder = path.parent
+            if path.name.lower() == "readme.md":
+                if str(folder) not in already_injected:
+                    mark_injected(index, session_id, folder)
+                    already_injected.add(str(folder))
+                continue
+
+            if str(folder) in already_injected:
+                continue
+
+            entry = lookup_folder(index, folder)
+            if not entry:
+                continue
+
+            injection = render_injection(index, entry, config)
+            if not injection:
+                continue
+
+            mark_injected(index, session_id, folder)
+            already_injected.add(str(folder))
+            injections.append(injection)
+
+        if index.get("dirty"):
+            save_index(cwd, index)
 
     if injections:
-        save_state(state_file, session_id, injected_folders)
         payload = {
             "continue": True,
             "hookSpecificOutput": {
@@ -149,8 +124,6 @@ def main():
         }
         print(json.dumps(payload))
     else:
-        if injected_folders:
-            save_state(state_file, session_id, injected_folders)
         print(json.dumps({"continue": True}))
 
 
@@ -0,0 +1,254 @@
+"""Shared PRD folder index for prd-index-injector and rules-injector.
+
+One file, .powermode/prd-index.json, holds:
+- folders: PRD folder -> README path, mtime/size, content hash and summary
+- sessions: which folders' READMEs were already injected per session
+
+Both hooks do their load -> update -> save under an flock on
+.powermode/prd-index.lock (index_lock), so concurrent hooks do not drop
+each other's entries or injected-folder marks.
+
+Entries are refreshed incrementally: a lookup costs one stat of the README,
+and the README is only re-read (hashed, summarised) when its mtime or size
+changed.
+
+READMEs larger than prd_index.summary_threshold are injected in a compact
+form built from the task table (number, file, dependencies, status). The
+compact form is cached in the entry, keyed by the README hash. The full
+text stays one Read away (rules-injector never injects on README reads).
+
+Config (powermode.json):
+  "prd_index": {
+    "mode": "auto",               # "auto", "full" or "compact"
+    "summary_threshold": 4000     # README size (bytes) above which auto compacts
+  }
+"""
+
+import fcntl
+import hashlib
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+from pm_common import config_section, load_json, save_json_atomic
+
+PRD_DIR_NAMES = {"prd", "prds", "projects", "features"}
+
+INDEX_VERSION = 1
+MAX_SESSIONS = 20
+
+DEFAULT_CONFIG = {"mode": "auto", "summary_threshold": 4000}
+
+TITLE_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+
+def index_file(cwd: str) -> Path:
+    return Path(cwd) / ".powermode" / "prd-index.json"
+
+
+@contextmanager
+def index_lock(cwd: str):
+    """Exclusive lock around an index read-modify-write."""
+    lock_file = index_file(cwd).with_suffix(".lock")
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_file, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def normalize_path(path_value: str, cwd: str) -> Path | None:
+    if not path_value:
+        return None
+    cleaned = path_value.strip().strip('"').strip("'")
+    if cleaned.startswith("@"):
+        cleaned = cleaned[1:]
+    if not cleaned:
+        return None
+    path = Path(cleaned)
+    if not path.is_absolute():
+        path = Path(cwd) / path
+    return path.resolve()
+
+
+def is_prd_path(path: Path) -> bool:
+    return any(part.lower() in PRD_DIR_NAMES for part in path.parts)
+
+
+def load_index(cwd: str) -> dict:
+    data = load_json(index_file(cwd))
+    if not data or data.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "folders": {}, "sessions": {}}
+    data.setdefault("folders", {})
+    data.setdefault("sessions", {})
+    return data
+
+
+def save_index(cwd: str, index: dict) -> None:
+    index.pop("dirty", None)
+    sessions = index.get("sessions", {})
+    # Sessions are kept in last-used order; drop the oldest
+    while len(sessions) > MAX_SESSIONS:
+        sessions.pop(next(iter(sessions)))
+    save_json_atomic(index_file(cwd), index)
+
+
+def parse_task_rows(content: str) -> list[dict]:
+    """Parse the feature README task table.
+
+    Supports 6-col (# | File | Domain | Test Focus | Dependencies | Status)
+    and 7-col (with TDD) tables; deps and status are always the last two.
+    """
+    rows = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [c.strip() for c in line.split("|")[1:-1]]
+        if len(cells) < 6:
+            continue
+        try:
+            num = int(cells[0])
+        except ValueError:
+            continue
+        rows.append({"num": num, "file": cells[1], "deps": cells[-2], "status": cells[-1]})
+    return rows
+
+
+def is_done_status(status: str) -> bool:
+    s = status.lower()
+    return "done" in s or "complete" in s
+
+
+def summarize_readme(content: str) -> dict:
+    title_match = TITLE_RE.search(content)
+    rows = parse_task_rows(content)
+    return {
+        "title": title_match.group(1).strip() if title_match else "",
+        "tasks": len(rows),
+        "done": sum(1 for r in rows if is_done_status(r["status"])),
+    }
+
+
+def lookup_folder(index: dict, folder: Path) -> dict | None:
+    """Return the index entry for a PRD folder, refreshing it if the README changed.
+
+    Returns None when the folder has no (non-empty) README. Sets
+    index["dirty"] when the entry was (re)built so callers know to save.
+    """
+    folder_key = str(folder)
+    readme_path = folder / "README.md"
+    try:
+        st = readme_path.stat()
+    except OSError:
+        if index["folders"].pop(folder_key, None) is not None:
+            index["dirty"] = True
+        return None
+
+    entry = index["folders"].get(folder_key)
+    if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return entry if entry.get("hash") else None
+
+    try:
+        content = readme_path.read_text()
+    except OSError:
+        return None
+
+    entry = {
+        "readme": str(readme_path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "hash": hashlib.sha256(content.encode("utf-8", "replace")).hexdigest()[:16]
+        if content.strip()
+        else "",
+        "summary": summarize_readme(content),
+    }
+    index["folders"][folder_key] = entry
+    index["dirty"] = True
+    return entry if entry["hash"] else None
+
+
+def read_readme(entry: dict) -> str | None:
+    try:
+        content = Path(entry["readme"]).read_text()
+    except (OSError, KeyError):
+        return None
+    return content.strip() or None
+
+
+def injected_folders(index: dict, session_id: str) -> set[str]:
+    if not session_id:
+        return set()
+    return set(index["sessions"].get(session_id, []))
+
+
+def mark_injected(index: dict, session_id: str, folder: Path) -> None:
+    if not session_id:
+        return
+    folders = index["sessions"].pop(session_id, [])
+    if str(folder) not in folders:
+        folders.append(str(folder))
+    # Re-insert so this session is the most recently used
+    index["sessions"][session_id] = folders
+    index["dirty"] = True
+
+
+def load_config(cwd: str) -> dict:
+    return config_section(cwd, "prd_index", DEFAULT_CONFIG)
+
+
+def build_compact(content: str) -> str | None:
+    """Task-table digest of a feature README; None if it has no task table."""
+    rows = parse_task_rows(content)
+    if not rows:
+        return None
+    title_match = TITLE_RE.search(content)
+    lines = []
+    if title_match:
+        lines.append(f"# {title_match.group(1).strip()}")
+    lines.append("Tasks (# | file | deps | status):")
+    for row in rows:
+        lines.append(f"{row['num']:02d} | {row['file']} | {row['deps'] or 'None'} | {row['status']}")
+    return "\n".join(lines)
+
+
+def compact_form(index: dict, entry: dict) -> str | None:
+    """Cached compact form of a README, rebuilt only when its hash changes."""
+    if entry.get("compact_hash") == entry["hash"]:
+        return entry.get("compact")
+    content = read_readme(entry)
+    if content is None:
+        return None
+    entry["compact"] = build_compact(content)
+    entry["compact_hash"] = entry["hash"]
+    index["dirty"] = True
+    return entry["compact"]
+
+
+def format_injection(entry: dict, content: str, compact: bool = False) -> str:
+    summary = entry.get("summary") or {}
+    header = f"[PRD INDEX: {entry['readme']}"
+    if summary.get("tasks"):
+        header += f" — {summary['done']}/{summary['tasks']} tasks done"
+    if compact:
+        header += f" — compact form of a {entry['size']:,}-byte README"
+        content += f"\nRead {entry['readme']} for the full text (notes, test focus, domains)."
+    return f"{header}]\n{content}"
+
+
+def render_injection(index: dict, entry: dict, config: dict) -> str | None:
+    """Injection text for a README: compact above the size threshold, else full."""
+    mode = config.get("mode", "auto")
+    threshold = int(config.get("summary_threshold") or 0)
+    wants_compact = mode == "compact" or (mode == "auto" and entry.get("size", 0) > threshold)
+    if wants_compact:
+        compact = compact_form(index, entry)
+        if compact:
+            return format_injection(entry, compact, compact=True)
+
+    content = read_readme(entry)
+    if not content:
+        return None
+    return format_injection(entry, content)
@@ -0,0 +1,101 @@
+"""Rolling recovery snapshots (.powermode/recovery/<session>/*.json.gz)
+
+session-state-saver.py writes a gzip-compressed snapshot on PreCompact,
+SessionEnd and StopFailure; only the newest `snapshots` per session are
+kept. session-state-restorer.py restores from the newest one and leaves the
+ring in place, so several compactions in a row each find the latest state.
+
+Snapshots are built from state other hooks already maintain (no scans):
+- context-state.json (context-monitor): counters, modified files, todos
+- prd-index.json (prd_index.py): PRD folders injected in this session
+- pending-verification.json (implementer-lifecycle.py)
+
+Config (powermode.json):
+  "recovery": {"snapshots": 5}
+"""
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+
+from pm_common import config_section
+
+RECOVERY_DIR_NAME = "recovery"
+DEFAULT_CONFIG = {"snapshots": 5}
+# Session directories untouched for this long are removed on save
+STALE_SESSION_SECONDS = 7 * 24 * 3600
+
+
+def session_dir(powermode_dir: Path, session_id: str) -> Path:
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id)
+    return powermode_dir / RECOVERY_DIR_NAME / (safe or "unknown")
+
+
+def list_snapshots(directory: Path) -> list[Path]:
+    """Snapshot files, oldest first (names start with a sortable timestamp)."""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".json.gz"))
+    except OSError:
+        return []
+    return [directory / n for n in names]
+
+
+def write_snapshot(powermode_dir: Path, session_id: str, data: dict, keep: int) -> Path:
+    directory = session_dir(powermode_dir, session_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Nanosecond timestamp keeps names unique and ordered within a session
+    path = directory / f"{time.time_ns():020d}.json.gz"
+    temp_path = path.with_suffix(".tmp")
+    with gzip.open(temp_path, "wt", compresslevel=6) as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+    for old in list_snapshots(directory)[: -max(1, keep)]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return path
+
+
+def read_snapshot(path: Path) -> dict | None:
+    try:
+        with gzip.open(path, "rt") as f:
+            data = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def newest_snapshot(powermode_dir: Path, session_id: str) -> dict | None:
+    """Newest readable snapshot for the session (skips truncated files)."""
+    for path in reversed(list_snapshots(session_dir(powermode_dir, session_id))):
+        data = read_snapshot(path)
+        if data is not None:
+            return data
+    return None
+
+
+def prune_stale_sessions(powermode_dir: Path, current: Path) -> None:
+    cutoff = time.time() - STALE_SESSION_SECONDS
+    try:
+        entries = list(os.scandir(powermode_dir / RECOVERY_DIR_NAME))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.path == str(current) or not entry.is_dir():
+            continue
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            for name in os.listdir(entry.path):
+                os.unlink(os.path.join(entry.path, name))
+            os.rmdir(entry.path)
+        except OSError:
+            pass
+
+
+def load_config(cwd: str) -> dict:
+    return config_section(cwd, "recovery", DEFAULT_CONFIG)
@@ -26,44 +26,18 @@ import re
 from pathlib import Path
 from fnmatch import fnmatch
 
-PRD_DIR_NAMES = {"prd", "prds", "projects", "features"}
-
-
-def resolve_path(file_path: str, cwd: str) -> Path:
-    path = Path(file_path)
-    if not path.is_absolute():
-        path = Path(cwd) / path
-    return path
-
-
-def load_prd_state(state_file: Path, session_id: str) -> set[str]:
-    if not session_id or not state_file.exists():
-        return set()
-    try:
-        data = json.loads(state_file.read_text())
-        if data.get("session_id") != session_id:
-            return set()
-        folders = data.get("folders", [])
-        if isinstance(folders, list):
-            return set(str(f) for f in folders)
-    except (json.JSONDecodeError, OSError):
-        return set()
-    return set()
-
-
-def save_prd_state(state_file: Path, session_id: str, folders: set[str]) -> None:
-    if not session_id:
-        return
-    state_file.parent.mkdir(parents=True, exist_ok=True)
-    payload = {"session_id": session_id, "folders": sorted(folders)}
-    try:
-        state_file.write_text(json.dumps(payload))
-    except OSError:
-        pass
-
-
-def is_prd_path(path: Path) -> bool:
-    return any(part.lower() in PRD_DIR_NAMES for part in path.parts)
+from prd_index import (
+    index_lock,
+    injected_folders,
+    is_prd_path,
+    load_config,
+    load_index,
+    lookup_folder,
+    mark_injected,
+    normalize_path,
+    render_injection,
+    save_index,
+)
 
 
 def get_prd_index_injection(
@@ -71,33 +45,28 @@ def get_prd_index_injection(
 ) -> str | None:
     if not file_path:
         return None
-    path = resolve_path(file_path, cwd)
-    if path.name.lower() == "readme.md":
+    path = normalize_path(file_path, cwd)
+    if not path or path.name.lower() == "readme.md":
         return None
     if not is_prd_path(path):
         return None
 
-    readme_path = path.parent / "README.md"
-    if not readme_path.exists():
-        return None
-
-    state_file = Path(cwd) / ".powermode" / "prd-index-state.json"
-    injected_folders = load_prd_state(state_file, session_id or "")
-    folder_key = str(path.parent.resolve())
-    if folder_key in injected_folders:
-        return None
-
-    try:
-        content = readme_path.read_text()
-    except OSError:
-        return None
-
-    if not content.strip():
-        return None
-
-    injected_folders.add(folder_key)
-    save_prd_state(state_file, session_id or "", injected_folders)
-    return f"[PRD INDEX: {readme_path}]\n{content.strip()}"
+    with index_lock(cwd):
+        index = load_index(cwd)
+        folder = path.parent
+        if str(folder) in injected_folders(index, session_id or ""):
+            return None
+
+        entry = lookup_folder(index, folder)
+        injection = render_injection(index, entry, load_config(cwd)) if entry else None
+        if not injection:
+            if index.get("dirty"):
+                save_index(cwd, index)
+            return None
+
+        mark_injected(index, session_id or "", folder)
+        save_index(cwd, index)
+        return injection
 
 
 # Cache for loaded rules (to avoid re-reading on every file read)
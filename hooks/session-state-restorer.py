@@ -2,7 +2,65 @@
 import json
 import sys
 from pathlib import Path
-from datetime import datetime
+
+from recovery_snapshots import newest_snapshot
+
+MAX_LISTED_FILES = 10
+
+
+def format_active_task(active_task: dict | None, active_project: str | None, powermode_dir: Path) -> str:
+    """Line pointing at the task PRD that was last worked on, if it still exists."""
+    if not active_task or active_task.get("slug") != active_project:
+        return ""
+    task_path = active_task.get("task_path")
+    if task_path and (powermode_dir.parent / task_path).is_file():
+        return f"- Last task: {task_path} (re-read it before continuing)"
+    if active_task.get("feature"):
+        return f"- Last feature: .powermode/projects/{active_project}/features/{active_task['feature']}/README.md"
+    return ""
+
+
+def format_snapshot(snapshot: dict, powermode_dir: Path) -> str:
+    context = snapshot.get("context") or {}
+    tokens_before = context.get("estimated_tokens", "unknown")
+    token_percentage = context.get("percentage", "unknown")
+    if isinstance(token_percentage, (int, float)):
+        token_percentage = f"{token_percentage:.1f}"
+
+    lines = [
+        "[Session Recovery: Context was compacted. Previous state:",
+        f"- Session: {snapshot.get('session_id', 'unknown')}",
+        f"- Estimated tokens before: ~{tokens_before} ({token_percentage}%)",
+        f"- Last saved: {snapshot.get('saved_at', 'unknown')}",
+    ]
+    active_project = snapshot.get("active_project")
+    if active_project and (powermode_dir / "projects" / active_project).is_dir():
+        lines.append(
+            f"- Active project: {active_project} "
+            f"(check .powermode/projects/{active_project}/status.json for progress)"
+        )
+    task_line = format_active_task(snapshot.get("active_task"), active_project, powermode_dir)
+    if task_line:
+        lines.append(task_line)
+    pending = snapshot.get("pending_verification")
+    if pending and (powermode_dir / "pending-verification.json").exists():
+        lines.append(
+            f"- Verification pending for implementer {pending.get('agent_id', 'unknown')}: "
+            "run pm-verifier before starting new implementation"
+        )
+    if snapshot.get("prd_folders"):
+        lines.append("- PRDs in use: " + ", ".join(snapshot["prd_folders"]))
+    modified = snapshot.get("modified_files") or []
+    if modified:
+        shown = ", ".join(modified[:MAX_LISTED_FILES])
+        more = f" (+{len(modified) - MAX_LISTED_FILES} more)" if len(modified) > MAX_LISTED_FILES else ""
+        lines.append(f"- Modified files: {shown}{more}")
+    todos = [t for t in snapshot.get("todos") or [] if t.get("status") != "completed"]
+    if todos:
+        lines.append("- Open todos:")
+        lines.extend(f"  - [{t.get('status', 'pending')}] {t.get('content', '')}" for t in todos)
+    lines.append("Continue from where you left off.]")
+    return "\n".join(lines)
 
 
 def main():
@@ -17,10 +75,16 @@ def main():
         print(json.dumps({"continue": True}))
         return
 
-    recovery_file = Path(cwd) / ".powermode" / "recovery.json"
+    powermode_dir = Path(cwd) / ".powermode"
+    recovery_file = powermode_dir / "recovery.json"
     additional_context = ""
 
-    if recovery_file.exists():
+    # Newest snapshot of this session first; snapshots stay in place so
+    # back-to-back compactions keep finding the latest state
+    snapshot = newest_snapshot(powermode_dir, input_data.get("session_id", ""))
+    if snapshot:
+        additional_context = format_snapshot(snapshot, powermode_dir)
+    elif recovery_file.exists():
         try:
             with open(recovery_file, "r") as f:
                 recovery_data = json.load(f)
@@ -45,6 +109,9 @@ def main():
                     f"- Active project: {active_project} "
                     f"(check .powermode/projects/{active_project}/status.json for progress)\n"
                 )
+                task_line = format_active_task(recovery_data.get("active_task"), active_project, Path(cwd) / ".powermode")
+                if task_line:
+                    additional_context += task_line + "\n"
             additional_context += "Continue from where you left off.]"
 
             restored_file = Path(str(recovery_file) + ".restored")
@@ -6,6 +6,10 @@ import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 
+from active_project import load_active_project
+from prd_index import injected_folders, load_index
+from recovery_snapshots import load_config, prune_stale_sessions, write_snapshot
+
 
 def main():
     try:
@@ -38,10 +42,12 @@ def main():
         except (json.JSONDecodeError, OSError) as e:
             print(f"Warning: Could not read context-state.json: {e}", file=sys.stderr)
 
-    # Detect active project from projects/index.json
-    active_project = None
+    # Last-touched project pointer (context-monitor); fall back to the first
+    # planning/in-progress project in projects/index.json
+    active_task = load_active_project(cwd)
+    active_project = active_task.get("slug") if active_task else None
     projects_index = recovery_dir / "projects" / "index.json"
-    if projects_index.exists():
+    if not active_project and projects_index.exists():
         try:
             with open(projects_index, "r") as f:
                 index_data = json.load(f)
@@ -62,7 +68,36 @@ def main():
         "context_state": context_state,
         "transcript_path": event_data.get("transcript_path", ""),
         "active_project": active_project,
+        "active_task": active_task,
+    }
+
+    # Compressed snapshot ring for this session; built only from state the
+    # other hooks keep up to date, so saving stays well inside the timeout
+    same_session = context_state.get("session_id") == session_id
+    pending_verification = None
+    pending_file = recovery_dir / "pending-verification.json"
+    if pending_file.exists():
+        try:
+            pending_verification = json.loads(pending_file.read_text())
+        except (json.JSONDecodeError, OSError):
+            pending_verification = {"awaiting_verifier": True}
+    snapshot = {
+        **{k: v for k, v in recovery_data.items() if k != "context_state"},
+        "context": {
+            k: context_state.get(k)
+            for k in ("tool_calls", "estimated_tokens", "percentage")
+        } if same_session else {},
+        "modified_files": sorted(context_state.get("modified_files", [])) if same_session else [],
+        "todos": context_state.get("todos", []) if same_session else [],
+        "prd_folders": sorted(injected_folders(load_index(cwd), session_id)),
+        "pending_verification": pending_verification,
     }
+    try:
+        keep = int(load_config(cwd).get("snapshots") or 1)
+        path = write_snapshot(recovery_dir, session_id, snapshot, keep)
+        prune_stale_sessions(recovery_dir, path.parent)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Warning: Could not write recovery snapshot: {e}", file=sys.stderr)
 
     try:
         fd, temp_path = tempfile.mkstemp(dir=str(recovery_dir), text=True)
@@ -5,6 +5,8 @@ import os
 import re
 from pathlib import Path
 
+from verification_queue import open_records
+
 MAX_BLOCK_ATTEMPTS = 3
 
 
@@ -215,7 +217,10 @@ def main():
     missing_prd_updates = sorted(referenced_prds - updated_prds)
     folders_missing_readme = sorted(modified_prd_folders - modified_prd_readmes)
     projects_missing_status = sorted(modified_project_dirs - status_json_updated)
-    pending_verification = (state_dir / "pending-verification.json").exists()
+    pending_verification = bool(open_records(state_dir, session_id)) or (
+        not (state_dir / "pending-verifications.json").exists()
+        and (state_dir / "pending-verification.json").exists()
+    )
 
     # Check for BLOCKED.md in any project
     blocked_files = sorted(state_dir.glob("projects/*/BLOCKED.md"))
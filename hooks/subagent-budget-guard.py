@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Subagent Budget Guard Hook (PreToolUse, PostToolUse, SubagentStart, SubagentStop)
+
+Enforces the tool budget task-containment-enforcer announces in each
+subagent prompt (see subagent_budgets.py):
+- SubagentStart: binds the queued budget for this subagent type to the agent_id
+- PostToolUse: counts tool calls, file reads and estimated tokens for the agent
+- PreToolUse: denies further tools once a limit is reached, telling the
+  subagent to wrap up and report
+- SubagentStop: logs actual usage to .powermode/subagent-history.jsonl (used
+  to calibrate the complexity model) and removes the agent's counters
+
+Main-agent tool calls carry no agent_id and return after one stat (dropping
+a queue whose items all passed their TTL). On
+PreToolUse/PostToolUse hooks.json only starts Python while
+.powermode/subagent-budgets/ exists (something queued or running), so
+sessions without budgets pay a shell test per tool call.
+
+Exit codes:
+- 0: Always exits cleanly
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from complexity_model import record_run
+from subagent_budgets import (
+    agent_file,
+    drop_expired_queue,
+    exceeded_limit,
+    finish_agent,
+    load_agent,
+    record_tool_use,
+    start_agent,
+)
+
+WRAP_UP_MSG = """[BUDGET EXHAUSTED - WRAP UP NOW]
+
+This subagent has used {used} of its {limit} {label} budget ({subagent_type}, {tier} complexity).
+No further tool calls will be allowed.
+
+Stop working and reply now with your summary:
+- Done: what is complete
+- Not done: what remains
+- Issues: anything the caller must know
+If the task was too large, say "Task too large, recommend splitting"."""
+
+LIMIT_LABELS = {"tool_calls": "tool call", "file_reads": "file read"}
+
+CHARS_PER_TOKEN = 3.5
+
+
+def handle_pre_tool_use(powermode_dir: Path, agent_id: str, input_data: dict) -> dict | None:
+    record = load_agent(powermode_dir, agent_id)
+    if not record:
+        return None
+    tool_name = input_data.get("tool_name", "")
+    limit_key = exceeded_limit(record, tool_name)
+    if not limit_key:
+        return None
+    reason = WRAP_UP_MSG.format(
+        used=record.get(limit_key, 0),
+        limit=record["limits"][limit_key],
+        label=LIMIT_LABELS[limit_key],
+        subagent_type=record.get("subagent_type", "subagent"),
+        tier=record.get("tier", "MEDIUM"),
+    )
+    return {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": "deny",
+            "permissionDecisionReason": reason,
+        }
+    }
+
+
+def main():
+    try:
+        input_data = json.loads(sys.stdin.read())
+    except (json.JSONDecodeError, IOError):
+        print(json.dumps({"continue": True}))
+        return
+
+    hook_event = input_data.get("hook_event_name", "")
+    agent_id = input_data.get("agent_id", "")
+    powermode_dir = Path(input_data.get("cwd", ".")) / ".powermode"
+    if not agent_id:
+        # An unclaimed queue past its TTL goes, so hooks.json stops starting Python
+        drop_expired_queue(powermode_dir)
+        print(json.dumps({"continue": True}))
+        return
+
+    if hook_event == "SubagentStart":
+        start_agent(powermode_dir, agent_id, input_data.get("agent_type", ""))
+        print(json.dumps({"continue": True}))
+        return
+
+    if hook_event == "SubagentStop":
+        record = load_agent(powermode_dir, agent_id)
+        if record:
+            record_run(powermode_dir, record)
+        finish_agent(powermode_dir, agent_id)
+        print(json.dumps({"continue": True}))
+        return
+
+    # Agents without a bound budget (no powermode, other plugins) cost one stat
+    if not agent_file(powermode_dir, agent_id).exists():
+        drop_expired_queue(powermode_dir)
+        print(json.dumps({"continue": True}))
+        return
+
+    if hook_event == "PreToolUse":
+        result = handle_pre_tool_use(powermode_dir, agent_id, input_data)
+        print(json.dumps(result or {"continue": True}))
+        return
+
+    if hook_event == "PostToolUse":
+        payload = json.dumps(input_data.get("tool_input", "")) + json.dumps(input_data.get("tool_response", ""))
+        tokens = int(len(payload) / CHARS_PER_TOKEN)
+        record_tool_use(powermode_dir, agent_id, input_data.get("tool_name", ""), tokens)
+
+    print(json.dumps({"continue": True}))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception:
+        print(json.dumps({"continue": True}))
+    sys.exit(0)
@@ -0,0 +1,290 @@
+"""Per-subagent tool budgets (.powermode/subagent-budgets/)
+
+- task-containment-enforcer.py resolves a budget for each powermode:* Task
+  call from the subagent type and complexity tier, and queues it in
+  queue.json. Other subagent types are never bound (SubagentStart only
+  fires the guard for powermode:*), so nothing is queued for them
+- subagent-budget-guard.py binds the oldest queued budget of the same type
+  to the agent_id on SubagentStart, counts tool calls and file reads on
+  PostToolUse, and denies further tools on PreToolUse once a limit is hit
+- SubagentStop logs the agent's actual usage to the complexity model history
+  (complexity_model.py) before removing its counters
+- Counters live in one small file per agent (<agent_id>.json) so parallel
+  subagents never write the same file; every read-modify-write (queue and
+  counters) holds an flock on .powermode/subagent-budgets.lock, since one
+  agent's parallel tool calls still share its file
+- The directory is removed once nothing is queued or running, so the
+  PreToolUse/PostToolUse guard can skip Python entirely when it is absent
+
+Config (powermode.json):
+  "budgets": {
+    "enabled": true,
+    "tiers": {
+      "LOW":    {"tool_calls": 20, "file_reads": 10},
+      "MEDIUM": {"tool_calls": 30, "file_reads": 15},
+      "HIGH":   {"tool_calls": 50, "file_reads": 25}
+    },
+    # Optional per subagent_type overrides, flat or per tier:
+    "agents": {"pm-implementer": {"HIGH": {"tool_calls": 80}}, "pm-explorer": {"file_reads": 40}}
+  }
+"""
+
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from pm_common import config_section, load_json, save_json_atomic, session_file
+
+BUDGETS_DIR_NAME = "subagent-budgets"
+QUEUE_NAME = "queue.json"
+LOCK_NAME = "subagent-budgets.lock"
+BUDGETED_PREFIX = "powermode:"
+
+# Queued budgets not claimed by a SubagentStart within this window are dropped
+QUEUE_TTL_SECONDS = 600
+# Per-agent counters left behind by agents that never reached SubagentStop
+AGENT_STALE_SECONDS = 24 * 3600
+
+READ_TOOLS = {"Read"}
+LIMIT_KEYS = ("tool_calls", "file_reads")
+
+DEFAULT_CONFIG = {
+    "enabled": True,
+    "tiers": {
+        "LOW": {"tool_calls": 20, "file_reads": 10},
+        "MEDIUM": {"tool_calls": 30, "file_reads": 15},
+        "HIGH": {"tool_calls": 50, "file_reads": 25},
+    },
+    "agents": {},
+}
+
+
+def budgets_dir(powermode_dir: Path) -> Path:
+    return powermode_dir / BUDGETS_DIR_NAME
+
+
+def agent_file(powermode_dir: Path, agent_id: str) -> Path:
+    return session_file(budgets_dir(powermode_dir), agent_id)
+
+
+@contextmanager
+def budgets_lock(powermode_dir: Path):
+    """Exclusive lock around a queue or counter read-modify-write."""
+    powermode_dir.mkdir(parents=True, exist_ok=True)
+    with open(powermode_dir / LOCK_NAME, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def save_queue(powermode_dir: Path, queue: list) -> None:
+    queue_file = budgets_dir(powermode_dir) / QUEUE_NAME
+    if queue:
+        save_json_atomic(queue_file, {"pending": queue})
+        return
+    try:
+        queue_file.unlink()
+    except OSError:
+        pass
+    remove_empty_dir(powermode_dir)
+
+
+def remove_empty_dir(powermode_dir: Path) -> None:
+    try:
+        budgets_dir(powermode_dir).rmdir()
+    except OSError:
+        pass
+
+
+def is_budgeted(subagent_type: str) -> bool:
+    """Subagent types the guard binds budgets to (hooks.json matcher powermode:.*)."""
+    return subagent_type.startswith(BUDGETED_PREFIX)
+
+
+def short_type(subagent_type: str) -> str:
+    """'powermode:pm-implementer' -> 'pm-implementer'."""
+    return subagent_type.rsplit(":", 1)[-1]
+
+
+def load_config(cwd: str) -> dict:
+    return config_section(cwd, "budgets", DEFAULT_CONFIG)
+
+
+def pick_limits(source: dict) -> dict:
+    limits = {}
+    for key in LIMIT_KEYS:
+        value = source.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            limits[key] = int(value)
+    return limits
+
+
+def resolve_budget(config: dict, subagent_type: str, tier: str) -> dict:
+    """Limits for a subagent type and tier: tier defaults, then agent overrides."""
+    tiers = config.get("tiers") or DEFAULT_CONFIG["tiers"]
+    limits = dict(DEFAULT_CONFIG["tiers"]["MEDIUM"])
+    limits.update(pick_limits(tiers.get(tier) or tiers.get("MEDIUM") or {}))
+
+    agent_overrides = (config.get("agents") or {}).get(short_type(subagent_type)) or {}
+    limits.update(pick_limits(agent_overrides))
+    tier_overrides = agent_overrides.get(tier)
+    if isinstance(tier_overrides, dict):
+        limits.update(pick_limits(tier_overrides))
+    return limits
+
+
+def queue_budget(
+    powermode_dir: Path, subagent_type: str, tier: str, limits: dict, estimate: dict | None = None
+) -> None:
+    if not is_budgeted(subagent_type):
+        return
+    queue_file = budgets_dir(powermode_dir) / QUEUE_NAME
+    item = {
+        "subagent_type": short_type(subagent_type),
+        "tier": tier,
+        "limits": limits,
+    }
+    if estimate:
+        # Carried to the agent record so SubagentStop can log prediction vs actual
+        item["features"] = estimate.get("features")
+        item["predicted_calls"] = estimate.get("calls")
+    with budgets_lock(powermode_dir):
+        now = time.time()
+        queue = [
+            queued for queued in (load_json(queue_file) or {}).get("pending", [])
+            if now - float(queued.get("queued_at", 0)) < QUEUE_TTL_SECONDS
+        ]
+        queue.append({**item, "queued_at": now})
+        save_queue(powermode_dir, queue)
+
+
+def claim_budget(powermode_dir: Path, agent_id: str, agent_type: str) -> dict | None:
+    """Pop the oldest queued budget for this subagent type (FIFO)."""
+    queue_file = budgets_dir(powermode_dir) / QUEUE_NAME
+    if not queue_file.exists():
+        return None
+    with budgets_lock(powermode_dir):
+        data = load_json(queue_file)
+        if not data:
+            return None
+        now = time.time()
+        wanted = short_type(agent_type)
+        claimed = None
+        remaining = []
+        for item in data.get("pending", []):
+            if now - float(item.get("queued_at", 0)) >= QUEUE_TTL_SECONDS:
+                continue
+            if claimed is None and item.get("subagent_type") == wanted:
+                claimed = item
+                continue
+            remaining.append(item)
+        if claimed is not None:
+            # Bind the agent before the queue file can go (keeps the dir)
+            start_record(powermode_dir, agent_id, claimed)
+        save_queue(powermode_dir, remaining)
+        return claimed
+
+
+def drop_expired_queue(powermode_dir: Path) -> None:
+    """Remove queue.json once every item in it is past QUEUE_TTL_SECONDS.
+
+    The file is rewritten on every queue/claim, so an mtime older than the
+    TTL means nothing in it can still be claimed (one stat otherwise).
+    """
+    queue_file = budgets_dir(powermode_dir) / QUEUE_NAME
+    try:
+        if time.time() - queue_file.stat().st_mtime <= QUEUE_TTL_SECONDS:
+            return
+    except OSError:
+        remove_empty_dir(powermode_dir)
+        return
+    with budgets_lock(powermode_dir):
+        try:
+            if time.time() - queue_file.stat().st_mtime > QUEUE_TTL_SECONDS:
+                queue_file.unlink()
+        except OSError:
+            pass
+        remove_empty_dir(powermode_dir)
+
+
+def start_agent(powermode_dir: Path, agent_id: str, agent_type: str) -> dict | None:
+    claimed = claim_budget(powermode_dir, agent_id, agent_type)
+    if not claimed:
+        return None
+    prune_stale_agents(powermode_dir)
+    return load_agent(powermode_dir, agent_id)
+
+
+def start_record(powermode_dir: Path, agent_id: str, claimed: dict) -> None:
+    record = {
+        "agent_id": agent_id,
+        "subagent_type": claimed["subagent_type"],
+        "tier": claimed.get("tier", "MEDIUM"),
+        "limits": claimed.get("limits", {}),
+        "tool_calls": 0,
+        "file_reads": 0,
+        "tokens": 0,
+        "features": claimed.get("features"),
+        "predicted_calls": claimed.get("predicted_calls"),
+        "started_at": time.time(),
+    }
+    save_json_atomic(agent_file(powermode_dir, agent_id), record)
+
+
+def load_agent(powermode_dir: Path, agent_id: str) -> dict | None:
+    return load_json(agent_file(powermode_dir, agent_id))
+
+
+def record_tool_use(powermode_dir: Path, agent_id: str, tool_name: str, tokens: int = 0) -> dict | None:
+    with budgets_lock(powermode_dir):
+        record = load_agent(powermode_dir, agent_id)
+        if record is None:
+            return None
+        record["tool_calls"] = int(record.get("tool_calls", 0)) + 1
+        if tool_name in READ_TOOLS:
+            record["file_reads"] = int(record.get("file_reads", 0)) + 1
+        record["tokens"] = int(record.get("tokens", 0)) + tokens
+        save_json_atomic(agent_file(powermode_dir, agent_id), record)
+        return record
+
+
+def exceeded_limit(record: dict, tool_name: str) -> str | None:
+    """Name of the limit this tool call would cross, or None."""
+    limits = record.get("limits") or {}
+    calls_limit = limits.get("tool_calls")
+    if calls_limit and int(record.get("tool_calls", 0)) >= calls_limit:
+        return "tool_calls"
+    reads_limit = limits.get("file_reads")
+    if tool_name in READ_TOOLS and reads_limit and int(record.get("file_reads", 0)) >= reads_limit:
+        return "file_reads"
+    return None
+
+
+def finish_agent(powermode_dir: Path, agent_id: str) -> None:
+    with budgets_lock(powermode_dir):
+        try:
+            agent_file(powermode_dir, agent_id).unlink()
+        except OSError:
+            pass
+        remove_empty_dir(powermode_dir)
+
+
+def prune_stale_agents(powermode_dir: Path) -> None:
+    cutoff = time.time() - AGENT_STALE_SECONDS
+    try:
+        entries = list(os.scandir(budgets_dir(powermode_dir)))
+    except OSError:
+        return
+    with budgets_lock(powermode_dir):
+        for entry in entries:
+            if entry.name == QUEUE_NAME:
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
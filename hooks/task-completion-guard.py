@@ -2,12 +2,92 @@
 """TaskCompleted hook: block task completion if quality checks fail.
 
 Fires when a teammate marks a task complete. Blocks completion (exit 2)
-if there are uncommitted changes or TODO/stub patterns in changed files.
+if there are uncommitted changes or TODO/stub patterns on lines added since
+HEAD (one `git diff -U0 HEAD` stream, all changed files, file:line hits).
 Only applies to powermode teammates.
 """
 import json
+import os
+import re
+import signal
 import subprocess
 import sys
+import threading
+
+from git_snapshot import dirty_paths
+
+STUB_RE = re.compile(r"TODO|FIXME|NotImplementedError|# stub|// stub|pass  #")
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+MAX_REPORTED_HITS = 15
+# The hook has 10 s; git status (or its cached snapshot) runs first
+SCAN_SECONDS = 4
+
+
+def kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def scan_added_lines(cwd: str) -> tuple[list[tuple[str, int, str]], int, bool]:
+    """Stub/TODO hits on lines added since HEAD, from one streamed git diff.
+
+    Returns up to MAX_REPORTED_HITS (path, line, text) hits, the total count
+    and whether SCAN_SECONDS ran out first. Lines that were already in HEAD
+    never match.
+    """
+    proc = subprocess.Popen(
+        ["git", "diff", "-U0", "--no-color", "--no-ext-diff", "HEAD"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=cwd,
+        text=True, errors="replace", start_new_session=True,
+    )
+    # Killing git's process group closes the pipe, so a huge or silent diff
+    # still ends the read loop inside the hook timeout; we report what we have
+    timed_out = threading.Event()
+
+    def stop():
+        timed_out.set()
+        kill_group(proc)
+
+    timer = threading.Timer(SCAN_SECONDS, stop)
+    timer.start()
+    hits = []
+    total = 0
+    path = None
+    line_no = 0
+    # File headers run from "diff --git" to the first hunk; "+++ " is only
+    # the new-file name there (an added line may itself start with "++")
+    in_header = False
+    after_old_name = False
+    try:
+        for raw in proc.stdout:
+            if raw.startswith("diff --git "):
+                in_header = True
+                after_old_name = False
+                path = None
+            elif in_header and raw.startswith("--- "):
+                after_old_name = True
+            elif in_header and after_old_name and raw.startswith("+++ "):
+                target = raw[4:].rstrip("\n").strip('"')
+                path = target[2:] if target.startswith("b/") else None
+                after_old_name = False
+            elif raw.startswith("@@"):
+                in_header = False
+                match = HUNK_RE.match(raw)
+                line_no = int(match.group(1)) if match else 0
+            elif not in_header and raw.startswith("+") and path:
+                if STUB_RE.search(raw, 1):
+                    total += 1
+                    if len(hits) < MAX_REPORTED_HITS:
+                        hits.append((path, line_no, raw[1:].strip()[:120]))
+                line_no += 1
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            kill_group(proc)
+        proc.wait()
+    return hits, total, timed_out.is_set()
 
 
 def main():
@@ -26,55 +106,42 @@ def main():
     task_subject = event_data.get("task_subject", "unknown")
     errors = []
 
-    # Check 1: uncommitted changes
-    try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            capture_output=True, text=True, cwd=cwd, timeout=5
+    # Check 1: uncommitted changes (shared snapshot, see git_snapshot.py)
+    dirty = dirty_paths(cwd)
+    if dirty:
+        errors.append(
+            f"You have {len(dirty)} uncommitted change(s). "
+            "Commit your work before marking the task complete."
         )
-        if result.returncode == 0 and result.stdout.strip():
-            changed_count = len(result.stdout.strip().splitlines())
-            errors.append(
-                f"You have {changed_count} uncommitted change(s). "
-                "Commit your work before marking the task complete."
-            )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
 
-    # Check 2: TODO/stub patterns in staged + unstaged changed files
+    # Check 2: TODO/stub patterns on lines added since HEAD (staged + unstaged)
+    truncated = False
     try:
-        result = subprocess.run(
-            ["git", "diff", "--name-only", "HEAD"],
-            capture_output=True, text=True, cwd=cwd, timeout=5
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            changed_files = result.stdout.strip().splitlines()
-            stub_patterns = ["TODO", "FIXME", "NotImplementedError", "# stub", "// stub", "pass  #"]
-            for filepath in changed_files[:20]:  # cap to avoid slowness
-                try:
-                    result = subprocess.run(
-                        ["grep", "-n", "-E", "|".join(stub_patterns), filepath],
-                        capture_output=True, text=True, cwd=cwd, timeout=3
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        matches = result.stdout.strip().splitlines()[:3]
-                        errors.append(
-                            f"Found stub/TODO patterns in {filepath}:\n"
-                            + "\n".join(f"  {m}" for m in matches)
-                        )
-                except (subprocess.TimeoutExpired, OSError):
-                    pass
-    except (subprocess.TimeoutExpired, OSError):
+        hits, total, truncated = scan_added_lines(cwd)
+        if hits:
+            shown = "\n".join(f"  {path}:{line}: {text}" for path, line, text in hits)
+            more = f"\n  ... {total - len(hits)} more" if total > len(hits) else ""
+            errors.append(f"Found {total} stub/TODO pattern(s) in added lines:\n{shown}{more}")
+    except OSError:
         pass
+    truncated_note = (
+        f"Stub/TODO scan stopped after {SCAN_SECONDS}s; only part of the diff since HEAD was checked."
+        if truncated else ""
+    )
 
     if errors:
         feedback = (
             f"Cannot mark '{task_subject}' as complete. Fix these issues first:\n\n"
             + "\n\n".join(errors)
         )
+        if truncated_note:
+            feedback += f"\n\n({truncated_note})"
         print(feedback, file=sys.stderr)
         sys.exit(2)
 
+    if truncated_note:
+        print(json.dumps({"continue": True, "systemMessage": f"[POWER MODE] {truncated_note}"}))
+        return
     print(json.dumps({"continue": True}))
 
 
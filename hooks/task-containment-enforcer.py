@@ -6,6 +6,18 @@ Injects scope constraints into EVERY delegate_task call to prevent:
 2. Scope creep within subagents
 3. Drift from original task
 
+The complexity tier comes from complexity_model.py: a weighted-feature
+score (prompt length, referenced paths, verb classes, PRD test-table size)
+calibrated on past subagent runs, which also predicts tool calls and tokens.
+
+Each call also queues a tool budget for the subagent, resolved from its
+subagent_type and complexity tier (budgets section of powermode.json).
+subagent-budget-guard.py enforces it; see subagent_budgets.py.
+
+New pm-implementer Tasks are blocked while implementer runs of the session
+await verification; pm-verifier Tasks claim those runs and get their scope
+(see verification_queue.py).
+
 Fires on: PreToolUse (Task, delegate_task)
 """
 
@@ -13,14 +25,33 @@ import sys
 import json
 from pathlib import Path
 
+from complexity_model import estimate
+from subagent_budgets import load_config as load_budget_config
+from subagent_budgets import is_budgeted, queue_budget, resolve_budget
+from verification_queue import claim_for_verifier, claim_marker, format_records, open_records
+
 # Compact containment reminder (agent definitions have the full rules)
 CONTAINMENT_REMINDER = """
 === CONTAINMENT ===
-Hard limits: 30 tool calls, 15 file reads, 25 turns. Stay focused on the exact request.
+Hard limits: {tool_calls} tool calls, {file_reads} file reads. Stay focused on the exact request.
 If task is too big: STOP early with "Task too large, recommend splitting".
 At completion: summarize in 3-5 bullets (done / not done / issues).
 """
 
+VERIFY_SCOPE = """
+=== VERIFICATION SCOPE ===
+Implementer runs assigned to this verification:
+{records}
+{marker}
+"""
+
+ESTIMATE_LINE = """Estimate: ~{calls} tool calls, ~{tokens:,} tokens ({source}).
+"""
+
+BUDGET_REMINDER = """
+Hard limits: {tool_calls} tool calls, {file_reads} file reads.
+"""
+
 
 def is_powermode_active(cwd: str, session_id: str) -> bool:
     active_mode_file = Path(cwd) / ".powermode" / "active-mode.json"
@@ -46,56 +77,32 @@ def should_enforce(tool_name: str) -> bool:
     return tool_name.lower() in ["task", "delegate_task"]
 
 
-def estimate_task_complexity(prompt: str) -> str:
-    """Estimate if the task is likely to be large."""
-    complexity_signals = {
-        "high": [
-            "implement",
-            "build",
-            "create a full",
-            "refactor",
-            "migrate",
-            "integrate",
-            "add support for",
-            "entire",
-        ],
-        "medium": [
-            "fix",
-            "update",
-            "add",
-            "modify",
-            "change",
-            "test",
-            "verify",
-            "check",
-        ],
-        "low": ["find", "search", "read", "look", "what is", "explore", "check if"],
-    }
-
-    prompt_lower = prompt.lower()
-
-    for signal in complexity_signals["high"]:
-        if signal in prompt_lower:
-            return "HIGH"
-
-    for signal in complexity_signals["medium"]:
-        if signal in prompt_lower:
-            return "MEDIUM"
-
-    return "LOW"
-
-
-def get_containment_reminder(complexity: str) -> str:
-    """Get appropriate reminder based on task complexity."""
+def get_containment_reminder(
+    complexity: str, limits: dict | None = None, prediction: dict | None = None
+) -> str:
+    """Get appropriate reminder based on task complexity, budget and prediction."""
+    if complexity == "LOW" and limits is None:
+        return ""
+    if limits is None:
+        limits = {"tool_calls": 30, "file_reads": 15}
+    if complexity == "LOW":
+        return BUDGET_REMINDER.format(**limits)
+
+    reminder = CONTAINMENT_REMINDER.format(**limits)
+    if prediction:
+        source = f"calibrated on {prediction['samples']} past runs" if prediction["calibrated"] else "uncalibrated"
+        reminder += ESTIMATE_LINE.format(calls=prediction["calls"], tokens=prediction["tokens"], source=source)
+    if prediction and prediction["calls"] >= limits["tool_calls"]:
+        return f"""
+{reminder}
+⚠️ ESTIMATED TO EXCEED BUDGET — split into subtasks now and do only the first one.
+"""
     if complexity == "HIGH":
         return f"""
-{CONTAINMENT_REMINDER}
+{reminder}
 ⚠️ HIGH COMPLEXITY — consider splitting into subtasks. What's the MINIMUM viable outcome?
 """
-    elif complexity == "MEDIUM":
-        return CONTAINMENT_REMINDER
-    else:
-        return ""
+    return reminder
 
 
 def main():
@@ -130,11 +137,17 @@ def main():
     # Note: resume calls use SendMessage (separate tool), so any Agent/Task call
     # reaching here is always a NEW agent — no need to check for resume.
     subagent_type = tool_input.get("subagent_type", "")
+    powermode_dir = Path(cwd) / ".powermode"
     if "pm-implementer" in subagent_type:
-        pending_file = Path(cwd) / ".powermode" / "pending-verification.json"
-        if pending_file.exists():
+        pending = open_records(powermode_dir, session_id)
+        legacy_pending = (
+            not (powermode_dir / "pending-verifications.json").exists()
+            and (powermode_dir / "pending-verification.json").exists()
+        )
+        if pending or legacy_pending:
+            waiting = f" ({len(pending)} implementer run(s) awaiting verification)" if pending else ""
             deny_reason = (
-                "[BLOCKED] Verification pending. You MUST run pm-verifier on the "
+                f"[BLOCKED] Verification pending{waiting}. You MUST run pm-verifier on the "
                 "previous implementer's changes before starting a new implementer. "
                 "Use: Task(subagent_type=\"powermode:pm-verifier\", prompt=\"Verify...\")"
             )
@@ -154,15 +167,31 @@ def main():
         print(json.dumps({"continue": True}))
         return
 
-    # Estimate complexity
-    complexity = estimate_task_complexity(prompt)
+    # Predict size from prompt features (calibrated on .powermode/subagent-history.jsonl)
+    prediction = estimate(prompt, cwd, subagent_type)
+    complexity = prediction["tier"]
+
+    # Resolve and queue the enforced budget for this subagent
+    limits = None
+    budget_config = load_budget_config(cwd)
+    if budget_config.get("enabled", True) and is_budgeted(subagent_type):
+        limits = resolve_budget(budget_config, subagent_type, complexity)
+        queue_budget(Path(cwd) / ".powermode", subagent_type, complexity, limits, prediction)
 
     # Get appropriate containment reminder
-    reminder = get_containment_reminder(complexity)
+    reminder = get_containment_reminder(complexity, limits, prediction)
 
     # Inject containment rules into the prompt
     enhanced_prompt = f"{prompt}\n\n{reminder}"
 
+    # A verifier claims the queued implementer runs it will verify
+    if "pm-verifier" in subagent_type:
+        claimed = claim_for_verifier(powermode_dir, session_id, prompt, input_data.get("tool_use_id", ""))
+        if claimed:
+            enhanced_prompt += VERIFY_SCOPE.format(
+                records=format_records(claimed), marker=claim_marker(claimed[0]["claimed_by"])
+            )
+
     result = {
         "hookSpecificOutput": {
             "hookEventName": "PreToolUse",
@@ -4,10 +4,34 @@
 Fires when a teammate is about to go idle. If they have uncommitted changes,
 exit 2 sends feedback that forces them to continue and commit.
 Only applies to powermode teammates.
+
+The check is scoped to what this teammate's session touched: files it edited
+(.powermode/touched/, recorded by context-monitor.py) and the changed_paths of
+implementers it ran (verification queue). git status only looks at those
+paths and at untracked files directly in their directories, so repo size and
+other teammates' changes don't matter. Sessions with nothing recorded fall
+back to the shared whole-tree snapshot (git_snapshot.py).
 """
 import json
-import subprocess
 import sys
+from pathlib import Path
+
+from git_snapshot import dirty_paths, scoped_dirty_paths
+from touched_paths import load_touched
+from verification_queue import open_records
+
+MAX_LISTED = 15
+
+
+def session_scope(cwd: str, session_id: str) -> list[str]:
+    """Root-relative paths this teammate session edited or had implemented."""
+    scope = set(load_touched(cwd, session_id))
+    if session_id:
+        records = open_records(Path(cwd) / ".powermode", session_id, status=("running", "pending", "claimed"))
+        for record in records:
+            if record.get("session_id") == session_id:
+                scope.update(record.get("changed_paths") or [])
+    return sorted(scope)
 
 
 def main():
@@ -24,23 +48,20 @@ def main():
     cwd = event_data.get("cwd", ".")
     teammate_name = event_data.get("teammate_name", "unknown")
 
-    # Check for uncommitted changes
-    try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            capture_output=True, text=True, cwd=cwd, timeout=5
+    # Check for uncommitted changes in what this teammate touched
+    scope = session_scope(cwd, event_data.get("session_id", ""))
+    dirty = scoped_dirty_paths(cwd, scope) if scope else dirty_paths(cwd)
+    if dirty:
+        listed = "\n".join(f"  {path}" for path in dirty[:MAX_LISTED])
+        if len(dirty) > MAX_LISTED:
+            listed += f"\n  ... {len(dirty) - MAX_LISTED} more"
+        feedback = (
+            f"You ({teammate_name}) have {len(dirty)} uncommitted change(s):\n{listed}\n"
+            "You must commit your implementation before going idle. "
+            "Run: git add <changed files> && git commit -m '<feature-slug>: <description>'"
         )
-        if result.returncode == 0 and result.stdout.strip():
-            changed_count = len(result.stdout.strip().splitlines())
-            feedback = (
-                f"You ({teammate_name}) have {changed_count} uncommitted change(s). "
-                "You must commit your implementation before going idle. "
-                "Run: git add <changed files> && git commit -m '<feature-slug>: <description>'"
-            )
-            print(feedback, file=sys.stderr)
-            sys.exit(2)
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        print(feedback, file=sys.stderr)
+        sys.exit(2)
 
     # No issues — allow idle
     sys.exit(0)
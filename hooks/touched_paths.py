@@ -0,0 +1,78 @@
+"""Files a powermode agent session edited (.powermode/touched/<session>.json)
+
+context-monitor.py records every Write/Edit/MultiEdit/NotebookEdit target
+of powermode agents (teammates and subagents, which are not the active
+powermode session it otherwise tracks). teammate-idle-guard.py scopes its
+git status to these paths, plus the changed_paths the verification queue
+recorded for implementers the session spawned, instead of the whole repo.
+
+  {"paths": ["src/api.py", "tests/test_api.py"], "updated_at": 1760000000.0}
+
+Paths are relative to the git worktree root.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from git_snapshot import find_git_dirs
+from pm_common import load_json, save_json_atomic, session_file
+
+TOUCHED_DIR = "touched"
+EDIT_TOOLS = {"write", "edit", "multiedit", "notebookedit"}
+MAX_PATHS = 500
+STALE_SECONDS = 7 * 24 * 3600
+
+
+def touched_file(cwd: str, session_id: str) -> Path:
+    return session_file(Path(cwd) / ".powermode" / TOUCHED_DIR, session_id)
+
+
+def relative_to_root(cwd: str, file_path: str) -> str | None:
+    dirs = find_git_dirs(cwd)
+    if not dirs:
+        return None
+    path = os.path.normpath(os.path.join(cwd, file_path))
+    rel = os.path.relpath(path, dirs[0])
+    return None if rel.startswith("..") else rel
+
+
+def prune_stale(directory: Path, now: float) -> None:
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > STALE_SECONDS:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def record_edit(cwd: str, session_id: str, tool_name: str, file_path: str) -> None:
+    if not session_id or not file_path or tool_name.lower() not in EDIT_TOOLS:
+        return
+    if not (Path(cwd) / ".powermode").is_dir():
+        return
+    rel = relative_to_root(cwd, file_path)
+    if not rel:
+        return
+    path = touched_file(cwd, session_id)
+    data = load_json(path)
+    now = time.time()
+    if data is None:
+        # Once per new session is often enough to clear out old sessions
+        prune_stale(path.parent, now)
+        data = {"paths": []}
+    paths = data.get("paths") or []
+    if rel in paths:
+        return
+    data["paths"] = (paths + [rel])[-MAX_PATHS:]
+    data["updated_at"] = now
+    save_json_atomic(path, data)
+
+
+def load_touched(cwd: str, session_id: str) -> list[str]:
+    data = load_json(touched_file(cwd, session_id)) if session_id else None
+    return list((data or {}).get("paths") or [])
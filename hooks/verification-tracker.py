@@ -1,17 +1,44 @@
 #!/usr/bin/env python3
-"""Verification Tracker Hook (SubagentStop: powermode:pm-verifier)
+"""Verification Tracker Hook (SubagentStart + SubagentStop: powermode:pm-verifier)
+
+When pm-verifier starts:
+- Binds the implementer runs its Task claimed to its agent_id
+  (see verification_queue.py) and injects their changed-path manifest.
+  The claim is matched by the claim id task-containment-enforcer wrote
+  into the prompt (payload or agent transcript) or the Task's tool_use_id
 
 After pm-verifier completes:
-- Clears pending-verification (unblocks next implementer)
+- Removes the runs it verified from the queue (unblocks the next
+  implementer once none remain); a verifier with no claim clears nothing
 - Injects reminder to run simplify via additionalContext
 
-Fires on: SubagentStop (powermode:pm-verifier)
+Fires on: SubagentStart, SubagentStop (powermode:pm-verifier)
 """
 
 import json
 import sys
 from pathlib import Path
 
+from verification_queue import bind_verifier, complete_verifier, find_claim_id, format_records
+
+# The prompt is the first message of the agent transcript
+TRANSCRIPT_HEAD_BYTES = 256 * 1024
+
+
+def claim_id_for(input_data: dict) -> str:
+    """Claim id from the verifier prompt: in the payload, else its transcript."""
+    claim_id = find_claim_id(json.dumps(input_data))
+    if claim_id:
+        return claim_id
+    transcript = input_data.get("agent_transcript_path", "")
+    if not transcript:
+        return ""
+    try:
+        with open(transcript, "r", errors="replace") as f:
+            return find_claim_id(f.read(TRANSCRIPT_HEAD_BYTES))
+    except OSError:
+        return ""
+
 
 def main():
     try:
@@ -22,22 +49,54 @@ def main():
 
     cwd = input_data.get("cwd", ".")
     state_dir = Path(cwd) / ".powermode"
-    pending_verification = state_dir / "pending-verification.json"
+    agent_id = input_data.get("agent_id", "unknown")
+
+    if input_data.get("hook_event_name") == "SubagentStart":
+        try:
+            bound = bind_verifier(
+                state_dir, agent_id, claim_id_for(input_data),
+                input_data.get("tool_use_id") or input_data.get("parent_tool_use_id") or "",
+            )
+        except (IOError, OSError):
+            bound = []
+        context = "[POWER MODE] Verifier registered"
+        if bound:
+            context = (
+                f"[POWER MODE] Verifier registered for {len(bound)} implementer run(s). "
+                "Verify only these changes:\n" + format_records(bound)
+            )
+        print(json.dumps({
+            "hookSpecificOutput": {
+                "hookEventName": "SubagentStart",
+                "additionalContext": context,
+            }
+        }))
+        sys.exit(0)
 
     try:
-        if pending_verification.exists():
-            pending_verification.unlink()
+        cleared, remaining = complete_verifier(
+            state_dir, agent_id, input_data.get("session_id", ""), claim_id_for(input_data)
+        )
     except (IOError, OSError):
-        pass
+        cleared, remaining = 0, 0
+
+    message = (
+        "[POWER MODE] Verification complete. "
+        "Run Skill(skill='simplify') now — this is MANDATORY after verification completes. "
+        "Do NOT skip simplify."
+    )
+    if remaining and not cleared:
+        message += (
+            f" This verifier had no claimed implementer runs, so none were cleared;"
+            f" {remaining} run(s) still await verification via Task(subagent_type=\"powermode:pm-verifier\")."
+        )
+    elif remaining:
+        message += f" {remaining} other implementer run(s) still await verification."
 
     print(json.dumps({
         "hookSpecificOutput": {
             "hookEventName": "SubagentStop",
-            "additionalContext": (
-                "[POWER MODE] Verification complete. "
-                "Run Skill(skill='simplify') now — this is MANDATORY after verification completes. "
-                "Do NOT skip simplify."
-            ),
+            "additionalContext": message,
         }
     }))
     sys.exit(0)
@@ -0,0 +1,415 @@
+"""Per-implementer verification queue (.powermode/pending-verifications.json)
+
+One record per pm-implementer run replaces the single pending-verification
+flag, so parallel implementers (team mode) are each verified:
+
+  running  - SubagentStart (implementer-lifecycle.py): HEAD (read from the
+             ref files) and, when the shared git snapshot is still fresh, a
+             working-tree fingerprint (mtime/size of every dirty path).
+             Start never runs git status; without a fingerprint, dirty
+             paths count as touched if modified after the start
+  pending  - SubagentStop: marked pending first (mark_stopped, no git), then
+             enriched with the stop ref, the exact paths the implementer
+             touched (committed since the start ref, or dirty and changed
+             since the fingerprint) and numstat diff stats (enrich_stopped)
+  claimed  - a pm-verifier Task claimed it (task-containment-enforcer.py);
+             the claim id is written into the verifier's prompt and bound
+             to the verifier's agent_id when its SubagentStart or
+             SubagentStop payload/transcript carries that id (never by
+             arrival order: parallel verifiers start in any order)
+  (removed)- that verifier's SubagentStop (verification-tracker.py); a
+             verifier without a claim clears nothing
+
+The changed-path manifest is appended to the verifier's prompt and
+repeated in its SubagentStart context, so verification covers only what
+the implementer touched. A verifier prompt that names implementer agent
+ids claims only those records; otherwise it claims every unclaimed record
+of the session.
+Claims whose verifier never finishes are released after CLAIM_TTL_SECONDS.
+
+Every read-modify-write holds an flock on .powermode/pending-verifications.lock.
+Git commands run before the lock is taken, so a slow git never holds up
+other implementers and verifiers.
+
+.powermode/pending-verification.json is still written as a read-compatible
+view while any pending or claimed record exists, and removed when none remain.
+"""
+
+import fcntl
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from git_snapshot import expand_untracked_dirs, find_git_dirs, read_head_ref, run_git, snapshot
+from pm_common import load_json, save_json_atomic
+
+QUEUE_NAME = "pending-verifications.json"
+LOCK_NAME = "pending-verifications.lock"
+LEGACY_FILE_NAME = "pending-verification.json"
+
+# Unbound claims (verifier Task denied or never started) and claims whose
+# verifier crashed go back to pending after these windows
+UNBOUND_CLAIM_SECONDS = 600
+CLAIM_TTL_SECONDS = 3600
+# Running records of implementers that never reached SubagentStop
+RUNNING_TTL_SECONDS = 24 * 3600
+
+OPEN_STATUSES = ("pending", "claimed")
+
+CLAIM_ID_RE = re.compile(r"claim:[0-9a-f]{12}")
+CLAIM_MARKER = "[verification claim {claim_id}]"
+
+# Filesystem timestamp slack when no start fingerprint was taken
+MTIME_SLACK_SECONDS = 1
+
+# numstat is skipped for larger change sets (paths are still listed)
+MAX_STAT_PATHS = 500
+
+
+def queue_file(powermode_dir: Path) -> Path:
+    return powermode_dir / QUEUE_NAME
+
+
+@contextmanager
+def queue_lock(powermode_dir: Path):
+    """Exclusive lock around a queue read-modify-write."""
+    powermode_dir.mkdir(parents=True, exist_ok=True)
+    with open(powermode_dir / LOCK_NAME, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_queue(powermode_dir: Path) -> dict:
+    data = load_json(queue_file(powermode_dir)) or {}
+    data.setdefault("records", {})
+    data.setdefault("claims", [])
+    return data
+
+
+def save_queue(powermode_dir: Path, queue: dict) -> None:
+    save_json_atomic(queue_file(powermode_dir), queue)
+    write_legacy_view(powermode_dir, queue)
+
+
+def write_legacy_view(powermode_dir: Path, queue: dict) -> None:
+    legacy_file = powermode_dir / LEGACY_FILE_NAME
+    open_records = [r for r in queue["records"].values() if r.get("status") in OPEN_STATUSES]
+    if not open_records:
+        try:
+            legacy_file.unlink()
+        except OSError:
+            pass
+        return
+    newest = max(open_records, key=lambda r: r.get("stopped_at", 0))
+    save_json_atomic(legacy_file, {
+        "agent_id": newest.get("agent_id", ""),
+        "awaiting_verifier": True,
+        "pending": len(open_records),
+    })
+
+
+def worktree_fingerprint(cwd: str, refresh: bool = True) -> tuple[str | None, dict | None]:
+    """HEAD and the mtime/size of every dirty path (None for deleted files).
+
+    refresh=True runs a fresh git status (and refreshes the shared snapshot);
+    refresh=False only uses a snapshot still within its max_age and returns
+    (None, None) otherwise.
+    """
+    snap = snapshot(cwd, max_age=0) if refresh else snapshot(cwd, refresh=False)
+    if snap is None:
+        return None, None
+    fingerprint = {}
+    # Per-file paths, so a file added to an already-untracked dir is seen
+    for _, path in expand_untracked_dirs(snap["root"], snap["entries"]):
+        try:
+            st = os.stat(os.path.join(snap["root"], path))
+            fingerprint[path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            fingerprint[path] = None
+    return snap["head_ref"], fingerprint
+
+
+def changed_paths(cwd: str, record: dict, stop_ref: str | None, stop_fp: dict | None) -> list[str] | None:
+    """Paths this implementer touched: committed since start_ref, or dirty now
+    and not in the same state (mtime/size) as when it started. Without a
+    start fingerprint, dirty paths modified after started_at (or deleted)."""
+    start_ref = record.get("start_ref")
+    start_fp = record.get("start_fingerprint")
+    if stop_fp is None:
+        return None
+
+    changed = set()
+    if start_ref and stop_ref and start_ref != stop_ref:
+        out = run_git(cwd, "diff", "--name-only", start_ref, stop_ref, timeout=5)
+        changed.update(line for line in (out or "").splitlines() if line)
+    if start_fp is None:
+        since_ns = (float(record.get("started_at") or 0) - MTIME_SLACK_SECONDS) * 1e9
+        changed.update(path for path, state in stop_fp.items() if state is None or state[0] >= since_ns)
+    else:
+        changed.update(path for path, state in stop_fp.items() if start_fp.get(path, False) != state)
+    return sorted(changed)
+
+
+def diff_stats(cwd: str, start_ref: str | None, paths: list[str]) -> dict:
+    """{path: [added, deleted]} of the working tree against start_ref."""
+    if not start_ref or not paths or len(paths) > MAX_STAT_PATHS:
+        return {}
+    stats = {}
+    out = run_git(cwd, "diff", "--numstat", start_ref, "--", *paths, timeout=5)
+    for line in (out or "").splitlines():
+        parts = line.split("\t", 2)
+        if len(parts) == 3:
+            added, deleted, path = parts
+            # Binary files report "-"
+            stats[path] = [int(added) if added.isdigit() else 0, int(deleted) if deleted.isdigit() else 0]
+    for path in paths:
+        if path in stats:
+            continue
+        # Untracked new files are not in git diff
+        try:
+            with open(os.path.join(cwd, path), "rb") as f:
+                stats[path] = [sum(1 for _ in f), 0]
+        except OSError:
+            pass
+    return stats
+
+
+def expire(queue: dict, now: float) -> None:
+    records = queue["records"]
+    for agent_id, record in list(records.items()):
+        status = record.get("status")
+        if status == "running" and now - record.get("started_at", now) > RUNNING_TTL_SECONDS:
+            records.pop(agent_id)
+        elif status == "claimed":
+            claimed_by = record.get("claimed_by", "")
+            window = UNBOUND_CLAIM_SECONDS if claimed_by.startswith("claim:") else CLAIM_TTL_SECONDS
+            if now - record.get("claimed_at", now) > window:
+                record.update({"status": "pending", "claimed_by": None, "claimed_at": None})
+    queue["claims"] = [
+        c for c in queue["claims"] if now - c.get("created_at", now) <= UNBOUND_CLAIM_SECONDS
+    ]
+
+
+def record_start(powermode_dir: Path, agent_id: str, session_id: str, cwd: str) -> None:
+    """Running record; never waits for a status walk (subagent startup blocks on it)."""
+    _, start_fp = worktree_fingerprint(cwd, refresh=False)
+    start_ref = read_head_ref(cwd)
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        expire(queue, time.time())
+        queue["records"][agent_id] = {
+            "agent_id": agent_id,
+            "session_id": session_id,
+            "status": "running",
+            "start_ref": start_ref,
+            "start_fingerprint": start_fp,
+            "started_at": time.time(),
+        }
+        save_queue(powermode_dir, queue)
+
+
+def mark_stopped(powermode_dir: Path, agent_id: str, session_id: str) -> dict:
+    """Move an implementer's record to pending (no git work, so it always lands).
+
+    changed_paths stays None ("check git status") until enrich_stopped fills it.
+    """
+    now = time.time()
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        expire(queue, now)
+        record = queue["records"].get(agent_id) or {
+            "agent_id": agent_id,
+            "session_id": session_id,
+            "start_ref": None,
+            "started_at": None,
+        }
+        record.update({
+            "status": "pending",
+            "stop_ref": None,
+            "changed_paths": None,
+            "diff_stats": {},
+            "stopped_at": now,
+            "claimed_by": None,
+            "claimed_at": None,
+        })
+        queue["records"][agent_id] = record
+        save_queue(powermode_dir, queue)
+    return record
+
+
+def enrich_stopped(powermode_dir: Path, agent_id: str, cwd: str) -> dict | None:
+    """Add the stop ref, changed paths and diff stats to a pending record."""
+    # Only this agent's hooks write its record before it is claimed; read it
+    # unlocked and run git before taking the lock
+    start = load_queue(powermode_dir)["records"].get(agent_id)
+    if not start:
+        return None
+    stop_ref, stop_fp = worktree_fingerprint(cwd)
+    # Status paths are relative to the worktree root, not cwd
+    root = (find_git_dirs(cwd) or (cwd,))[0]
+    paths = changed_paths(root, start, stop_ref, stop_fp)
+    stats = diff_stats(root, start.get("start_ref"), paths or [])
+
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        record = queue["records"].get(agent_id)
+        # Already verified and removed, or restarted under the same id
+        if not record or record.get("stopped_at") != start.get("stopped_at"):
+            return None
+        record.pop("start_fingerprint", None)
+        record.update({
+            "stop_ref": stop_ref,
+            "changed_paths": paths,
+            "diff_stats": stats,
+            "lines_added": sum(a for a, _ in stats.values()),
+            "lines_deleted": sum(d for _, d in stats.values()),
+        })
+        save_queue(powermode_dir, queue)
+    return record
+
+
+def open_records(powermode_dir: Path, session_id: str = "", status: tuple = OPEN_STATUSES) -> list[dict]:
+    """Pending/claimed records, for one session when session_id is given."""
+    data = load_json(queue_file(powermode_dir))
+    if not data:
+        return []
+    now = time.time()
+    records = []
+    for record in data.get("records", {}).values():
+        if session_id and record.get("session_id") not in (session_id, ""):
+            continue
+        record_status = record.get("status")
+        # Expired claims count as pending again
+        if record_status == "claimed" and now - record.get("claimed_at", now) > CLAIM_TTL_SECONDS:
+            record_status = "pending"
+        if record_status in status:
+            records.append(record)
+    return sorted(records, key=lambda r: r.get("stopped_at") or 0)
+
+
+def claim_marker(claim_id: str) -> str:
+    """Line for the verifier prompt; find_claim_id reads it back."""
+    return CLAIM_MARKER.format(claim_id=claim_id)
+
+
+def find_claim_id(text: str) -> str:
+    match = CLAIM_ID_RE.search(text or "")
+    return match.group(0) if match else ""
+
+
+def claim_for_verifier(powermode_dir: Path, session_id: str, prompt: str, tool_use_id: str = "") -> list[dict]:
+    """Claim records for a pm-verifier Task (all share one claim id in claimed_by)."""
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        now = time.time()
+        expire(queue, now)
+        candidates = [
+            r for r in queue["records"].values()
+            if r.get("status") == "pending" and r.get("session_id") in (session_id, "")
+        ]
+        named = [r for r in candidates if r["agent_id"] in prompt]
+        claimed = named or candidates
+        if not claimed:
+            return []
+        claim_id = f"claim:{uuid.uuid4().hex[:12]}"
+        for record in claimed:
+            record.update({"status": "claimed", "claimed_by": claim_id, "claim_id": claim_id, "claimed_at": now})
+        queue["claims"].append({"claim_id": claim_id, "tool_use_id": tool_use_id, "created_at": now})
+        save_queue(powermode_dir, queue)
+        return claimed
+
+
+def bind_verifier(powermode_dir: Path, verifier_id: str, claim_id: str = "", tool_use_id: str = "") -> list[dict]:
+    """Bind the claim made by this verifier's Task; returns the records bound.
+
+    The claim is found by its id (from the verifier prompt) or the Task's
+    tool_use_id. Nothing is bound when neither matches.
+    """
+    if not (claim_id or tool_use_id) or not queue_file(powermode_dir).exists():
+        return []
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        expire(queue, time.time())
+        match = next(
+            (
+                c for c in queue["claims"]
+                if (claim_id and c.get("claim_id") == claim_id)
+                or (tool_use_id and c.get("tool_use_id") == tool_use_id)
+            ),
+            None,
+        )
+        if match is None:
+            return []
+        queue["claims"].remove(match)
+        claim_id = match["claim_id"]
+        bound = []
+        for record in queue["records"].values():
+            if record.get("claimed_by") == claim_id:
+                record["claimed_by"] = verifier_id
+                bound.append(record)
+        save_queue(powermode_dir, queue)
+        return bound
+
+
+def complete_verifier(
+    powermode_dir: Path, verifier_id: str, session_id: str = "", claim_id: str = ""
+) -> tuple[int, int]:
+    """Remove records verified by this verifier; returns (cleared, still open
+    in the session).
+
+    Records count as verified when bound to verifier_id, or when claim_id
+    (read back from the verifier's transcript) is their latest claim and no
+    other verifier holds them. A verifier without a claim (started outside
+    task-containment) clears nothing.
+    """
+    with queue_lock(powermode_dir):
+        queue = load_queue(powermode_dir)
+        records = queue["records"]
+        mine = [
+            aid for aid, r in records.items()
+            if r.get("claimed_by") == verifier_id
+            or (
+                claim_id
+                and r.get("claim_id") == claim_id
+                and r.get("status") in OPEN_STATUSES
+                and r.get("claimed_by") in (claim_id, None)
+            )
+        ]
+        for agent_id in mine:
+            records.pop(agent_id, None)
+        if claim_id:
+            queue["claims"] = [c for c in queue["claims"] if c.get("claim_id") != claim_id]
+        save_queue(powermode_dir, queue)
+        remaining = sum(
+            1 for r in records.values()
+            if r.get("status") in OPEN_STATUSES and (not session_id or r.get("session_id") in (session_id, ""))
+        )
+        return len(mine), remaining
+
+
+def format_records(records: list[dict], max_paths: int = 15) -> str:
+    """Verification scope for a verifier prompt."""
+    lines = []
+    for record in records:
+        refs = ""
+        if record.get("start_ref") and record.get("stop_ref"):
+            refs = f" ({record['start_ref'][:10]}..{record['stop_ref'][:10]})"
+        paths = record.get("changed_paths")
+        if paths is None:
+            lines.append(f"- implementer {record['agent_id']}{refs}: changed paths unknown, check git status")
+            continue
+        stats = record.get("diff_stats") or {}
+        totals = f", +{record.get('lines_added', 0)}/-{record.get('lines_deleted', 0)}" if stats else ""
+        lines.append(f"- implementer {record['agent_id']}{refs}: {len(paths)} changed path(s){totals}")
+        for path in paths[:max_paths]:
+            stat = stats.get(path)
+            lines.append(f"    {path} (+{stat[0]}/-{stat[1]})" if stat else f"    {path}")
+        if len(paths) > max_paths:
+            lines.append(f"    ... {len(paths) - max_paths} more")
+    return "\n".join(lines)
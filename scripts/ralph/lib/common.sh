@@ -7,6 +7,20 @@ set -euo pipefail
 RALPH_INTERRUPTED=0
 RALPH_PIPE_PID=""
 RALPH_PID_FILE=""
+# Background workers of `ralph implement --parallel` (space-separated PIDs)
+RALPH_WORKER_PIDS=""
+
+# Kill a process and all its descendants (parallel workers run claude
+# several levels down)
+_ralph_kill_tree() {
+    local pid="$1"
+    local sig="${2:-TERM}"
+    local child
+    for child in $(pgrep -P "$pid" 2>/dev/null); do
+        _ralph_kill_tree "$child" "$sig"
+    done
+    kill -"$sig" "$pid" 2>/dev/null || true
+}
 
 _ralph_cleanup() {
     RALPH_INTERRUPTED=1
@@ -22,6 +36,10 @@ _ralph_cleanup() {
         pkill -KILL -P "$RALPH_PIPE_PID" 2>/dev/null || true
         kill -KILL "$RALPH_PIPE_PID" 2>/dev/null || true
     fi
+    local worker_pid
+    for worker_pid in $RALPH_WORKER_PIDS; do
+        _ralph_kill_tree "$worker_pid" TERM
+    done
     # Kill any remaining descendants
     pkill -TERM -P $$ 2>/dev/null || true
     sleep 0.2
@@ -89,6 +107,8 @@ check_prerequisites() {
 # Usage: run_claude_session "<prompt>" [extra-flags...]
 # Sets: CLAUDE_RESULT, CLAUDE_COST, CLAUDE_ERROR, CLAUDE_TURNS,
 #        CLAUDE_DURATION, CLAUDE_SESSION_ID
+# Reads: RALPH_SESSION_KIND / RALPH_SESSION_TARGET (e.g. "implement" and
+#        "01-core/02-api") to label the session in RALPH_TIMELINE
 run_claude_session() {
     local prompt="$1"
     shift
@@ -119,7 +139,16 @@ run_claude_session() {
         echo -e "          ${DIM}━━━━━━━━━━━━━━${RESET}"
     fi
 
-    # Use stream-json with verbose for live progress feedback
+    # --model from the flags, for the session timeline
+    local model="" i
+    for (( i = 0; i < ${#extra_flags[@]}; i++ )); do
+        if [[ "${extra_flags[$i]}" == "--model" && $(( i + 1 )) -lt ${#extra_flags[@]} ]]; then
+            model="${extra_flags[$(( i + 1 ))]}"
+        fi
+    done
+
+    # Use stream-json with verbose for live progress feedback; progress output,
+    # result parsing input and the timeline come from lib/session_stream.py
     local tmp_output
     tmp_output=$(mktemp)
     local exit_code=0
@@ -134,145 +163,9 @@ run_claude_session() {
         --dangerously-skip-permissions \
         --no-session-persistence \
         "${extra_flags[@]}" \
-        "$prompt" 2>&1 | python3 -u -c "
-import json, sys, time, os
-
-verbose = os.environ.get('RALPH_VERBOSE', '0') == '1'
-live = os.environ.get('RALPH_LIVE', '0') == '1'
-tool_count = 0
-result_data = {}
-start = time.time()
-in_tool = False
-current_tool = ''
-text_buffer = ''
-live_needs_newline = False  # track if live text needs a newline before next tool line
-DIM = '\033[2m'
-CYAN = '\033[0;36m'
-RESET = '\033[0m'
-
-def timestamp():
-    elapsed = int(time.time() - start)
-    mins, secs = divmod(elapsed, 60)
-    return f'{mins}m{secs:02d}s' if mins else f'{secs}s'
-
-def flush_live_newline():
-    global live_needs_newline
-    if live_needs_newline:
-        sys.stderr.write(f'{RESET}\n')
-        sys.stderr.flush()
-        live_needs_newline = False
-
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-    try:
-        event = json.loads(line)
-    except json.JSONDecodeError:
-        continue
-
-    etype = event.get('type', '')
-
-    # ── Handle SDK-style stream events (from --include-partial-messages) ──
-    if etype == 'stream_event':
-        inner = event.get('event', {})
-        inner_type = inner.get('type', '')
-
-        if inner_type == 'content_block_start':
-            block = inner.get('content_block', {})
-            if block.get('type') == 'tool_use':
-                # Flush any buffered text (verbose mode)
-                if verbose and text_buffer.strip():
-                    for tl in text_buffer.strip().split('\n'):
-                        print(f'          {DIM}{tl}{RESET}', file=sys.stderr)
-                    text_buffer = ''
-                # End live text block if active
-                flush_live_newline()
-                current_tool = block.get('name', '?')
-                tool_count += 1
-                in_tool = True
-                print(f'\r          \u21b3 [{tool_count}] {current_tool} ({timestamp()}){\" \" * 20}', end='', flush=True, file=sys.stderr)
-            elif block.get('type') == 'text':
-                in_tool = False
-                if live:
-                    # Start a new dimmed text block
-                    sys.stderr.write(f'\n          {DIM}')
-                    sys.stderr.flush()
-
-        elif inner_type == 'content_block_delta':
-            delta = inner.get('delta', {})
-            if delta.get('type') == 'text_delta' and not in_tool:
-                text = delta.get('text', '')
-                if live and text:
-                    # Stream text directly — indent newlines
-                    indented = text.replace('\n', f'\n          ')
-                    sys.stderr.write(indented)
-                    sys.stderr.flush()
-                    live_needs_newline = True
-                elif verbose:
-                    text_buffer += text
-
-        elif inner_type == 'content_block_stop':
-            if in_tool:
-                in_tool = False
-            elif live:
-                flush_live_newline()
-
-        continue
-
-    # ── Handle assistant messages (complete turns, from --verbose) ──
-    if etype == 'assistant':
-        msg = event.get('message', {})
-        if isinstance(msg, dict):
-            for block in msg.get('content', []):
-                if not isinstance(block, dict):
-                    continue
-                if block.get('type') == 'tool_use':
-                    flush_live_newline()
-                    tool_name = block.get('name', '?')
-                    tool_count += 1
-                    print(f'\r          \u21b3 [{tool_count}] {tool_name} ({timestamp()}){\" \" * 20}', end='', flush=True, file=sys.stderr)
-                    # Show tool input in verbose mode
-                    if verbose:
-                        inp = block.get('input', {})
-                        if isinstance(inp, dict):
-                            if tool_name in ('Read', 'Glob', 'Grep'):
-                                path = inp.get('file_path', inp.get('pattern', inp.get('path', '')))
-                                if path:
-                                    print(f'\n          {DIM}  \u2192 {path}{RESET}', end='', flush=True, file=sys.stderr)
-                            elif tool_name in ('Write', 'Edit'):
-                                path = inp.get('file_path', '')
-                                if path:
-                                    print(f'\n          {DIM}  \u2192 {path}{RESET}', end='', flush=True, file=sys.stderr)
-                            elif tool_name == 'Bash':
-                                cmd = inp.get('command', '')
-                                if cmd:
-                                    short = cmd[:80] + ('...' if len(cmd) > 80 else '')
-                                    print(f'\n          {DIM}  $ {short}{RESET}', end='', flush=True, file=sys.stderr)
-                elif block.get('type') == 'text':
-                    if verbose and not live:
-                        text = block.get('text', '')
-                        if text.strip():
-                            for tl in text.strip().split('\n')[:5]:
-                                print(f'\n          {DIM}{tl[:120]}{RESET}', end='', flush=True, file=sys.stderr)
-                            if len(text.strip().split('\n')) > 5:
-                                print(f'\n          {DIM}  ... ({len(text.strip().split(chr(10)))} lines){RESET}', end='', flush=True, file=sys.stderr)
-
-    # Capture the last event as result
-    result_data = event
-
-# Flush remaining
-flush_live_newline()
-if verbose and not live and text_buffer.strip():
-    for tl in text_buffer.strip().split('\n'):
-        print(f'          {DIM}{tl}{RESET}', file=sys.stderr)
-
-# Clear progress line
-if tool_count > 0:
-    print('', file=sys.stderr)
-
-json.dump(result_data, sys.stdout)
-" > "$tmp_output"
+        "$prompt" 2>&1 | python3 -u "$SCRIPT_DIR/lib/session_stream.py" stream --timeline "$RALPH_TIMELINE" \
+            --kind "${RALPH_SESSION_KIND:-}" --target "${RALPH_SESSION_TARGET:-}" --model "$model" \
+        > "$tmp_output"
     ) &
     RALPH_PIPE_PID=$!
 
@@ -306,6 +199,7 @@ json.dump(result_data, sys.stdout)
 
     if [[ $exit_code -ne 0 && -z "$raw_output" ]]; then
         CLAUDE_ERROR="Claude exited with code $exit_code"
+        _ralph_ledger_record "$start_ts" "$model"
         return 1
     fi
 
@@ -368,6 +262,7 @@ print(m.group(1) if m else '0')
     TOTAL_TOKENS_OUT=$(( TOTAL_TOKENS_OUT + ${CLAUDE_TOKENS_OUT:-0} ))
     TOTAL_LINES_ADDED=$(( ${TOTAL_LINES_ADDED:-0} + ${CLAUDE_LINES_ADDED:-0} ))
     TOTAL_LINES_REMOVED=$(( ${TOTAL_LINES_REMOVED:-0} + ${CLAUDE_LINES_REMOVED:-0} ))
+    _ralph_ledger_record "$start_ts" "$model"
 
     if [[ -n "$CLAUDE_ERROR" ]]; then
         return 1
@@ -375,6 +270,40 @@ print(m.group(1) if m else '0')
     return 0
 }
 
+# ── Session ledger (lib/ledger.py) ──────────────────────────────────────────
+# Appends the CLAUDE_* metrics of the session that just ended to
+# .powermode/ralph/ledger.db, so cost and throughput survive the run
+_ralph_ledger_record() {
+    local started="$1"
+    local model="$2"
+    [[ -n "$RALPH_LEDGER" ]] || return 0
+    local outcome="ok"
+    if [[ $RALPH_INTERRUPTED -eq 1 ]]; then
+        outcome="interrupted"
+    elif [[ -n "$CLAUDE_ERROR" ]]; then
+        outcome="error"
+    fi
+    python3 "$SCRIPT_DIR/lib/ledger.py" --db "$RALPH_LEDGER" record \
+        --slug "$RALPH_RUN_SLUG" --run "$(basename "${LOG_FILE%.log}")" \
+        --kind "${RALPH_SESSION_KIND:-}" --target "${RALPH_SESSION_TARGET:-}" --model "$model" \
+        --started "$started" --duration "${CLAUDE_DURATION:-0}" --cost "${CLAUDE_COST:-0}" \
+        --tokens-in "${CLAUDE_TOKENS_IN:-0}" --tokens-out "${CLAUDE_TOKENS_OUT:-0}" --turns "${CLAUDE_TURNS:-0}" \
+        --lines-added "${CLAUDE_LINES_ADDED:-0}" --lines-removed "${CLAUDE_LINES_REMOVED:-0}" \
+        --outcome "$outcome" 2>/dev/null || true
+}
+
+# Usage: ralph_ledger_task_outcome "<feature/task>" done|failed
+# The implement session is recorded before ralph knows whether the task
+# finished; attach the result (marked done or not) to that row afterwards
+ralph_ledger_task_outcome() {
+    local target="$1"
+    local outcome="$2"
+    [[ -n "$RALPH_LEDGER" ]] || return 0
+    python3 "$SCRIPT_DIR/lib/ledger.py" --db "$RALPH_LEDGER" task-outcome \
+        --slug "$RALPH_RUN_SLUG" --run "$(basename "${LOG_FILE%.log}")" \
+        --target "$target" --outcome "$outcome" 2>/dev/null || true
+}
+
 # ── Formatting ──────────────────────────────────────────────────────────────
 format_tokens() {
     local count="$1"
@@ -477,6 +406,12 @@ for line in lines[:3]:
 
 # ── Logging to file ─────────────────────────────────────────────────────────
 LOG_FILE=""
+RALPH_TIMELINE=""
+RALPH_LEDGER=""
+RALPH_RUN_SLUG=""
+# Label of the next run_claude_session in the timeline (kind + feature/task)
+RALPH_SESSION_KIND=""
+RALPH_SESSION_TARGET=""
 
 init_log() {
     local type="$1"
@@ -484,6 +419,10 @@ init_log() {
     local log_dir="${RALPH_LOG_DIR:-.powermode/ralph}"
     mkdir -p "$log_dir"
     LOG_FILE="$log_dir/${type}-${slug}-$(date +%Y%m%dT%H%M%S).log"
+    # Session timelines (lib/session_stream.py); absolute, parallel workers cd
+    RALPH_TIMELINE="$(cd "$log_dir" && pwd)/$(basename "${LOG_FILE%.log}").timeline.jsonl"
+    RALPH_LEDGER="$(cd "$log_dir" && pwd)/ledger.db"
+    RALPH_RUN_SLUG="$slug"
 }
 
 append_log() {
@@ -501,6 +440,7 @@ parse_common_args() {
     RALPH_MODEL=""
     RALPH_BUDGET=""
     RALPH_MAX_ITERS=""
+    RALPH_PARALLEL=""
 
     while [[ $# -gt 0 ]]; do
         case "$1" in
@@ -509,6 +449,7 @@ parse_common_args() {
             --model)    RALPH_MODEL="$2"; shift 2 ;;
             --budget)   RALPH_BUDGET="$2"; shift 2 ;;
             --max-iters) RALPH_MAX_ITERS="$2"; shift 2 ;;
+            --parallel) RALPH_PARALLEL="$2"; shift 2 ;;
             --verbose|-v) RALPH_VERBOSE=1; export RALPH_VERBOSE; shift ;;
             --live|-l) RALPH_LIVE=1; export RALPH_LIVE; shift ;;
             *)          POSITIONAL_ARGS+=("$1"); shift ;;
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Cost and throughput ledger across RALPH runs.
+
+run_claude_session appends one row per session to a SQLite database
+(.powermode/ralph/ledger.db). Rows outlive the run, unlike the TOTAL_*
+shell counters. `stats` reports cost per task, throughput per hour and the
+slowest session kinds, for planning how much a nightly run can get through.
+
+A session's outcome only says how the claude process ended. Once ralph
+implement knows whether the task itself finished (RALPH-RESULT: DONE merged
+and marked done, or status.json done in serial mode), `task-outcome` stores
+that on the task's implement row; throughput counts only tasks marked done.
+
+Usage:
+  ledger.py record --slug S --run R --kind K --target T --model M --started EPOCH
+                   --duration SECS --cost USD --tokens-in N --tokens-out N
+                   --turns N --lines-added N --lines-removed N --outcome O
+  ledger.py task-outcome --slug S --run R --target T --outcome done|failed
+  ledger.py stats [slug] [--days N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    run TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    model TEXT NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    cost REAL NOT NULL,
+    tokens_in INTEGER NOT NULL,
+    tokens_out INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    lines_added INTEGER NOT NULL,
+    lines_removed INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    task_outcome TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS sessions_slug_started ON sessions (slug, started);
+"""
+
+# Session kinds that implement a task (ralph implement, serial or parallel)
+TASK_KINDS = ("test-write", "implement")
+
+
+def default_path() -> str:
+    return os.path.join(os.environ.get("RALPH_LOG_DIR", ".powermode/ralph"), "ledger.db")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Parallel workers record concurrently; wait for the write lock
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(sessions)")}
+    if "task_outcome" not in columns:
+        # Ledgers written before task outcomes were recorded
+        with conn:
+            conn.execute("ALTER TABLE sessions ADD COLUMN task_outcome TEXT NOT NULL DEFAULT ''")
+    return conn
+
+
+# ── record ──────────────────────────────────────────────────────────────────
+
+def record(args) -> int:
+    row = {
+        "slug": args.slug,
+        "run": args.run,
+        "kind": args.kind or "session",
+        "target": args.target,
+        "model": args.model,
+        "started": args.started,
+        "duration": args.duration,
+        "cost": args.cost,
+        "tokens_in": args.tokens_in,
+        "tokens_out": args.tokens_out,
+        "turns": args.turns,
+        "lines_added": args.lines_added,
+        "lines_removed": args.lines_removed,
+        "outcome": args.outcome,
+    }
+    conn = connect(args.db)
+    try:
+        with conn:
+            conn.execute(
+                f"INSERT INTO sessions ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                list(row.values()),
+            )
+    finally:
+        conn.close()
+    return 0
+
+
+def task_outcome(args) -> int:
+    """Set the task outcome on the run's latest implement session for target."""
+    conn = connect(args.db)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE sessions SET task_outcome = ? WHERE id = ("
+                " SELECT id FROM sessions WHERE slug = ? AND run = ? AND target = ? AND kind = 'implement'"
+                " ORDER BY started DESC, id DESC LIMIT 1)",
+                (args.outcome, args.slug, args.run, args.target),
+            )
+    finally:
+        conn.close()
+    return 0
+
+
+# ── stats ───────────────────────────────────────────────────────────────────
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct * (len(values) - 1))))]
+
+
+def busy_hours(intervals: list[tuple[float, float]]) -> float:
+    """Wall-clock hours covered by sessions (parallel workers overlap)."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total / 3600
+
+
+def stats(rows: list[sqlite3.Row]) -> dict:
+    tasks = {}
+    kinds = {}
+    runs = {}
+    for row in rows:
+        kind = kinds.setdefault(row["kind"], {"sessions": 0, "errors": 0, "cost": 0.0, "durations": []})
+        kind["sessions"] += 1
+        kind["errors"] += int(row["outcome"] != "ok")
+        kind["cost"] += row["cost"]
+        kind["durations"].append(row["duration"])
+
+        run = runs.setdefault(row["run"], {"slug": row["slug"], "sessions": 0, "cost": 0.0, "intervals": [], "tasks": set()})
+        run["sessions"] += 1
+        run["cost"] += row["cost"]
+        run["intervals"].append((row["started"], row["started"] + row["duration"]))
+
+        if row["kind"] in TASK_KINDS and row["target"]:
+            key = (row["slug"], row["target"])
+            task = tasks.setdefault(key, {"sessions": 0, "cost": 0.0, "duration": 0.0, "tokens": 0, "implemented": False})
+            task["sessions"] += 1
+            task["cost"] += row["cost"]
+            task["duration"] += row["duration"]
+            task["tokens"] += row["tokens_in"] + row["tokens_out"]
+            if row["kind"] == "implement" and row["task_outcome"] == "done":
+                task["implemented"] = True
+                run["tasks"].add(key)
+
+    implemented = [t for t in tasks.values() if t["implemented"]]
+    all_intervals = [i for run in runs.values() for i in run["intervals"]]
+    hours = busy_hours(all_intervals)
+    total_cost = sum(k["cost"] for k in kinds.values())
+    done_tasks = sum(len(run["tasks"]) for run in runs.values())
+
+    return {
+        "sessions": len(rows),
+        "cost": round(total_cost, 2),
+        "busy_hours": round(hours, 3),
+        "throughput": {
+            "tasks": done_tasks,
+            "tasks_per_hour": round(done_tasks / hours, 2) if hours else 0,
+            "cost_per_hour": round(total_cost / hours, 2) if hours else 0,
+        },
+        "cost_per_task": {
+            "tasks": len(implemented),
+            "avg": round(sum(t["cost"] for t in implemented) / len(implemented), 2) if implemented else 0,
+            "p90": round(percentile([t["cost"] for t in implemented], 0.9), 2),
+            "avg_minutes": round(sum(t["duration"] for t in implemented) / len(implemented) / 60, 1) if implemented else 0,
+            "most_expensive": [
+                {"slug": slug, "task": target, **{k: round(v, 2) if isinstance(v, float) else v for k, v in t.items()}}
+                for (slug, target), t in sorted(tasks.items(), key=lambda item: item[1]["cost"], reverse=True)[:5]
+            ],
+        },
+        "kinds": sorted(
+            (
+                {
+                    "kind": name,
+                    "sessions": k["sessions"],
+                    "errors": k["errors"],
+                    "avg_cost": round(k["cost"] / k["sessions"], 2),
+                    "avg_minutes": round(sum(k["durations"]) / k["sessions"] / 60, 1),
+                    "p90_minutes": round(percentile(k["durations"], 0.9) / 60, 1),
+                }
+                for name, k in kinds.items()
+            ),
+            key=lambda k: k["avg_minutes"],
+            reverse=True,
+        ),
+        "runs": [
+            {
+                "run": name,
+                "slug": run["slug"],
+                "started": datetime.fromtimestamp(min(s for s, _ in run["intervals"])).strftime("%Y-%m-%d %H:%M"),
+                "sessions": run["sessions"],
+                "tasks": len(run["tasks"]),
+                "hours": round(busy_hours(run["intervals"]), 3),
+                "tasks_per_hour": round(len(run["tasks"]) / busy_hours(run["intervals"]), 2)
+                if busy_hours(run["intervals"]) else 0,
+                "cost": round(run["cost"], 2),
+            }
+            for name, run in sorted(runs.items(), key=lambda item: min(s for s, _ in item[1]["intervals"]))[-5:]
+        ],
+    }
+
+
+def fmt_hours(hours: float) -> str:
+    mins = int(round(hours * 60))
+    return f"{mins // 60}h{mins % 60:02d}m" if mins >= 60 else f"{mins}m"
+
+
+def print_stats(report: dict) -> None:
+    throughput = report["throughput"]
+    per_task = report["cost_per_task"]
+    print(f"  Sessions: {report['sessions']} | Cost: ${report['cost']} | Session wall time: {fmt_hours(report['busy_hours'])}")
+    print(
+        f"  Throughput: {throughput['tasks']} task(s) implemented, {throughput['tasks_per_hour']}/hour,"
+        f" ${throughput['cost_per_hour']}/hour"
+    )
+    print(
+        f"  Cost per task: avg ${per_task['avg']}, p90 ${per_task['p90']},"
+        f" avg {per_task['avg_minutes']} min (test-write + implement, {per_task['tasks']} task(s))"
+    )
+
+    print("\n  Slowest session kinds")
+    print(f"    {'kind':<14}{'sessions':>9}{'errors':>8}{'avg min':>9}{'p90 min':>9}{'avg $':>8}")
+    for k in report["kinds"]:
+        print(
+            f"    {k['kind']:<14}{k['sessions']:>9}{k['errors']:>8}{k['avg_minutes']:>9}"
+            f"{k['p90_minutes']:>9}{k['avg_cost']:>8}"
+        )
+
+    if per_task["most_expensive"]:
+        print("\n  Most expensive tasks")
+        for t in per_task["most_expensive"]:
+            done = "" if t["implemented"] else "  (not implemented)"
+            print(f"    ${t['cost']:<7} {round(t['duration'] / 60, 1):>6} min  {t['slug']}/{t['task']}{done}")
+
+    if report["runs"]:
+        print("\n  Recent runs")
+        for r in report["runs"]:
+            print(
+                f"    {r['started']}  {r['run']:<40} {r['tasks']:>3} task(s) in {fmt_hours(r['hours'])}"
+                f" ({r['tasks_per_hour']}/hour), ${r['cost']}"
+            )
+
+
+def stats_command(args) -> int:
+    if not os.path.exists(args.db):
+        print(f"No ledger at {args.db} — it is written by ralph plan/implement/verify", file=sys.stderr)
+        return 1
+    query = "SELECT * FROM sessions WHERE started >= ?"
+    params = [time.time() - args.days * 86400 if args.days else 0]
+    if args.slug:
+        query += " AND slug = ?"
+        params.append(args.slug)
+    conn = connect(args.db)
+    try:
+        rows = conn.execute(query + " ORDER BY started", params).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        print("No sessions recorded for that selection", file=sys.stderr)
+        return 1
+    report = stats(rows)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_stats(report)
+    return 0
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RALPH session ledger")
+    parser.add_argument("--db", default=default_path())
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--slug", required=True)
+    rec.add_argument("--run", default="")
+    rec.add_argument("--kind", default="")
+    rec.add_argument("--target", default="")
+    rec.add_argument("--model", default="")
+    rec.add_argument("--started", type=float, default=0.0)
+    rec.add_argument("--duration", type=float, default=0.0)
+    rec.add_argument("--cost", type=float, default=0.0)
+    rec.add_argument("--tokens-in", type=int, default=0)
+    rec.add_argument("--tokens-out", type=int, default=0)
+    rec.add_argument("--turns", type=int, default=0)
+    rec.add_argument("--lines-added", type=int, default=0)
+    rec.add_argument("--lines-removed", type=int, default=0)
+    rec.add_argument("--outcome", default="ok")
+
+    task = sub.add_parser("task-outcome")
+    task.add_argument("--slug", required=True)
+    task.add_argument("--run", default="")
+    task.add_argument("--target", required=True)
+    task.add_argument("--outcome", required=True, choices=("done", "failed"))
+
+    st = sub.add_parser("stats")
+    st.add_argument("slug", nargs="?", default="")
+    st.add_argument("--days", type=float, default=0)
+    st.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        return record(args)
+    if args.command == "task-outcome":
+        return task_outcome(args)
+    if args.command == "stats":
+        return stats_command(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+#!/usr/bin/env bash
+# lib/parallel.sh — Worktree-pooled parallel execution for ralph implement
+#
+# The coordinator (the ralph-implement.sh shell) owns the main working tree
+# and status.json. Each worker runs the test-write + implement sessions of
+# one task in its own git worktree, on branch ralph/<slug>/<feature>/<task>.
+# A task is only dispatched once all its dependencies are merged, so
+# merging finished branches as they come in keeps dependency order. After
+# a merge the coordinator marks the task done (status.json lock + README).
+#
+# Worktrees live in <git-common-dir>/ralph-worktrees/<slug>/w<N>; worker
+# output goes to the run log directory, one file per worker slot. A worktree
+# with uncommitted changes, or whose branch has nothing to merge, is moved
+# to kept-<feature>-<task>-<time> in the same directory for inspection.
+
+# Per-slot state, indexed by slot number (bash 3.2 has no associative arrays)
+SLOT_PID=()
+SLOT_FEAT=()
+SLOT_TASK=()
+# feature/task keys that failed this run; not re-dispatched until the next run
+PARALLEL_EXCLUDE=""
+
+parallel_setup() {
+    local workers="$1"
+
+    if ! git rev-parse --is-inside-work-tree >/dev/null 2>&1; then
+        log_error "--parallel needs a git repository (workers run in git worktrees)"
+        return 1
+    fi
+    # status.json/README edits in the project dir are the coordinator's own
+    if [[ -n "$(git status --porcelain --untracked-files=no -- . ":(exclude)$project_dir" 2>/dev/null)" ]]; then
+        log_error "--parallel needs a clean working tree — finished branches are merged into it"
+        return 1
+    fi
+
+    PARALLEL_PROJECT_DIR="$(cd "$project_dir" && pwd)"
+    # Path of the project inside each worktree, when it is part of this repo
+    PARALLEL_PROJECT_REL=""
+    PARALLEL_PROJECT_IN_REPO=0
+    if [[ "$(cd "$project_dir" && git rev-parse --show-toplevel 2>/dev/null || true)" == "$(git rev-parse --show-toplevel)" ]]; then
+        PARALLEL_PROJECT_REL="$(cd "$project_dir" && git rev-parse --show-prefix)"
+        PARALLEL_PROJECT_IN_REPO=1
+    fi
+    PARALLEL_POOL_DIR="$(cd "$(git rev-parse --git-common-dir)" && pwd)/ralph-worktrees/$slug"
+    mkdir -p "$PARALLEL_POOL_DIR" "${LOG_FILE%.log}-workers"
+    # Absolute: workers run from their worktree
+    PARALLEL_RUN_DIR="$(cd "${LOG_FILE%.log}-workers" && pwd)"
+
+    # Worktrees left by an interrupted run; their committed work is kept on
+    # the task branch and picked up again when the task is re-dispatched
+    git worktree prune >/dev/null 2>&1 || true
+    local slot
+    for (( slot = 0; slot < workers; slot++ )); do
+        SLOT_PID[$slot]=""
+        SLOT_FEAT[$slot]=""
+        SLOT_TASK[$slot]=""
+        if [[ -e "$PARALLEL_POOL_DIR/w$slot" ]]; then
+            git worktree remove --force "$PARALLEL_POOL_DIR/w$slot" >/dev/null 2>&1 || rm -rf "$PARALLEL_POOL_DIR/w$slot"
+        fi
+    done
+    git worktree prune >/dev/null 2>&1 || true
+}
+
+_parallel_branch() {
+    local feat="$1" task_file="$2"
+    echo "ralph/$slug/$feat/${task_file%.md}"
+}
+
+# ── Worker (runs in a background subshell) ──────────────────────────────────
+# Writes W_* shell assignments to result_file for the coordinator to source.
+_parallel_worker() {
+    local wt="$1" feat="$2" task_file="$3" branch="$4" result_file="$5"
+    # The worktree's own copy, so the agent reads and edits files on its
+    # branch; the main tree only when the project is untracked (ignored)
+    local worker_project="$PARALLEL_PROJECT_DIR"
+    if [[ $PARALLEL_PROJECT_IN_REPO -eq 1 && -d "$wt/$PARALLEL_PROJECT_REL" ]]; then
+        worker_project="$(cd "$wt/$PARALLEL_PROJECT_REL" && pwd)"
+    fi
+    local prd="$worker_project/features/$feat/$task_file"
+    local task_info="$feat/${task_file%.md}"
+    local outcome="failed" detail="" cost="0" turns=0 tokens_in=0 tokens_out=0 added=0 removed=0 sessions=0
+
+    # N interleaved live streams are unreadable; details are in the worker log
+    RALPH_VERBOSE=0
+    RALPH_LIVE=0
+
+    if cd "$wt"; then
+        local worker_context
+        worker_context=$(build_parallel_worker_context "$branch")
+
+        local test_prompt test_context
+        test_prompt=$(build_test_write_prompt "$prd")
+        test_context="$(build_system_context "$worker_project" "test-write" "$task_info")"$'\n'"$worker_context"
+        echo "== $task_info: writing tests"
+        RALPH_SESSION_KIND="test-write"
+        RALPH_SESSION_TARGET="$task_info"
+        if run_claude_session "$test_prompt" --model "$TEST_MODEL" --max-turns 25 --max-budget-usd "$TEST_BUDGET" --append-system-prompt "$test_context"; then
+            echo "== tests written ($(format_session_stats))"
+        else
+            detail="test-write failed: $CLAUDE_ERROR"
+        fi
+        sessions=$(( sessions + 1 ))
+        cost=$(python3 -c "print(round($cost + ${CLAUDE_COST:-0}, 4))")
+        turns=$(( turns + ${CLAUDE_TURNS:-0} ))
+        tokens_in=$(( tokens_in + ${CLAUDE_TOKENS_IN:-0} ))
+        tokens_out=$(( tokens_out + ${CLAUDE_TOKENS_OUT:-0} ))
+
+        if [[ -z "$detail" ]]; then
+            local prompt system_context
+            prompt=$(build_implement_prompt "$prd")
+            system_context="$(build_system_context "$worker_project" "implement" "$task_info")"$'\n'"$worker_context"
+            echo "== $task_info: implementing"
+            RALPH_SESSION_KIND="implement"
+            if run_claude_session "$prompt" --model "$MODEL" --max-turns 50 --max-budget-usd "$BUDGET" --append-system-prompt "$system_context"; then
+                echo "== session finished ($(format_session_stats))"
+                echo "$CLAUDE_RESULT"
+                # Tolerate markdown around the line (e.g. **RALPH-RESULT: DONE**)
+                local verdict
+                verdict=$(grep -oE 'RALPH-RESULT:[[:space:]]*[A-Z]+[^*`]*' <<< "$CLAUDE_RESULT" | tail -1 || true)
+                verdict=$(echo "${verdict#RALPH-RESULT:}" | sed 's/^[[:space:]]*//')
+                if [[ "$verdict" == DONE* ]]; then
+                    outcome="done"
+                else
+                    detail="${verdict:-session ended without RALPH-RESULT: DONE}"
+                fi
+            else
+                detail="implementation failed: $CLAUDE_ERROR"
+            fi
+            sessions=$(( sessions + 1 ))
+            cost=$(python3 -c "print(round($cost + ${CLAUDE_COST:-0}, 4))")
+            turns=$(( turns + ${CLAUDE_TURNS:-0} ))
+            tokens_in=$(( tokens_in + ${CLAUDE_TOKENS_IN:-0} ))
+            tokens_out=$(( tokens_out + ${CLAUDE_TOKENS_OUT:-0} ))
+            added=$(( added + ${CLAUDE_LINES_ADDED:-0} ))
+            removed=$(( removed + ${CLAUDE_LINES_REMOVED:-0} ))
+        fi
+    else
+        detail="worktree $wt missing"
+    fi
+
+    # Write then rename so the coordinator never sources a partial file
+    printf 'W_OUTCOME=%q\nW_DETAIL=%q\nW_COST=%q\nW_SESSIONS=%q\nW_TURNS=%q\nW_TOKENS_IN=%q\nW_TOKENS_OUT=%q\nW_LINES_ADDED=%q\nW_LINES_REMOVED=%q\n' \
+        "$outcome" "${detail:0:300}" "$cost" "$sessions" "$turns" "$tokens_in" "$tokens_out" "$added" "$removed" \
+        > "$result_file.tmp" && mv "$result_file.tmp" "$result_file"
+}
+
+parallel_start_worker() {
+    local slot="$1" feat="$2" task_file="$3"
+    local branch wt result_file
+    branch=$(_parallel_branch "$feat" "$task_file")
+    wt="$PARALLEL_POOL_DIR/w$slot"
+    result_file="$PARALLEL_RUN_DIR/w$slot.result"
+
+    if git show-ref --verify --quiet "refs/heads/$branch"; then
+        # Re-dispatched task (interrupted or failed earlier): keep its commits
+        git worktree add --force "$wt" "$branch" >/dev/null 2>&1 || return 1
+    else
+        git worktree add -b "$branch" "$wt" HEAD >/dev/null 2>&1 || return 1
+    fi
+
+    rm -f "$result_file"
+    ( _parallel_worker "$wt" "$feat" "$task_file" "$branch" "$result_file" ) \
+        < /dev/null >> "$PARALLEL_RUN_DIR/w$slot.log" 2>&1 &
+    SLOT_PID[$slot]=$!
+    SLOT_FEAT[$slot]="$feat"
+    SLOT_TASK[$slot]="$task_file"
+    _parallel_sync_pids
+}
+
+# Live worker PIDs for the Ctrl+C handler in common.sh
+_parallel_sync_pids() {
+    RALPH_WORKER_PIDS="${SLOT_PID[*]:-}"
+}
+
+# ── Coordinator ─────────────────────────────────────────────────────────────
+
+_parallel_commit_status() {
+    local feat="$1" task_base="$2"
+    local files=("$project_dir/status.json" "$project_dir/features/$feat/README.md")
+    # Only when the project files are tracked (many repos ignore .powermode/)
+    if git ls-files --error-unmatch -- "${files[@]}" >/dev/null 2>&1; then
+        git commit -q -m "ralph: $feat/$task_base done" -- "${files[@]}" >/dev/null 2>&1 || true
+    fi
+}
+
+_parallel_finish() {
+    local slot="$1"
+    local feat="${SLOT_FEAT[$slot]}"
+    local task_file="${SLOT_TASK[$slot]}"
+    local task_base="${task_file%.md}"
+    local branch wt result_file
+    branch=$(_parallel_branch "$feat" "$task_file")
+    wt="$PARALLEL_POOL_DIR/w$slot"
+    result_file="$PARALLEL_RUN_DIR/w$slot.result"
+
+    W_OUTCOME="error"
+    W_DETAIL="worker exited without a result (see $PARALLEL_RUN_DIR/w$slot.log)"
+    W_COST=0; W_SESSIONS=0; W_TURNS=0; W_TOKENS_IN=0; W_TOKENS_OUT=0; W_LINES_ADDED=0; W_LINES_REMOVED=0
+    if [[ -f "$result_file" ]]; then
+        # shellcheck disable=SC1090
+        source "$result_file"
+    fi
+
+    TOTAL_COST=$(python3 -c "print(round($TOTAL_COST + ${W_COST:-0}, 4))")
+    TOTAL_SESSIONS=$(( TOTAL_SESSIONS + W_SESSIONS ))
+    TOTAL_TURNS=$(( TOTAL_TURNS + W_TURNS ))
+    TOTAL_TOKENS_IN=$(( TOTAL_TOKENS_IN + W_TOKENS_IN ))
+    TOTAL_TOKENS_OUT=$(( TOTAL_TOKENS_OUT + W_TOKENS_OUT ))
+    TOTAL_LINES_ADDED=$(( TOTAL_LINES_ADDED + W_LINES_ADDED ))
+    TOTAL_LINES_REMOVED=$(( TOTAL_LINES_REMOVED + W_LINES_REMOVED ))
+
+    # Check the worktree before it goes: uncommitted work would be lost, and
+    # a DONE without commits has nothing to merge
+    local dirty="" commits=0 keep=""
+    if [[ -d "$wt" ]]; then
+        dirty=$(git -C "$wt" status --porcelain 2>/dev/null || true)
+    fi
+    commits=$(git rev-list --count "HEAD..$branch" 2>/dev/null || echo 0)
+    if [[ -n "$dirty" ]]; then
+        keep="uncommitted changes"
+    elif [[ "$W_OUTCOME" == "done" && "$commits" -eq 0 ]]; then
+        keep="no commits to merge"
+    fi
+    if [[ -n "$keep" && "$W_OUTCOME" == "done" ]]; then
+        W_OUTCOME="failed"
+        W_DETAIL="reported DONE but the worktree has $keep"
+    fi
+
+    if [[ -n "$keep" ]]; then
+        # Out of the slot's path so the slot can be reused
+        local kept="$PARALLEL_POOL_DIR/kept-$feat-$task_base-$(date +%s)"
+        if git worktree move "$wt" "$kept" >/dev/null 2>&1; then
+            W_DETAIL="$W_DETAIL (worktree kept at $kept)"
+        else
+            W_DETAIL="$W_DETAIL (worktree kept at $wt until the next run)"
+        fi
+    else
+        # Commits live on the branch; a clean worktree is disposable
+        git worktree remove --force "$wt" >/dev/null 2>&1 || true
+    fi
+
+    local stats="\$$W_COST, +$W_LINES_ADDED/-$W_LINES_REMOVED lines"
+    if [[ "$W_OUTCOME" == "done" ]]; then
+        if git merge --no-ff --no-edit -m "ralph: merge $feat/$task_base" "$branch" >/dev/null 2>&1; then
+            python3 "$RALPH_STATE" mark-done "$project_dir" "$feat" "$task_base"
+            ralph_ledger_task_outcome "$feat/$task_base" done
+            _parallel_commit_status "$feat" "$task_base"
+            git branch -D "$branch" >/dev/null 2>&1 || true
+            tasks_done=$((tasks_done + 1))
+            log_success "[w$slot] $feat/$task_base merged and marked done ($stats)"
+            append_log "Worker $slot ($feat/$task_base): merged cost=$W_COST turns=$W_TURNS tokens_in=$W_TOKENS_IN tokens_out=$W_TOKENS_OUT error=false"
+        else
+            git merge --abort >/dev/null 2>&1 || true
+            tasks_failed=$((tasks_failed + 1))
+            ralph_ledger_task_outcome "$feat/$task_base" failed
+            PARALLEL_EXCLUDE="$PARALLEL_EXCLUDE $feat/$task_base"
+            log_error "[w$slot] $feat/$task_base: merge conflict — branch $branch kept for a manual merge"
+            append_log "Worker $slot ($feat/$task_base): merge conflict cost=$W_COST error=true"
+        fi
+    else
+        tasks_failed=$((tasks_failed + 1))
+        ralph_ledger_task_outcome "$feat/$task_base" failed
+        PARALLEL_EXCLUDE="$PARALLEL_EXCLUDE $feat/$task_base"
+        log_error "[w$slot] $feat/$task_base failed: $W_DETAIL ($stats)"
+        append_log "Worker $slot ($feat/$task_base): cost=$W_COST turns=$W_TURNS error=true detail=$W_DETAIL"
+    fi
+
+    SLOT_PID[$slot]=""
+    SLOT_FEAT[$slot]=""
+    SLOT_TASK[$slot]=""
+    _parallel_sync_pids
+}
+
+# Returns 0 if any worker finished
+parallel_reap() {
+    local workers="$1" slot pid finished=""
+    for (( slot = 0; slot < workers; slot++ )); do
+        pid="${SLOT_PID[$slot]}"
+        [[ -n "$pid" ]] || continue
+        kill -0 "$pid" 2>/dev/null && continue
+        wait "$pid" 2>/dev/null || true
+        finished+="${SLOT_FEAT[$slot]}/${SLOT_TASK[$slot]}"$'\t'"$slot"$'\n'
+    done
+    [[ -n "$finished" ]] || return 1
+
+    # Merge tasks that finished together in feature/task order
+    local key
+    while IFS=$'\t' read -r key slot; do
+        if [[ -n "$key" ]]; then
+            _parallel_finish "$slot"
+        fi
+    done <<< "$(sort <<< "$finished")"
+    return 0
+}
+
+parallel_stop_workers() {
+    local workers="$1" slot pid
+    for (( slot = 0; slot < workers; slot++ )); do
+        pid="${SLOT_PID[$slot]}"
+        if [[ -n "$pid" ]]; then
+            _ralph_kill_tree "$pid" TERM
+        fi
+    done
+    sleep 0.5
+    for (( slot = 0; slot < workers; slot++ )); do
+        pid="${SLOT_PID[$slot]}"
+        if [[ -n "$pid" ]]; then
+            _ralph_kill_tree "$pid" KILL
+        fi
+    done
+}
+
+# Fills free slots with ready tasks; returns 0 if anything was dispatched
+parallel_dispatch() {
+    local workers="$1" slot free=() exclude_args=() key
+
+    for (( slot = 0; slot < workers; slot++ )); do
+        if [[ -z "${SLOT_PID[$slot]}" ]]; then
+            free+=("$slot")
+        else
+            exclude_args+=("--exclude" "${SLOT_FEAT[$slot]}/${SLOT_TASK[$slot]%.md}")
+        fi
+    done
+    [[ ${#free[@]} -gt 0 ]] || return 1
+    for key in $PARALLEL_EXCLUDE; do
+        exclude_args+=("--exclude" "$key")
+    done
+
+    local ready
+    ready=$(python3 "$RALPH_STATE" ready "$project_dir" --feature "$FEATURE_FILTER" ${exclude_args[@]+"${exclude_args[@]}"} 2>/dev/null || true)
+
+    local dispatched=1 idx=0 feat task_file
+    while IFS=$'\t' read -r feat task_file; do
+        [[ -n "$feat" ]] || continue
+        [[ $idx -lt ${#free[@]} && $iteration -lt $MAX_ITERS ]] || break
+        slot="${free[$idx]}"
+        idx=$((idx + 1))
+        iteration=$((iteration + 1))
+        if parallel_start_worker "$slot" "$feat" "$task_file"; then
+            log_run "[w$slot] $feat/${task_file%.md} — tests + implementation (log: $PARALLEL_RUN_DIR/w$slot.log)"
+            append_log "Iteration $iteration: worker $slot started $feat/${task_file%.md}"
+            dispatched=0
+        else
+            log_error "[w$slot] could not create a worktree for $feat/${task_file%.md}"
+            tasks_failed=$((tasks_failed + 1))
+            PARALLEL_EXCLUDE="$PARALLEL_EXCLUDE $feat/${task_file%.md}"
+        fi
+    done <<< "$ready"
+    return $dispatched
+}
+
+run_parallel_loop() {
+    local workers="$1"
+    parallel_setup "$workers" || return 1
+    log_info "Parallel: $workers workers, worktrees in $PARALLEL_POOL_DIR"
+
+    local slot active halted="" check=1
+    while [[ $RALPH_INTERRUPTED -eq 0 ]]; do
+        # Stop file: same as Ctrl+C — in-flight sessions are killed, their
+        # committed work stays on the task branches for the next run
+        if [[ -f ".ralph-stop" ]]; then
+            rm -f ".ralph-stop"
+            log_warn "Stop file detected — stopping workers"
+            append_log "Parallel: stopped via .ralph-stop"
+            parallel_stop_workers "$workers"
+            RALPH_INTERRUPTED=1
+            break
+        fi
+
+        if parallel_reap "$workers"; then
+            check=1
+        fi
+
+        # Only re-plan when something changed (start, or a worker finished)
+        if [[ $check -eq 1 && -z "$halted" ]]; then
+            check=0
+            ralph_state_query "$project_dir" "$FEATURE_FILTER"
+            if [[ "$RS_BLOCKED" == "1" ]]; then
+                halted="BLOCKED — $RS_BLOCKER"
+            elif [[ "$RS_BLOCKING_ISSUES" == "1" ]]; then
+                halted="high-severity blocking issues"
+            fi
+            if [[ -n "$halted" ]]; then
+                log_error "$halted — waiting for running workers, no new tasks"
+                append_log "Parallel: $halted"
+            else
+                parallel_dispatch "$workers" || true
+            fi
+        fi
+
+        active=0
+        for (( slot = 0; slot < workers; slot++ )); do
+            if [[ -n "${SLOT_PID[$slot]}" ]]; then
+                active=$((active + 1))
+            fi
+        done
+        if [[ $active -eq 0 ]]; then
+            if [[ -z "$halted" && $iteration -lt $MAX_ITERS ]]; then
+                log_success "No more pending tasks with met dependencies"
+            fi
+            break
+        fi
+
+        # Ctrl+C reaches sleep too (same process group), so the trap runs at once
+        sleep 1
+    done
+}
@@ -111,6 +111,22 @@ for fk in sorted(features.keys()):
     echo "$context"
 }
 
+# ── Parallel worker context ─────────────────────────────────────────────────
+# Appended to the system context of sessions run by `ralph implement --parallel`
+
+build_parallel_worker_context() {
+    local branch="$1"
+    local context=""
+    context+="PARALLEL WORKER (overrides the status update steps above):"$'\n'
+    context+="- You are in a dedicated git worktree on branch $branch. Commit all work on this branch."$'\n'
+    context+="- Do NOT edit status.json or the Status column of the feature README."$'\n'
+    context+="  The RALPH coordinator marks the task done after merging your branch."$'\n'
+    context+="- End your final message with exactly one line:"$'\n'
+    context+="  RALPH-RESULT: DONE            (tests pass and verification passed)"$'\n'
+    context+="  RALPH-RESULT: FAILED <reason> (anything else)"$'\n'
+    echo "$context"
+}
+
 # ── Planning prompts ────────────────────────────────────────────────────────
 
 build_plan_prompt() {
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""Project task DAG for the RALPH scripts.
+
+Parses every feature README task table, status.json, BLOCKED.md and
+issues.md of a project once and caches the result in
+.powermode/ralph/state-<slug>.json, keyed by the mtime/size of each of those
+files (and the feature directory list). Repeat queries while nothing
+changed cost a handful of stat calls.
+
+Dependency rules: plain numbers are tasks in the same feature (falling
+back to any feature), `03-sync:01` (or `02-api:01,02`) are tasks in the
+feature whose key starts with that prefix.
+
+Usage:
+  ralph_state.py query <project_dir> [--feature X] [--task FEAT/TASK] [--json]
+      Progress, next task, blockers and drift in one call, as RS_* shell
+      assignments for eval (see ralph_state_query in lib/status.sh).
+  ralph_state.py progress <project_dir>
+      "status|total|done|next_feat|next_task" (read_project_status).
+  ralph_state.py ready <project_dir> [--feature X] [--exclude FEAT/TASK ...]
+      Pending tasks whose dependencies are done, in feature then
+      dependency order, one "<feature>\\t<task file>" per line.
+  ralph_state.py sync <project_dir> [--match-readme] [--dry-run]
+      Repair README → status.json drift (Done in README, not in
+      status.json; with --match-readme every disagreement) in one atomic
+      write. Prints a JSON report: {"changed", "drift": [{feature, task,
+      readme, status_json, fixed}]}.
+  ralph_state.py mark-done <project_dir> <feature> <task>
+      Mark a task done in status.json (atomic write under a lock in
+      .powermode/ralph/) and set its README Status cell to Done.
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import shlex
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+# ── Parsing ─────────────────────────────────────────────────────────────────
+
+def parse_readme(readme: str) -> list[dict]:
+    """Task rows of a feature README: | # | File | ... | Dependencies | Status |
+
+    6-col (no TDD) and 7-col (with TDD) tables are both supported; deps and
+    status are always the last two columns.
+    """
+    try:
+        with open(readme) as f:
+            content = f.read()
+    except OSError:
+        return []
+    rows = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [c.strip() for c in line.split("|")[1:-1]]
+        if len(cells) < 6:
+            continue
+        try:
+            num = int(cells[0])
+        except ValueError:
+            continue
+        rows.append({"num": num, "file": cells[1], "deps": cells[-2], "status": cells[-1]})
+    return rows
+
+
+def is_pending(status: str) -> bool:
+    # Fuzzy: handles emoji prefixes, extra whitespace, "In Progress"
+    s = status.lower().strip()
+    return "pending" in s or "progress" in s
+
+
+def is_done(status: str) -> bool:
+    s = status.lower().strip()
+    return "done" in s or "complete" in s
+
+
+def load_status(project_dir: str) -> dict:
+    try:
+        with open(os.path.join(project_dir, "status.json")) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def feature_names(project_dir: str) -> list[str]:
+    features_dir = os.path.join(project_dir, "features")
+    try:
+        names = os.listdir(features_dir)
+    except OSError:
+        return []
+    return sorted(n for n in names if os.path.isdir(os.path.join(features_dir, n)))
+
+
+def parse_blockers(project_dir: str) -> dict:
+    """BLOCKED.md first line and open high/critical rows of issues.md
+    (| ID | Severity | Status | Description |)."""
+    blocked = None
+    try:
+        with open(os.path.join(project_dir, "BLOCKED.md")) as f:
+            blocked = ""
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    blocked = line
+                    break
+    except OSError:
+        pass
+
+    issues = []
+    try:
+        with open(os.path.join(project_dir, "issues.md")) as f:
+            content = f.read()
+    except OSError:
+        content = ""
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [c.strip() for c in line.split("|")[1:-1]]
+        if len(cells) < 3:
+            continue
+        if cells[1].lower() in ("high", "critical") and cells[2].lower() == "open":
+            issues.append(f"  > [{cells[1]}] {cells[3] if len(cells) > 3 else ''}")
+    return {"blocked": blocked is not None, "message": blocked or "", "issues": issues}
+
+
+# ── Cache ───────────────────────────────────────────────────────────────────
+
+CACHE_VERSION = 1
+
+
+def cache_path(project_dir: str) -> str:
+    """Runtime cache next to the RALPH logs (.powermode/ralph/), not in the
+    committed project dir."""
+    project_dir = os.path.abspath(project_dir)
+    powermode_dir = os.path.dirname(os.path.dirname(project_dir))
+    return os.path.join(powermode_dir, "ralph", f"state-{os.path.basename(project_dir)}.json")
+
+
+def file_key(path: str) -> list | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def source_key(project_dir: str, names: list[str]) -> dict:
+    return {
+        "status": file_key(os.path.join(project_dir, "status.json")),
+        "blocked": file_key(os.path.join(project_dir, "BLOCKED.md")),
+        "issues": file_key(os.path.join(project_dir, "issues.md")),
+        "readmes": {n: file_key(os.path.join(project_dir, "features", n, "README.md")) for n in names},
+    }
+
+
+def load_project(project_dir: str) -> dict:
+    """{"status": status.json, "features": {feature: [README rows]}, "blockers": {...}}"""
+    names = feature_names(project_dir)
+    key = source_key(project_dir, names)
+    cache_file = cache_path(project_dir)
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION and cache.get("key") == key:
+            return cache["project"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+
+    project = {
+        "status": load_status(project_dir),
+        "features": {
+            name: parse_readme(os.path.join(project_dir, "features", name, "README.md"))
+            for name in names
+        },
+        "blockers": parse_blockers(project_dir),
+    }
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        write_atomic(cache_file, json.dumps({"version": CACHE_VERSION, "key": key, "project": project}))
+    except OSError:
+        pass
+    return project
+
+
+# ── Dependencies ────────────────────────────────────────────────────────────
+
+def parse_deps(deps: str) -> list[tuple[str | None, str]]:
+    """[(feature prefix or None, two-digit task number), ...]
+
+    '01,02'            -> tasks 01, 02 in the current feature
+    '03-sync:01'       -> task 01 in the feature matching '03-sync'
+    '02-api:01,02,03'  -> tasks 01, 02, 03 in feature '02-api'
+    """
+    d = deps.strip()
+    if not d or d.lower().startswith("none"):
+        return []
+    parsed = []
+    current_feat_ref = None
+    for part in d.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            feat_part, task_part = part.rsplit(":", 1)
+            current_feat_ref = feat_part.strip()
+            m = re.search(r"(\d+)", task_part)
+        else:
+            # Belongs to the feature of a preceding ':' entry, else the current one
+            m = re.search(r"(\d+)", part)
+        if m:
+            parsed.append((current_feat_ref, m.group(1).zfill(2)))
+    return parsed
+
+
+def intra_feature_deps(deps: str) -> list[int]:
+    """Plain task numbers, for ordering within a feature."""
+    d = deps.strip()
+    if not d or d.lower().startswith("none"):
+        return []
+    return [int(p.strip()) for p in d.split(",") if ":" not in p and p.strip().isdigit()]
+
+
+def find_feature(all_features: dict, prefix: str) -> str | None:
+    """Resolve a prefix like '03-sync' to the full key '03-syncback-business-keys'."""
+    for key in all_features:
+        if key == prefix or key.startswith(prefix):
+            return key
+    return None
+
+
+def task_done_in_feature(all_features: dict, feat_key: str, task_num: str) -> bool:
+    tasks = all_features.get(feat_key, {}).get("tasks", {})
+    for task_key, task_status in tasks.items():
+        if task_key.startswith(task_num):
+            return task_status == "done"
+    return False
+
+
+def deps_met(status: dict, feature: str, deps: str) -> bool:
+    all_features = status.get("features", {})
+    for feat_ref, task_num in parse_deps(deps):
+        if feat_ref:
+            feat_key = find_feature(all_features, feat_ref)
+            if feat_key and task_done_in_feature(all_features, feat_key, task_num):
+                continue
+            # Number prefix only (e.g. '02' from '02-api')
+            m = re.match(r"(\d+)", feat_ref)
+            if m:
+                feat_key = find_feature(all_features, m.group(1).zfill(2))
+                if feat_key and task_done_in_feature(all_features, feat_key, task_num):
+                    continue
+            return False
+        if task_done_in_feature(all_features, feature, task_num):
+            continue
+        # Fallback: any feature
+        if not any(task_done_in_feature(all_features, fk, task_num) for fk in all_features):
+            return False
+    return True
+
+
+def ordered_pending(rows: list[dict]) -> list[dict]:
+    """Pending rows, topologically sorted by intra-feature deps; rows with
+    unmet deps follow at the end."""
+    pending = [r for r in rows if is_pending(r["status"])]
+    done_nums = {r["num"] for r in rows if is_done(r["status"])}
+    ordered = []
+    remaining = list(pending)
+    while remaining:
+        added = [r for r in remaining if all(d in done_nums for d in intra_feature_deps(r["deps"]))]
+        if not added:
+            ordered.extend(remaining)
+            break
+        for r in added:
+            ordered.append(r)
+            done_nums.add(r["num"])
+            remaining.remove(r)
+    return ordered
+
+
+def task_key(file_name: str) -> str:
+    return file_name[:-3] if file_name.endswith(".md") else file_name
+
+
+def ready_tasks(project: dict, feature_filter: str = "", exclude: set | None = None) -> list[tuple[str, str]]:
+    """(feature, task file) of pending tasks whose deps are done."""
+    exclude = exclude or set()
+    status = project["status"]
+    all_features = status.get("features", {})
+    ready = []
+    for feature, rows in project["features"].items():
+        if feature_filter and feature_filter not in feature:
+            continue
+        tasks = all_features.get(feature, {}).get("tasks", {})
+        for row in ordered_pending(rows):
+            key = task_key(row["file"])
+            if tasks.get(key) == "done" or f"{feature}/{key}" in exclude:
+                continue
+            if deps_met(status, feature, row["deps"]):
+                ready.append((feature, row["file"]))
+    return ready
+
+
+def progress(project: dict) -> dict:
+    """Counts from status.json; next_* is the first non-done task in key order."""
+    status = project["status"]
+    total = done = 0
+    next_feature = next_task = ""
+    features = status.get("features", {})
+    for feat_key in sorted(features):
+        tasks = features[feat_key].get("tasks", {})
+        for key in sorted(tasks):
+            total += 1
+            if tasks[key] == "done":
+                done += 1
+            elif not next_task:
+                next_feature, next_task = feat_key, key
+    return {
+        "status": status.get("status", "unknown") if status else "missing",
+        "total": total,
+        "done": done,
+        "next_feature": next_feature,
+        "next_task": next_task,
+    }
+
+
+def drift(project: dict) -> list[dict]:
+    """Tasks whose README Status and status.json disagree on being done."""
+    all_features = project["status"].get("features", {})
+    found = []
+    for feature, rows in project["features"].items():
+        tasks = all_features.get(feature, {}).get("tasks", {})
+        for row in rows:
+            key = task_key(row["file"])
+            state = tasks.get(key)
+            if is_done(row["status"]) != (state == "done"):
+                found.append({
+                    "feature": feature,
+                    "task": key,
+                    "readme": row["status"],
+                    "status_json": state or "missing",
+                })
+    return found
+
+
+def query(project: dict, feature_filter: str = "", task: str = "") -> dict:
+    ready = ready_tasks(project, feature_filter)
+    blockers = project["blockers"]
+    result = {
+        "progress": progress(project),
+        "next": {"feature": ready[0][0], "task": ready[0][1]} if ready else None,
+        "blocked": blockers["blocked"],
+        "blocker": blockers["message"],
+        "issues": blockers["issues"],
+        "drift": drift(project),
+    }
+    if task:
+        feature, _, key = task.partition("/")
+        tasks = project["status"].get("features", {}).get(feature, {}).get("tasks", {})
+        result["task_status"] = tasks.get(task_key(key), "pending")
+    return result
+
+
+def shell_assignments(result: dict) -> str:
+    values = {
+        "RS_STATUS": result["progress"]["status"],
+        "RS_TOTAL": result["progress"]["total"],
+        "RS_DONE": result["progress"]["done"],
+        "RS_NEXT_FEATURE": (result["next"] or {}).get("feature", ""),
+        "RS_NEXT_TASK": (result["next"] or {}).get("task", ""),
+        "RS_BLOCKED": int(result["blocked"]),
+        "RS_BLOCKER": result["blocker"],
+        "RS_BLOCKING_ISSUES": int(bool(result["issues"])),
+        "RS_ISSUES": "\n".join(result["issues"]),
+        "RS_DRIFT": len(result["drift"]),
+        "RS_TASK_STATUS": result.get("task_status", ""),
+    }
+    return "\n".join(f"{name}={shlex.quote(str(value))}" for name, value in values.items())
+
+
+# ── Writes ──────────────────────────────────────────────────────────────────
+
+@contextmanager
+def status_lock(project_dir: str):
+    """Exclusive lock for status.json read-modify-write."""
+    lock_file = cache_path(project_dir)[: -len(".json")] + ".lock"
+    os.makedirs(os.path.dirname(lock_file), exist_ok=True)
+    with open(lock_file, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, text: str) -> None:
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", text=True)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        # mkstemp creates 0600; keep the file readable as before
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def recount_feature(feat: dict) -> None:
+    tasks = feat.get("tasks", {})
+    done = sum(1 for v in tasks.values() if v == "done")
+    feat["tasks_done"] = done
+    if tasks and done == len(tasks):
+        feat["status"] = "done"
+    elif done or any(v == "in_progress" for v in tasks.values()):
+        feat["status"] = "in_progress"
+    else:
+        feat["status"] = "pending"
+
+
+def set_readme_status(readme: str, file_name: str, value: str) -> bool:
+    try:
+        with open(readme) as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return False
+    changed = False
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped.startswith("|"):
+            continue
+        cells = stripped.split("|")
+        inner = [c.strip() for c in cells[1:-1]]
+        if len(inner) < 6 or inner[1] != file_name:
+            continue
+        if is_done(inner[-1]):
+            return False
+        cells[-2] = f" {value} "
+        lines[i] = line[: len(line) - len(line.lstrip())] + "|".join(cells)
+        changed = True
+        break
+    if changed:
+        write_atomic(readme, "\n".join(lines))
+    return changed
+
+
+def mark_done(project_dir: str, feature: str, task: str) -> None:
+    key = task_key(task)
+    status_file = os.path.join(project_dir, "status.json")
+    with status_lock(project_dir):
+        data = load_status(project_dir)
+        feat = data.setdefault("features", {}).setdefault(feature, {})
+        feat.setdefault("tasks", {})[key] = "done"
+        recount_feature(feat)
+        data["updated"] = datetime.now(timezone.utc).isoformat()
+        write_atomic(status_file, json.dumps(data, indent=2) + "\n")
+    set_readme_status(os.path.join(project_dir, "features", feature, "README.md"), f"{key}.md", "Done")
+
+
+def readme_state(readme_status: str) -> str:
+    """status.json value for a README Status cell."""
+    if is_done(readme_status):
+        return "done"
+    return "in_progress" if "progress" in readme_status.lower() else "pending"
+
+
+def sync_status(project_dir: str, match_readme: bool = False, dry_run: bool = False) -> dict:
+    """Repair README → status.json drift in one read and one atomic write.
+
+    By default only tasks the README marks Done are fixed (a session that
+    updated the README but not status.json). match_readme also resets tasks
+    status.json has as done but the README doesn't, so status.json follows
+    the READMEs completely.
+    """
+    status_file = os.path.join(project_dir, "status.json")
+    if not os.path.isfile(status_file):
+        return {"changed": False, "drift": [], "error": "status.json missing"}
+    with status_lock(project_dir):
+        project = load_project(project_dir)
+        data = project["status"]
+        rows = {
+            (feature, task_key(row["file"])): row["status"]
+            for feature, feature_rows in project["features"].items()
+            for row in feature_rows
+        }
+        report = []
+        touched = set()
+        for item in drift(project):
+            fix = match_readme or is_done(item["readme"])
+            report.append({**item, "fixed": fix and not dry_run})
+            if not fix:
+                continue
+            feat = data.setdefault("features", {}).setdefault(item["feature"], {})
+            feat.setdefault("tasks", {})[item["task"]] = readme_state(rows[(item["feature"], item["task"])])
+            touched.add(item["feature"])
+        changed = bool(touched) and not dry_run
+        if changed:
+            for feature in touched:
+                recount_feature(data["features"][feature])
+            data["updated"] = datetime.now(timezone.utc).isoformat()
+            write_atomic(status_file, json.dumps(data, indent=2) + "\n")
+    return {"changed": changed, "drift": report}
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RALPH project task DAG")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("query")
+    q.add_argument("project_dir")
+    q.add_argument("--feature", default="")
+    q.add_argument("--task", default="")
+    q.add_argument("--json", action="store_true")
+
+    prog = sub.add_parser("progress")
+    prog.add_argument("project_dir")
+
+    ready = sub.add_parser("ready")
+    ready.add_argument("project_dir")
+    ready.add_argument("--feature", default="")
+    ready.add_argument("--exclude", action="append", default=[])
+
+    sync = sub.add_parser("sync")
+    sync.add_argument("project_dir")
+    sync.add_argument("--match-readme", action="store_true")
+    sync.add_argument("--dry-run", action="store_true")
+
+    done = sub.add_parser("mark-done")
+    done.add_argument("project_dir")
+    done.add_argument("feature")
+    done.add_argument("task")
+
+    args = parser.parse_args()
+
+    if args.command == "query":
+        result = query(load_project(args.project_dir), args.feature, args.task)
+        print(json.dumps(result, indent=2) if args.json else shell_assignments(result))
+        return 0
+    if args.command == "progress":
+        p = progress(load_project(args.project_dir))
+        print(f"{p['status']}|{p['total']}|{p['done']}|{p['next_feature']}|{p['next_task']}")
+        return 0
+    if args.command == "ready":
+        project = load_project(args.project_dir)
+        for feature, file_name in ready_tasks(project, args.feature, set(args.exclude)):
+            print(f"{feature}\t{file_name}")
+        return 0
+    if args.command == "sync":
+        print(json.dumps(sync_status(args.project_dir, args.match_readme, args.dry_run), indent=2))
+        return 0
+    if args.command == "mark-done":
+        mark_done(args.project_dir, args.feature, args.task)
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""claude stream-json handling and session timelines for the RALPH scripts.
+
+`stream` sits in run_claude_session's pipeline: it prints tool progress (and
+verbose/live text) to stderr, writes the final result event to stdout, and
+appends a timeline of the session to a JSONL file (RALPH_TIMELINE, set by
+init_log next to the run log in .powermode/ralph/).
+
+Timeline records, one per line, all carrying "session" and "at" (seconds
+since the session started):
+  start        kind, target, model, started (ISO time)
+  first_token  time to first streamed output
+  turn         one model response: start, end, input, output, cache_read,
+               cache_creation tokens
+  tool         name, start, end, latency (tool_use → tool_result), gap
+               (previous tool_result → this tool_use, i.e. model time
+               between tool calls), error
+  end          duration, ttft, tools, tool_time, cost, turns, is_error
+
+`summary` reads the timelines of a project's runs and shows where the wall
+clock went: startup, model generation and tool execution, per session kind
+and per tool, plus token/cache totals and the slowest calls and gaps.
+
+Usage:
+  session_stream.py stream [--timeline FILE] [--kind K] [--target T] [--model M]
+  session_stream.py summary <slug|timeline file ...> [--dir DIR] [--latest] [--json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+DIM = "\033[2m"
+BOLD = "\033[1m"
+RESET = "\033[0m"
+INDENT = "          "
+
+
+# ── Timeline writer ─────────────────────────────────────────────────────────
+
+class Timeline:
+    """Appends records to a JSONL file; parallel workers share one file, so
+    each record is a single O_APPEND write."""
+
+    def __init__(self, path: str, session: str, start: float):
+        self.session = session
+        self.start = start
+        self.fd = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            except OSError:
+                self.fd = None
+
+    def rel(self, t: float | None = None) -> float:
+        return round((t if t is not None else time.time()) - self.start, 3)
+
+    def write(self, ev: str, **fields) -> None:
+        if self.fd is None:
+            return
+        record = {"ev": ev, "session": self.session, "at": self.rel(), **fields}
+        try:
+            os.write(self.fd, (json.dumps(record) + "\n").encode())
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def usage_tokens(usage: dict) -> dict:
+    usage = usage or {}
+    return {
+        "input": usage.get("input_tokens", 0) or 0,
+        "output": usage.get("output_tokens", 0) or 0,
+        "cache_read": usage.get("cache_read_input_tokens", 0) or 0,
+        "cache_creation": usage.get("cache_creation_input_tokens", 0) or 0,
+    }
+
+
+# ── stream ──────────────────────────────────────────────────────────────────
+
+def stream(args) -> int:
+    verbose = os.environ.get("RALPH_VERBOSE", "0") == "1"
+    live = os.environ.get("RALPH_LIVE", "0") == "1"
+    start = time.time()
+    timeline = Timeline(args.timeline, f"{os.getpid()}-{int(start)}", start)
+    timeline.write(
+        "start", kind=args.kind, target=args.target, model=args.model,
+        started=datetime.fromtimestamp(start, timezone.utc).isoformat(),
+    )
+
+    tool_count = 0
+    result_data = {}
+    in_tool = False
+    text_buffer = ""
+    live_needs_newline = False  # live text needs a newline before the next tool line
+
+    first_token = None
+    pending_tools = {}  # tool_use id → (name, start)
+    last_tool_end = None
+    tool_time = 0.0
+    turn = None  # message being streamed: {"id", "start", usage...}
+    streamed_turns = 0
+    assistant_usage = {}  # message id → (first seen, usage) without partial messages
+
+    def timestamp():
+        mins, secs = divmod(int(time.time() - start), 60)
+        return f"{mins}m{secs:02d}s" if mins else f"{secs}s"
+
+    def flush_live_newline():
+        nonlocal live_needs_newline
+        if live_needs_newline:
+            sys.stderr.write(f"{RESET}\n")
+            sys.stderr.flush()
+            live_needs_newline = False
+
+    def mark_first_token():
+        nonlocal first_token
+        if first_token is None:
+            first_token = timeline.rel()
+            timeline.write("first_token")
+
+    def show_tool(name):
+        print(f"\r{INDENT}↳ [{tool_count}] {name} ({timestamp()}){' ' * 20}", end="", flush=True, file=sys.stderr)
+
+    def show_detail(text):
+        print(f"\n{INDENT}{DIM}{text}{RESET}", end="", flush=True, file=sys.stderr)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(event, dict):
+            continue
+
+        etype = event.get("type", "")
+
+        # ── SDK-style stream events (from --include-partial-messages) ──
+        if etype == "stream_event":
+            inner = event.get("event", {})
+            inner_type = inner.get("type", "")
+
+            if inner_type == "message_start":
+                message = inner.get("message", {})
+                turn = {"id": message.get("id", ""), "start": timeline.rel(), **usage_tokens(message.get("usage"))}
+
+            elif inner_type == "message_delta":
+                if turn is not None:
+                    # output_tokens here is the running total for the message
+                    for key, value in usage_tokens(inner.get("usage")).items():
+                        if value:
+                            turn[key] = value
+
+            elif inner_type == "message_stop":
+                if turn is not None:
+                    timeline.write("turn", end=timeline.rel(), **turn)
+                    streamed_turns += 1
+                    turn = None
+
+            elif inner_type == "content_block_start":
+                mark_first_token()
+                block = inner.get("content_block", {})
+                if block.get("type") == "tool_use":
+                    # Flush any buffered text (verbose mode)
+                    if verbose and text_buffer.strip():
+                        for tl in text_buffer.strip().split("\n"):
+                            print(f"{INDENT}{DIM}{tl}{RESET}", file=sys.stderr)
+                        text_buffer = ""
+                    flush_live_newline()
+                    tool_count += 1
+                    in_tool = True
+                    show_tool(block.get("name", "?"))
+                elif block.get("type") == "text":
+                    in_tool = False
+                    if live:
+                        # Start a new dimmed text block
+                        sys.stderr.write(f"\n{INDENT}{DIM}")
+                        sys.stderr.flush()
+
+            elif inner_type == "content_block_delta":
+                mark_first_token()
+                delta = inner.get("delta", {})
+                if delta.get("type") == "text_delta" and not in_tool:
+                    text = delta.get("text", "")
+                    if live and text:
+                        # Stream text directly — indent newlines
+                        sys.stderr.write(text.replace("\n", f"\n{INDENT}"))
+                        sys.stderr.flush()
+                        live_needs_newline = True
+                    elif verbose:
+                        text_buffer += text
+
+            elif inner_type == "content_block_stop":
+                if in_tool:
+                    in_tool = False
+                elif live:
+                    flush_live_newline()
+
+            continue
+
+        # ── Assistant messages (complete content blocks, from --verbose) ──
+        if etype == "assistant":
+            mark_first_token()
+            msg = event.get("message", {})
+            if isinstance(msg, dict):
+                if msg.get("id") and msg.get("usage"):
+                    seen = assistant_usage.get(msg["id"], (timeline.rel(), None))[0]
+                    assistant_usage[msg["id"]] = (seen, msg["usage"])
+                for block in msg.get("content", []):
+                    if not isinstance(block, dict):
+                        continue
+                    if block.get("type") == "tool_use":
+                        flush_live_newline()
+                        tool_name = block.get("name", "?")
+                        if block.get("id"):
+                            # Input is complete here; the tool runs from now
+                            pending_tools[block["id"]] = (tool_name, time.time())
+                        tool_count += 1
+                        show_tool(tool_name)
+                        # Show tool input in verbose mode
+                        inp = block.get("input", {})
+                        if verbose and isinstance(inp, dict):
+                            if tool_name in ("Read", "Glob", "Grep"):
+                                path = inp.get("file_path", inp.get("pattern", inp.get("path", "")))
+                                if path:
+                                    show_detail(f"  → {path}")
+                            elif tool_name in ("Write", "Edit"):
+                                path = inp.get("file_path", "")
+                                if path:
+                                    show_detail(f"  → {path}")
+                            elif tool_name == "Bash":
+                                cmd = inp.get("command", "")
+                                if cmd:
+                                    show_detail(f"  $ {cmd[:80]}{'...' if len(cmd) > 80 else ''}")
+                    elif block.get("type") == "text":
+                        if verbose and not live:
+                            text = block.get("text", "").strip()
+                            if text:
+                                lines = text.split("\n")
+                                for tl in lines[:5]:
+                                    show_detail(tl[:120])
+                                if len(lines) > 5:
+                                    show_detail(f"  ... ({len(lines)} lines)")
+
+        # ── Tool results (user turns) ──
+        elif etype == "user":
+            msg = event.get("message", {})
+            content = msg.get("content", []) if isinstance(msg, dict) else []
+            now = time.time()
+            for block in content if isinstance(content, list) else []:
+                if not isinstance(block, dict) or block.get("type") != "tool_result":
+                    continue
+                pending = pending_tools.pop(block.get("tool_use_id", ""), None)
+                if pending is None:
+                    continue
+                name, tool_start = pending
+                timeline.write(
+                    "tool", name=name, start=timeline.rel(tool_start), end=timeline.rel(now),
+                    latency=round(now - tool_start, 3),
+                    gap=round(tool_start - last_tool_end, 3) if last_tool_end is not None else None,
+                    error=bool(block.get("is_error")),
+                )
+                tool_time += now - tool_start
+                last_tool_end = now
+
+        # Capture the last event as result
+        result_data = event
+
+    # Flush remaining
+    flush_live_newline()
+    if verbose and not live and text_buffer.strip():
+        for tl in text_buffer.strip().split("\n"):
+            print(f"{INDENT}{DIM}{tl}{RESET}", file=sys.stderr)
+
+    # Clear progress line
+    if tool_count > 0:
+        print("", file=sys.stderr)
+
+    # Without partial messages, turns come from the assistant events
+    if not streamed_turns:
+        for message_id, (seen, usage) in assistant_usage.items():
+            timeline.write("turn", id=message_id, start=seen, end=seen, **usage_tokens(usage))
+
+    result = result_data if result_data.get("type") == "result" else {}
+    timeline.write(
+        "end",
+        duration=timeline.rel(),
+        ttft=first_token,
+        tools=tool_count,
+        tool_time=round(tool_time, 3),
+        cost=result.get("total_cost_usd", result.get("cost_usd", 0)) or 0,
+        turns=result.get("num_turns", 0) or 0,
+        is_error=bool(result.get("is_error")) if result else True,
+    )
+    timeline.close()
+
+    json.dump(result_data, sys.stdout)
+    return 0
+
+
+# ── summary ─────────────────────────────────────────────────────────────────
+
+def timeline_files(targets: list[str], log_dir: str, latest: bool) -> list[str]:
+    files = []
+    for target in targets:
+        if os.path.isfile(target):
+            files.append(target)
+            continue
+        matches = sorted(glob.glob(os.path.join(log_dir, f"*-{glob.escape(target)}-*.timeline.jsonl")))
+        if latest:
+            # Newest run per command (plan/implement/verify)
+            newest = {}
+            for path in matches:
+                newest[os.path.basename(path).split("-", 1)[0]] = path
+            matches = sorted(newest.values())
+        files.extend(matches)
+    return files
+
+
+def load_sessions(files: list[str]) -> list[dict]:
+    sessions = {}
+    for path in files:
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = (path, record.get("session"))
+            session = sessions.setdefault(key, {"file": path, "tools": [], "turns": [], "start": {}, "end": None})
+            ev = record.get("ev")
+            if ev == "start":
+                session["start"] = record
+            elif ev == "tool":
+                session["tools"].append(record)
+            elif ev == "turn":
+                session["turns"].append(record)
+            elif ev == "end":
+                session["end"] = record
+    return list(sessions.values())
+
+
+def busy_time(intervals: list[tuple[float, float]]) -> float:
+    """Length of the union of intervals (parallel tool calls overlap)."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def summarize(sessions: list[dict]) -> dict:
+    totals = {"sessions": 0, "unfinished": 0, "wall": 0.0, "startup": 0.0, "model": 0.0, "tools": 0.0, "cost": 0.0}
+    tokens = {"input": 0, "output": 0, "cache_read": 0, "cache_creation": 0}
+    kinds = {}
+    tools = {}
+    calls = []
+    gaps = []
+    for session in sessions:
+        end = session["end"]
+        if end is None:
+            # Killed mid-session: count what was recorded
+            totals["unfinished"] += 1
+            records = session["tools"] + session["turns"]
+            duration = max((r.get("end") or r.get("at") or 0 for r in records), default=0)
+            ttft = None
+        else:
+            duration = end.get("duration") or 0
+            ttft = end.get("ttft")
+            totals["cost"] += end.get("cost") or 0
+        tool_busy = busy_time([(t["start"], t["end"]) for t in session["tools"]])
+        startup = ttft if ttft is not None else 0
+        model = max(duration - startup - tool_busy, 0)
+
+        totals["sessions"] += 1
+        totals["wall"] += duration
+        totals["startup"] += startup
+        totals["tools"] += tool_busy
+        totals["model"] += model
+
+        kind = session["start"].get("kind") or "session"
+        k = kinds.setdefault(kind, {"sessions": 0, "wall": 0.0, "startup": 0.0, "model": 0.0, "tools": 0.0})
+        k["sessions"] += 1
+        k["wall"] += duration
+        k["startup"] += startup
+        k["model"] += model
+        k["tools"] += tool_busy
+
+        target = session["start"].get("target", "")
+        for t in session["tools"]:
+            entry = tools.setdefault(t["name"], {"calls": 0, "total": 0.0, "max": 0.0, "errors": 0})
+            entry["calls"] += 1
+            entry["total"] += t["latency"]
+            entry["max"] = max(entry["max"], t["latency"])
+            entry["errors"] += int(bool(t.get("error")))
+            calls.append({"name": t["name"], "latency": t["latency"], "kind": kind, "target": target})
+            if t.get("gap") is not None:
+                gaps.append({"before": t["name"], "gap": t["gap"], "kind": kind, "target": target})
+        for turn in session["turns"]:
+            for key in tokens:
+                tokens[key] += turn.get(key) or 0
+
+    prompt_tokens = tokens["input"] + tokens["cache_read"] + tokens["cache_creation"]
+    return {
+        "totals": {k: round(v, 3) if isinstance(v, float) else v for k, v in totals.items()},
+        "kinds": kinds,
+        "tools": tools,
+        "tokens": {**tokens, "cache_hit_ratio": round(tokens["cache_read"] / prompt_tokens, 3) if prompt_tokens else 0},
+        "slowest_calls": sorted(calls, key=lambda c: c["latency"], reverse=True)[:5],
+        "longest_gaps": sorted(gaps, key=lambda g: g["gap"], reverse=True)[:5],
+    }
+
+
+def fmt_secs(secs: float) -> str:
+    secs = int(round(secs))
+    if secs < 60:
+        return f"{secs}s"
+    mins, secs = divmod(secs, 60)
+    if mins < 60:
+        return f"{mins}m{secs:02d}s"
+    hours, mins = divmod(mins, 60)
+    return f"{hours}h{mins:02d}m"
+
+
+def fmt_count(count: int) -> str:
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1000:
+        return f"{count / 1000:.1f}k"
+    return str(count)
+
+
+def print_summary(summary: dict, files: list[str]) -> None:
+    totals = summary["totals"]
+    wall = totals["wall"] or 1
+
+    def share(value):
+        return f"{fmt_secs(value):>8} {value / wall:>4.0%}"
+
+    print(f"  Timelines: {len(files)} run(s), {totals['sessions']} session(s)", end="")
+    print(f" ({totals['unfinished']} unfinished)" if totals["unfinished"] else "")
+    print(f"  Session time: {fmt_secs(totals['wall'])} | Cost: ${round(totals['cost'], 2)}")
+    print(f"    startup (to first token) {share(totals['startup'])}")
+    print(f"    model (generating)       {share(totals['model'])}")
+    print(f"    tools (executing)        {share(totals['tools'])}")
+
+    print(f"\n  {BOLD}By session kind{RESET}")
+    print(f"    {'kind':<14}{'sessions':>9}{'total':>9}{'avg':>9}{'startup':>9}{'model':>9}{'tools':>9}")
+    for kind, k in sorted(summary["kinds"].items(), key=lambda item: item[1]["wall"], reverse=True):
+        print(
+            f"    {kind:<14}{k['sessions']:>9}{fmt_secs(k['wall']):>9}{fmt_secs(k['wall'] / k['sessions']):>9}"
+            f"{fmt_secs(k['startup']):>9}{fmt_secs(k['model']):>9}{fmt_secs(k['tools']):>9}"
+        )
+
+    if summary["tools"]:
+        print(f"\n  {BOLD}By tool{RESET}")
+        print(f"    {'tool':<22}{'calls':>7}{'total':>9}{'avg':>8}{'max':>8}{'errors':>8}")
+        for name, t in sorted(summary["tools"].items(), key=lambda item: item[1]["total"], reverse=True):
+            print(
+                f"    {name[:21]:<22}{t['calls']:>7}{fmt_secs(t['total']):>9}{t['total'] / t['calls']:>7.1f}s"
+                f"{t['max']:>7.1f}s{t['errors']:>8}"
+            )
+
+    tokens = summary["tokens"]
+    print(f"\n  {BOLD}Tokens{RESET}")
+    print(
+        f"    in {fmt_count(tokens['input'])} + cache read {fmt_count(tokens['cache_read'])}"
+        f" + cache write {fmt_count(tokens['cache_creation'])} | out {fmt_count(tokens['output'])}"
+        f" | cache hit {tokens['cache_hit_ratio']:.0%}"
+    )
+
+    if summary["slowest_calls"]:
+        print(f"\n  {BOLD}Slowest tool calls{RESET}")
+        for c in summary["slowest_calls"]:
+            print(f"    {c['latency']:>7.1f}s  {c['name']:<14} {DIM}{c['kind']} {c['target']}{RESET}")
+    if summary["longest_gaps"]:
+        print(f"\n  {BOLD}Longest gaps between tool calls{RESET}")
+        for g in summary["longest_gaps"]:
+            print(f"    {g['gap']:>7.1f}s  before {g['before']:<7} {DIM}{g['kind']} {g['target']}{RESET}")
+
+
+def summary_command(args) -> int:
+    files = timeline_files(args.targets, args.dir, args.latest)
+    if not files:
+        print(f"No timelines found for {' '.join(args.targets)} in {args.dir}", file=sys.stderr)
+        return 1
+    summary = summarize(load_sessions(files))
+    if args.json:
+        print(json.dumps({"files": files, **summary}, indent=2))
+    else:
+        print_summary(summary, files)
+    return 0
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RALPH session stream and timelines")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("stream")
+    s.add_argument("--timeline", default=os.environ.get("RALPH_TIMELINE", ""))
+    s.add_argument("--kind", default="")
+    s.add_argument("--target", default="")
+    s.add_argument("--model", default="")
+
+    summary = sub.add_parser("summary")
+    summary.add_argument("targets", nargs="+")
+    summary.add_argument("--dir", default=os.environ.get("RALPH_LOG_DIR", ".powermode/ralph"))
+    summary.add_argument("--latest", action="store_true")
+    summary.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "stream":
+        return stream(args)
+    if args.command == "summary":
+        return summary_command(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
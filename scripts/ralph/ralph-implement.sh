@@ -8,7 +8,6 @@ REAL_PATH="$(readlink -f "${BASH_SOURCE[0]}" 2>/dev/null || python3 -c "import o
 SCRIPT_DIR="$(cd "$(dirname "$REAL_PATH")" && pwd)"
 source "$SCRIPT_DIR/lib/common.sh"
 source "$SCRIPT_DIR/lib/status.sh"
-source "$SCRIPT_DIR/lib/blockers.sh"
 source "$SCRIPT_DIR/lib/prompts.sh"
 
 # ── Parse args ──────────────────────────────────────────────────────────────
@@ -16,7 +15,7 @@ POSITIONAL_ARGS=()
 parse_common_args "$@"
 
 if [[ ${#POSITIONAL_ARGS[@]} -lt 1 ]]; then
-    log_error "Usage: ralph implement <project-slug> [--feature X] [--model X] [--budget X] [--max-iters N]"
+    log_error "Usage: ralph implement <project-slug> [--feature X] [--model X] [--budget X] [--max-iters N] [--parallel N]"
     exit 1
 fi
 
@@ -29,6 +28,11 @@ BUDGET="${RALPH_BUDGET:-${RALPH_MAX_BUDGET:-10.00}}"
 TEST_BUDGET="${RALPH_TEST_BUDGET:-2.00}"
 MAX_ITERS="${RALPH_MAX_ITERS:-${RALPH_MAX_ITERATIONS:-50}}"
 FEATURE_FILTER="${RALPH_FEATURE:-}"
+WORKERS="${RALPH_PARALLEL:-${RALPH_WORKERS:-1}}"
+if ! [[ "$WORKERS" =~ ^[0-9]+$ ]]; then
+    log_error "--parallel expects a number of workers, got '$WORKERS'"
+    exit 1
+fi
 
 SESSION_START_TIME=$(date +%s)
 init_log "implement" "$slug"
@@ -42,15 +46,14 @@ if [[ -n "$FEATURE_FILTER" ]]; then
     echo -e "  Filter: feature=$FEATURE_FILTER"
 fi
 echo -e "  ${DIM}Impl: $MODEL (\$$BUDGET) | Tests: $TEST_MODEL (\$$TEST_BUDGET) | Max: $MAX_ITERS iterations${RESET}"
+if [[ "$WORKERS" -gt 1 ]]; then
+    echo -e "  ${DIM}Parallel: $WORKERS workers (one git worktree each)${RESET}"
+fi
 echo ""
 
 # ── Pre-loop drift repair ──────────────────────────────────────────────────
 # Sync README → status.json before starting, so completed tasks aren't re-attempted
-for feature_dir in "$project_dir"/features/*/; do
-    [[ -d "$feature_dir" ]] || continue
-    feature_name=$(basename "$feature_dir")
-    sync_readme_to_status "$project_dir" "$feature_name" >/dev/null 2>&1 || true
-done
+sync_project_status "$project_dir" >/dev/null 2>&1 || true
 # Re-read status after sync
 IFS='|' read -r status total done next_feat next_task <<< "$(read_project_status "$project_dir")"
 
@@ -59,169 +62,153 @@ iteration=0
 tasks_done=0
 tasks_failed=0
 
-while [[ $iteration -lt $MAX_ITERS && $RALPH_INTERRUPTED -eq 0 ]]; do
-    iteration=$((iteration + 1))
-    elapsed=0
-    if [[ -n "$SESSION_START_TIME" ]]; then
-        elapsed=$(( $(date +%s) - SESSION_START_TIME ))
-    fi
-
-    # 0. Check stop file
-    if [[ -f ".ralph-stop" ]]; then
-        rm -f ".ralph-stop"
-        log_warn "Stop file detected — halting"
-        append_log "Iteration $iteration: stopped via .ralph-stop"
-        break
-    fi
-
-    # 1. Check blockers
-    if check_blocked "$project_dir"; then
-        log_error "BLOCKED.md exists"
-        echo -e "         $(get_blocker_message "$project_dir")"
-        append_log "Iteration $iteration: BLOCKED — $(get_blocker_message "$project_dir")"
-        break
-    fi
-
-    if check_blocking_issues "$project_dir"; then
-        log_error "High-severity blocking issues found"
-        get_blocking_issue_summary "$project_dir"
-        append_log "Iteration $iteration: BLOCKED — high-severity issues"
-        break
-    fi
-
-    # 2. Find next task
-    local_next_feat=""
-    local_next_task=""
-    local_task_prd=""
-
-    for feature_dir in "$project_dir"/features/*/; do
-        [[ -d "$feature_dir" ]] || continue
-        feature_name=$(basename "$feature_dir")
-
-        # Apply feature filter
-        if [[ -n "$FEATURE_FILTER" && "$feature_name" != *"$FEATURE_FILTER"* ]]; then
-            continue
+if [[ "$WORKERS" -gt 1 ]]; then
+    # Worktree-pooled workers, see lib/parallel.sh
+    source "$SCRIPT_DIR/lib/parallel.sh"
+    run_parallel_loop "$WORKERS" || exit 1
+else
+    while [[ $iteration -lt $MAX_ITERS && $RALPH_INTERRUPTED -eq 0 ]]; do
+        iteration=$((iteration + 1))
+        elapsed=0
+        if [[ -n "$SESSION_START_TIME" ]]; then
+            elapsed=$(( $(date +%s) - SESSION_START_TIME ))
         fi
 
-        pending=$(get_pending_tasks_ordered "$feature_dir" || true)
-        while IFS= read -r task_file; do
-            [[ -z "$task_file" ]] && continue
-
-            # Check if this task's deps are met
-            task_num="${task_file%%-*}"
-            # Read deps from README
-            deps=$(python3 -c "
-import re
-with open('$feature_dir/README.md') as f:
-    for line in f:
-        cells = [c.strip() for c in line.split('|')[1:-1]]
-        if len(cells) >= 6 and cells[1].strip() == '$task_file':
-            print(cells[-2])  # deps is second-to-last column
+        # 0. Check stop file
+        if [[ -f ".ralph-stop" ]]; then
+            rm -f ".ralph-stop"
+            log_warn "Stop file detected — halting"
+            append_log "Iteration $iteration: stopped via .ralph-stop"
             break
-" 2>/dev/null || echo "None")
+        fi
 
-            if check_deps_met "$project_dir" "$feature_name" "$deps"; then
-                local_next_feat="$feature_name"
-                local_next_task="$task_file"
-                local_task_prd="$feature_dir/$task_file"
-                break 2
-            fi
-        done <<< "$pending"
-    done
+        # 1-2. Blockers and next task: one cached ralph_state.py query
+        ralph_state_query "$project_dir" "$FEATURE_FILTER"
+
+        if [[ "$RS_BLOCKED" == "1" ]]; then
+            log_error "BLOCKED.md exists"
+            echo -e "         $RS_BLOCKER"
+            append_log "Iteration $iteration: BLOCKED — $RS_BLOCKER"
+            break
+        fi
+
+        if [[ "$RS_BLOCKING_ISSUES" == "1" ]]; then
+            log_error "High-severity blocking issues found"
+            echo "$RS_ISSUES"
+            append_log "Iteration $iteration: BLOCKED — high-severity issues"
+            break
+        fi
+
+        # First pending task (feature order, then dependency order) whose
+        # deps — including cross-feature ones — are done
+        local_next_feat="$RS_NEXT_FEATURE"
+        local_next_task="$RS_NEXT_TASK"
+        local_task_prd="$project_dir/features/$RS_NEXT_FEATURE/$RS_NEXT_TASK"
+
+        # No more tasks
+        if [[ -z "$local_next_task" ]]; then
+            log_success "No more pending tasks with met dependencies"
+            break
+        fi
+
+        # 3a. Run test-write session (write failing tests from PRD)
+        log_run "Iteration $iteration: $local_next_feat/$local_next_task — writing tests ($(format_duration $elapsed) elapsed)"
+
+        test_prompt=$(build_test_write_prompt "$local_task_prd")
+        test_context=$(build_system_context "$project_dir" "test-write" "$local_next_feat/$local_next_task")
+        RALPH_SESSION_KIND="test-write"
+        RALPH_SESSION_TARGET="$local_next_feat/${local_next_task%.md}"
+        test_flags=("--model" "$TEST_MODEL" "--max-turns" "25" "--max-budget-usd" "$TEST_BUDGET" "--append-system-prompt" "$test_context")
 
-    # No more tasks
-    if [[ -z "$local_next_task" ]]; then
-        log_success "No more pending tasks with met dependencies"
-        break
-    fi
-
-    # 3a. Run test-write session (write failing tests from PRD)
-    log_run "Iteration $iteration: $local_next_feat/$local_next_task — writing tests ($(format_duration $elapsed) elapsed)"
-
-    test_prompt=$(build_test_write_prompt "$local_task_prd")
-    test_context=$(build_system_context "$project_dir" "test-write" "$local_next_feat/$local_next_task")
-    test_flags=("--model" "$TEST_MODEL" "--max-turns" "25" "--max-budget-usd" "$TEST_BUDGET" "--append-system-prompt" "$test_context")
-
-    if run_claude_session "$test_prompt" "${test_flags[@]}"; then
-        log_success "Tests written ($(format_session_stats))"
-        append_log "Iteration $iteration test-write ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s error=false"
-    else
-        log_error "Test-write failed: $CLAUDE_ERROR"
-        append_log "Iteration $iteration test-write ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s error=true"
-        tasks_failed=$((tasks_failed + 1))
-        continue
-    fi
-
-    # 3b. Run implementation session (make tests pass)
-    log_run "Iteration $iteration: $local_next_feat/$local_next_task — implementing ($(format_duration $elapsed) elapsed)"
-
-    prompt=$(build_implement_prompt "$local_task_prd")
-    system_context=$(build_system_context "$project_dir" "implement" "$local_next_feat/$local_next_task")
-    impl_flags=("--model" "$MODEL" "--max-turns" "50" "--max-budget-usd" "$BUDGET" "--append-system-prompt" "$system_context")
-
-    if run_claude_session "$prompt" "${impl_flags[@]}"; then
-        log_success "$local_next_feat/$local_next_task ($(format_session_stats))"
-        print_session_result "$CLAUDE_RESULT" "$CLAUDE_LINES_ADDED" "$CLAUDE_LINES_REMOVED"
-        append_log "Iteration $iteration ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s turns=$CLAUDE_TURNS tokens_in=$CLAUDE_TOKENS_IN tokens_out=$CLAUDE_TOKENS_OUT error=false"
-    else
-        log_error "$local_next_feat/$local_next_task failed: $CLAUDE_ERROR"
-        append_log "Iteration $iteration ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s turns=$CLAUDE_TURNS tokens_in=$CLAUDE_TOKENS_IN tokens_out=$CLAUDE_TOKENS_OUT error=true"
-        tasks_failed=$((tasks_failed + 1))
-        # Continue to next task rather than stopping entirely
-        continue
-    fi
-
-    # 4. Post-checks
-    # Re-read status to check if task was marked done
-    task_base="${local_next_task%.md}"
-    if is_task_done "$project_dir" "$local_next_feat" "$task_base"; then
-        tasks_done=$((tasks_done + 1))
-        IFS='|' read -r _ _ updated_done _ _ <<< "$(read_project_status "$project_dir")"
-        log_success "Task marked done ($updated_done/$total total)"
-    else
-        # Drift repair: README may say Done but status.json wasn't updated
-        sync_result=$(sync_readme_to_status "$project_dir" "$local_next_feat" 2>/dev/null || echo "error")
-        if [[ "$sync_result" == "synced" ]] && is_task_done "$project_dir" "$local_next_feat" "$task_base"; then
+        if run_claude_session "$test_prompt" "${test_flags[@]}"; then
+            log_success "Tests written ($(format_session_stats))"
+            append_log "Iteration $iteration test-write ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s error=false"
+        else
+            log_error "Test-write failed: $CLAUDE_ERROR"
+            append_log "Iteration $iteration test-write ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s error=true"
+            tasks_failed=$((tasks_failed + 1))
+            continue
+        fi
+
+        # 3b. Run implementation session (make tests pass)
+        log_run "Iteration $iteration: $local_next_feat/$local_next_task — implementing ($(format_duration $elapsed) elapsed)"
+
+        prompt=$(build_implement_prompt "$local_task_prd")
+        system_context=$(build_system_context "$project_dir" "implement" "$local_next_feat/$local_next_task")
+        RALPH_SESSION_KIND="implement"
+        impl_flags=("--model" "$MODEL" "--max-turns" "50" "--max-budget-usd" "$BUDGET" "--append-system-prompt" "$system_context")
+
+        if run_claude_session "$prompt" "${impl_flags[@]}"; then
+            log_success "$local_next_feat/$local_next_task ($(format_session_stats))"
+            print_session_result "$CLAUDE_RESULT" "$CLAUDE_LINES_ADDED" "$CLAUDE_LINES_REMOVED"
+            append_log "Iteration $iteration ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s turns=$CLAUDE_TURNS tokens_in=$CLAUDE_TOKENS_IN tokens_out=$CLAUDE_TOKENS_OUT error=false"
+        else
+            log_error "$local_next_feat/$local_next_task failed: $CLAUDE_ERROR"
+            append_log "Iteration $iteration ($local_next_feat/$local_next_task): cost=$CLAUDE_COST duration=${CLAUDE_DURATION}s turns=$CLAUDE_TURNS tokens_in=$CLAUDE_TOKENS_IN tokens_out=$CLAUDE_TOKENS_OUT error=true"
+            tasks_failed=$((tasks_failed + 1))
+            ralph_ledger_task_outcome "$RALPH_SESSION_TARGET" failed
+            # Continue to next task rather than stopping entirely
+            continue
+        fi
+
+        # 4. Post-checks
+        # Re-query (cache is invalidated by the session's status.json/README
+        # writes) to check the task was marked done and no blockers appeared
+        task_base="${local_next_task%.md}"
+        ralph_state_query "$project_dir" "$FEATURE_FILTER" "$local_next_feat/$task_base"
+        if [[ "$RS_TASK_STATUS" == "done" ]]; then
             tasks_done=$((tasks_done + 1))
-            IFS='|' read -r _ _ updated_done _ _ <<< "$(read_project_status "$project_dir")"
-            log_success "Task done (synced from README) ($updated_done/$total total)"
+            ralph_ledger_task_outcome "$RALPH_SESSION_TARGET" done
+            log_success "Task marked done ($RS_DONE/$total total)"
         else
-            log_warn "Task not marked done — may need manual check"
+            # Drift repair: README may say Done but status.json wasn't updated
+            sync_result=$(sync_project_status "$project_dir" 2>/dev/null || echo "error")
+            if [[ "$sync_result" == "synced" ]]; then
+                ralph_state_query "$project_dir" "$FEATURE_FILTER" "$local_next_feat/$task_base"
+            fi
+            if [[ "$RS_TASK_STATUS" == "done" ]]; then
+                tasks_done=$((tasks_done + 1))
+                ralph_ledger_task_outcome "$RALPH_SESSION_TARGET" done
+                log_success "Task done (synced from README) ($RS_DONE/$total total)"
+            else
+                ralph_ledger_task_outcome "$RALPH_SESSION_TARGET" failed
+                log_warn "Task not marked done — may need manual check"
+            fi
+        fi
+
+        # Check if blockers appeared during implementation
+        if [[ "$RS_BLOCKED" == "1" ]]; then
+            log_error "BLOCKED.md created during implementation"
+            echo -e "         $RS_BLOCKER"
+            append_log "Post-iteration $iteration: BLOCKED.md appeared"
+            break
         fi
-    fi
-
-    # Check if blockers appeared during implementation
-    if check_blocked "$project_dir"; then
-        log_error "BLOCKED.md created during implementation"
-        echo -e "         $(get_blocker_message "$project_dir")"
-        append_log "Post-iteration $iteration: BLOCKED.md appeared"
-        break
-    fi
-
-    if check_blocking_issues "$project_dir"; then
-        log_error "New blocking issues detected"
-        get_blocking_issue_summary "$project_dir"
-        append_log "Post-iteration $iteration: blocking issues appeared"
-        break
-    fi
-done
+
+        if [[ "$RS_BLOCKING_ISSUES" == "1" ]]; then
+            log_error "New blocking issues detected"
+            echo "$RS_ISSUES"
+            append_log "Post-iteration $iteration: blocking issues appeared"
+            break
+        fi
+    done
+fi
 
 if [[ $iteration -ge $MAX_ITERS ]]; then
     log_warn "Reached max iterations ($MAX_ITERS)"
 fi
 
 # ── Summary ─────────────────────────────────────────────────────────────────
-IFS='|' read -r status total done _ _ <<< "$(read_project_status "$project_dir")"
+ralph_state_query "$project_dir"
 
 status_msg=""
-if check_blocked "$project_dir" 2>/dev/null; then
+if [[ "$RS_BLOCKED" == "1" ]]; then
     status_msg="BLOCKED — resolve BLOCKED.md then: ralph implement $slug"
-elif [[ $done -ge $total ]]; then
+elif [[ $RS_DONE -ge $RS_TOTAL ]]; then
     status_msg="Complete — next: ralph verify $slug"
 else
-    status_msg="Paused at $done/$total — resume: ralph implement $slug"
+    status_msg="Paused at $RS_DONE/$RS_TOTAL — resume: ralph implement $slug"
 fi
 
-print_summary "$tasks_done" "$tasks_failed" "$total" "$done" "$status_msg"
+print_summary "$tasks_done" "$tasks_failed" "$RS_TOTAL" "$RS_DONE" "$status_msg"
 echo -e "  Log: $LOG_FILE"
 echo ""
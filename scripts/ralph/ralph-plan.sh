@@ -79,6 +79,8 @@ for prd_path in "${prd_files[@]}"; do
 
     prompt=$(build_prd_review_prompt "$project_dir" "$prd_path" "$GOAL")
     review_context=$(build_system_context "$project_dir" "plan" "$prd_rel")
+    RALPH_SESSION_KIND="prd-review"
+    RALPH_SESSION_TARGET="${prd_rel%.md}"
     review_flags=("--model" "$REVIEW_MODEL" "--max-turns" "15" "--max-budget-usd" "$BUDGET" "--append-system-prompt" "$review_context")
 
     if run_claude_session "$prompt" "${review_flags[@]}"; then
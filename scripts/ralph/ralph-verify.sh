@@ -116,6 +116,8 @@ for unit_entry in "${UNITS[@]}"; do
         # ── VERIFY session ──────────────────────────────────────────────
         prompt=$(build_verify_prompt "$unit_name" "$unit_path" "$unit_scope")
         system_context=$(build_system_context "$project_dir" "verify" "$unit_name")
+        RALPH_SESSION_KIND="verify"
+        RALPH_SESSION_TARGET="$unit_name"
         verify_flags=("--model" "$VERIFY_MODEL" "--max-turns" "25" "--max-budget-usd" "3.00" "--append-system-prompt" "$system_context")
 
         if run_claude_session "$prompt" "${verify_flags[@]}"; then
@@ -159,6 +161,7 @@ else:
                 log_run "Fix session (model: $FIX_MODEL)"
                 fix_prompt=$(build_fix_prompt "$unit_name" "$last_verify_output")
                 fix_context=$(build_system_context "$project_dir" "fix" "$unit_name")
+                RALPH_SESSION_KIND="fix"
                 fix_flags=("--model" "$FIX_MODEL" "--max-turns" "30" "--max-budget-usd" "5.00" "--append-system-prompt" "$fix_context")
 
                 if run_claude_session "$fix_prompt" "${fix_flags[@]}"; then
@@ -182,6 +185,8 @@ else:
     log_run "Simplify: $unit_name"
     simplify_prompt=$(build_simplify_prompt "$unit_name")
     simplify_context=$(build_system_context "$project_dir" "simplify" "$unit_name")
+    RALPH_SESSION_KIND="simplify"
+    RALPH_SESSION_TARGET="$unit_name"
     simplify_flags=("--model" "$VERIFY_MODEL" "--max-turns" "15" "--max-budget-usd" "2.00" "--append-system-prompt" "$simplify_context")
 
     if run_claude_session "$simplify_prompt" "${simplify_flags[@]}"; then
@@ -197,6 +202,7 @@ else:
     log_run "Final verify (regression check): $unit_name"
     prompt=$(build_verify_prompt "$unit_name" "$unit_path" "$unit_scope")
     final_context=$(build_system_context "$project_dir" "verify" "$unit_name")
+    RALPH_SESSION_KIND="final-verify"
     final_flags=("--model" "$VERIFY_MODEL" "--max-turns" "20" "--max-budget-usd" "2.00" "--append-system-prompt" "$final_context")
 
     if run_claude_session "$prompt" "${final_flags[@]}"; then
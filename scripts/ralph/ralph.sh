@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 # ralph.sh — RALPH loop dispatcher
-# Usage: ralph plan|implement|verify|status [args...]
+# Usage: ralph plan|implement|verify|status|timeline|stats [args...]
 
 set -euo pipefail
 
@@ -13,9 +13,11 @@ usage() {
     echo ""
     echo -e "${BOLD}Usage:${RESET}"
     echo "  ralph plan <project-slug>       [--model X] [--budget X]"
-    echo "  ralph implement <project-slug>  [--feature X] [--model X] [--budget X] [--max-iters N]"
+    echo "  ralph implement <project-slug>  [--feature X] [--model X] [--budget X] [--max-iters N] [--parallel N]"
     echo "  ralph verify <project-slug>     [--scope feature|project] [--feature X] [--max-iters N]"
     echo "  ralph status <project-slug>"
+    echo "  ralph timeline <project-slug>   [--latest] [--json]"
+    echo "  ralph stats [project-slug]      [--days N] [--json]"
     echo ""
     echo -e "${BOLD}Environment variables:${RESET}"
     echo "  RALPH_PLAN_MODEL        Model for planning session (default: opus)"
@@ -28,6 +30,7 @@ usage() {
     echo "  RALPH_TEST_BUDGET       Per-session cost cap for test writing (default: 2.00)"
     echo "  RALPH_MAX_ITERATIONS    Max iterations safety valve (default: 50)"
     echo "  RALPH_MAX_VERIFY_ITERS  Max verify loops per unit (default: 3)"
+    echo "  RALPH_WORKERS           Parallel implement workers (default: 1)"
     echo ""
     echo -e "${BOLD}Flags:${RESET}"
     echo "  --verbose, -v           Show prompts and truncated Claude output"
@@ -63,26 +66,54 @@ case "$COMMAND" in
         slug="$1"
         project_dir=$(get_project_path "$slug") || { log_error "Project '$slug' not found"; exit 1; }
 
-        IFS='|' read -r status total done next_feat next_task <<< "$(read_project_status "$project_dir")"
+        ralph_state_query "$project_dir"
 
         print_header "RALPH Status: $slug"
-        echo -e "  Status: ${BOLD}$status${RESET}"
-        echo -e "  Progress: $done/$total done"
+        echo -e "  Status: ${BOLD}$RS_STATUS${RESET}"
+        echo -e "  Progress: $RS_DONE/$RS_TOTAL done"
 
-        if [[ -n "$next_task" ]]; then
-            echo -e "  Next: ${CYAN}$next_feat/$next_task${RESET}"
+        if [[ -n "$RS_NEXT_TASK" ]]; then
+            echo -e "  Next: ${CYAN}$RS_NEXT_FEATURE/${RS_NEXT_TASK%.md}${RESET}"
+        elif [[ "$RS_DONE" -lt "$RS_TOTAL" ]]; then
+            echo -e "  ${YELLOW}No pending task has its dependencies met${RESET}"
         else
             echo -e "  ${GREEN}All tasks complete${RESET}"
         fi
 
-        source "$SCRIPT_DIR/lib/blockers.sh"
-        if check_blocked "$project_dir"; then
-            echo -e "  ${RED}BLOCKED${RESET} — $(get_blocker_message "$project_dir")"
+        if [[ "$RS_BLOCKED" == "1" ]]; then
+            echo -e "  ${RED}BLOCKED${RESET} — $RS_BLOCKER"
         fi
-        if check_blocking_issues "$project_dir"; then
+        if [[ "$RS_BLOCKING_ISSUES" == "1" ]]; then
             echo -e "  ${RED}Blocking issues:${RESET}"
-            get_blocking_issue_summary "$project_dir"
+            echo "$RS_ISSUES"
         fi
+        if [[ "$RS_DRIFT" -gt 0 ]]; then
+            echo -e "  ${YELLOW}Drift:${RESET} $RS_DRIFT task(s) differ between README and status.json"
+        fi
+        echo ""
+        ;;
+    timeline)
+        if [[ $# -lt 1 ]]; then
+            log_error "Usage: ralph timeline <project-slug> [--latest] [--json]"
+            exit 1
+        fi
+        slug="$1"
+        shift
+        if [[ " $* " != *" --json "* ]]; then
+            print_header "RALPH Timeline: $slug"
+        fi
+        python3 "$SCRIPT_DIR/lib/session_stream.py" summary "$slug" "$@"
+        echo ""
+        ;;
+    stats)
+        if [[ " $* " != *" --json "* ]]; then
+            if [[ $# -gt 0 && "$1" != -* ]]; then
+                print_header "RALPH Stats: $1"
+            else
+                print_header "RALPH Stats"
+            fi
+        fi
+        python3 "$SCRIPT_DIR/lib/ledger.py" stats "$@"
         echo ""
         ;;
     help|--help|-h)
@@ -0,0 +1,40 @@
+"""Keyword detector trigger scan (python3 -m unittest discover -s tests)."""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+_spec = importlib.util.spec_from_file_location("keyword_detector", HOOKS_DIR / "keyword-detector.py")
+keyword_detector = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(keyword_detector)
+
+
+class SharedPrefixTriggers(unittest.TestCase):
+    def test_both_triggers_starting_at_one_offset_fire(self):
+        pack = {
+            "transient": {
+                r"\breview\b": "[review context]",
+                r"\breview plan\b": "[plan review context]",
+            }
+        }
+        spec = keyword_detector.build_spec([pack])
+        _, contexts = keyword_detector.scan_prompt(spec, "Please review plan B")
+        self.assertEqual(contexts, ["[review context]", "[plan review context]"])
+
+    def test_persistent_and_transient_sharing_a_word(self):
+        pack = {
+            "modes": {"deep": "[deep mode]"},
+            "persistent": {r"\bdeep\b": "deep"},
+            "transient": {r"\bdeep dive\b": "[dive context]"},
+        }
+        spec = keyword_detector.build_spec([pack])
+        mode, contexts = keyword_detector.scan_prompt(spec, "do a deep dive")
+        self.assertEqual(mode, "deep")
+        self.assertEqual(contexts, ["[dive context]"])
+
+
+if __name__ == "__main__":
+    unittest.main()